@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark for all-pairs break-even values.
+
+Finds, for every pair of N offers, the base salary at which one offer's
+take-home pay equals the other's with ComparisonEngine.break_even_matrix,
+and compares it with bisecting each pair on modified copies of the offer
+with compare_offer, for a few pairs.
+
+Usage:
+    python benchmarks/bench_break_even.py [--offers N] [--loop-pairs P]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bisect_in_loop(engine, offers, pairs):
+    """Break-even base salary of each (reference, offer) pair by bisection over modified copies"""
+    values = []
+    for i, j in pairs:
+        target = engine.compare_offer(offers[i])["compensation"]["take_home_pay"]
+        changed = copy.deepcopy(offers[j])
+        low, high = 0.0, 10 * max(offers[j].base_compensation, 1.0)
+        for _ in range(60):
+            changed.base_compensation = (low + high) / 2
+            if engine.compare_offer(changed)["compensation"]["take_home_pay"] < target:
+                low = changed.base_compensation
+            else:
+                high = changed.base_compensation
+        values.append((low + high) / 2)
+    return values
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark all-pairs break-even values')
+    arg_parser.add_argument('--offers', type=int, default=2000, help='Number of offers to pair up')
+    arg_parser.add_argument('--loop-pairs', type=int, default=20, help='Number of pairs to bisect in a loop')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    
+    matrix, matrix_time = timed(engine.break_even_matrix, "base_compensation", "take_home_pay", offers=offers)
+    pairs = np.random.default_rng(0).integers(0, args.offers, (args.loop_pairs, 2)).tolist()
+    expected, loop_time = timed(bisect_in_loop, engine, offers, pairs)
+    
+    found = np.array([matrix[i, j] for i, j in pairs])
+    loop_per_pair = loop_time / len(pairs)
+    print(f"{'Pairs:':30}{matrix.size:,}")
+    print(f"{'break_even_matrix:':30}{matrix_time:.3f}s ({matrix.size / matrix_time / 1e6:.1f}M pairs/s)")
+    print(f"{'Bisection over copies:':30}{loop_per_pair * 1e3:.1f}ms per pair "
+          f"({loop_per_pair * matrix.size / matrix_time:.0f}x slower)")
+    print(f"{'Largest relative difference:':30}{np.nanmax(np.abs(found - expected) / np.abs(expected)):.1e}")
+
+if __name__ == '__main__':
+    main()
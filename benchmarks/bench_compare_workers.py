@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark for comparing offers in worker processes.
+
+Compares N offers with ComparisonEngine.compare_offers serially and with
+each requested number of worker processes, on a fresh engine each time so
+no results are memoized, and checks that the results are identical. Also
+reports the size of the offer payload sent to the workers next to the size
+of the pickled JobOffer objects.
+
+Usage:
+    python benchmarks/bench_compare_workers.py [--offers N] [--workers W [W ...]]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+from operator import attrgetter
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine, _offer_payload_fields
+
+
+def timed_compare(offers, workers):
+    """Compare offers on a fresh engine and return (results, seconds)"""
+    engine = ComparisonEngine()
+    engine.add_offers(offers)
+    start = time.perf_counter()
+    results = engine.compare_offers(workers=workers)
+    return results, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark compare_offers in worker processes')
+    arg_parser.add_argument('--offers', type=int, default=200000, help='Number of offers to compare')
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8],
+                            help='Numbers of worker processes to try')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    fields = _offer_payload_fields(offers[0])
+    payload_bytes = len(pickle.dumps((fields, list(map(attrgetter(*fields), offers)))))
+    object_bytes = len(pickle.dumps(offers))
+    
+    expected, serial_time = timed_compare(offers, None)
+    
+    print(f"{'Offers:':26}{args.offers:,} ({os.cpu_count()} CPUs)")
+    print(f"{'Offer payload:':26}{payload_bytes / 2 ** 20:.1f} MB "
+          f"(pickled objects: {object_bytes / 2 ** 20:.1f} MB)")
+    print(f"{'Serial:':26}{serial_time:.3f}s")
+    for workers in args.workers:
+        results, seconds = timed_compare(offers, workers)
+        print(f"{f'{workers} workers:':26}{seconds:.3f}s ({serial_time / seconds:.1f}x)"
+              f"{'' if results == expected else '  RESULTS DIFFER'}")
+
+
+if __name__ == '__main__':
+    main()
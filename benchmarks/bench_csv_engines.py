@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the stdlib, pandas and memory-mapped CSV readers in SpreadsheetParser.
+
+Parses the same offers file with csv_engine='python', 'pandas' and 'mmap' at
+several sizes and checks that all produce identical offers. Speedups are
+relative to the stdlib reader; the last column adds the one-off cost of
+importing pandas, which a CLI run using the stdlib reader never pays.
+
+Usage:
+    python benchmarks/bench_csv_engines.py [--rows N [N ...]]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from spreadsheet_parser import SpreadsheetParser
+
+
+def write_offers_csv(parser: SpreadsheetParser, path: str, rows: int) -> None:
+    """Write an offers CSV of the given size by repeating the template rows"""
+    template_path = path + '.template.csv'
+    parser.create_template_file(template_path)
+    template = pd.read_csv(template_path)
+    os.remove(template_path)
+    
+    repeats = rows // len(template) + 1
+    df = pd.concat([template] * repeats, ignore_index=True).iloc[:rows]
+    df['base_compensation'] = df['base_compensation'] + (df.index % 1000)
+    df.to_csv(path, index=False)
+
+
+def best_time(func, repeat: int = 3):
+    """Return (best elapsed seconds, result) over several calls"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def pandas_import_time() -> float:
+    """Measure the time to import pandas in a fresh interpreter"""
+    code = "import time; start = time.perf_counter(); import pandas; print(time.perf_counter() - start)"
+    times = [float(subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                  text=True, check=True).stdout) for _ in range(3)]
+    return min(times)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark CSV engines')
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[10, 1000, 10000, 50000],
+                            help='Numbers of offer rows to benchmark')
+    args = arg_parser.parse_args()
+    
+    python_parser = SpreadsheetParser(csv_engine='python')
+    pandas_parser = SpreadsheetParser(csv_engine='pandas')
+    mmap_parser = SpreadsheetParser(csv_engine='mmap')
+    
+    import_time = pandas_import_time()
+    print(f"pandas import: {import_time:.3f}s\n")
+    print(f"{'Rows':>10} {'stdlib csv':>12} {'pandas':>12} {'Speedup':>9} {'mmap':>12} {'Speedup':>9} "
+          f"{'Identical':>10} {'pandas speedup incl. import':>28}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            path = os.path.join(tmp_dir, f'offers_{rows}.csv')
+            write_offers_csv(pandas_parser, path, rows)
+            
+            python_time, python_offers = best_time(lambda: python_parser.parse_file(path))
+            pandas_time, pandas_offers = best_time(lambda: pandas_parser.parse_file(path))
+            mmap_time, mmap_offers = best_time(lambda: mmap_parser.parse_file(path))
+            expected = [vars(o) for o in python_offers]
+            same = (expected == [vars(o) for o in pandas_offers]
+                    and expected == [vars(o) for o in mmap_offers])
+            
+            print(f"{rows:>10,} {python_time:>11.4f}s {pandas_time:>11.4f}s "
+                  f"{python_time / pandas_time:>8.1f}x {mmap_time:>11.4f}s {python_time / mmap_time:>8.1f}x "
+                  f"{str(same):>10} {python_time / (pandas_time + import_time):>27.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for pairwise delta matrices.
+
+Computes the n x n differences of take-home pay, total annual value and
+weekly commute hours for N offers with ComparisonEngine.get_batch_delta_matrix,
+in memory and into memory-mapped files, then times queries ("which offers
+beat offer X by more than $10k") against the stored matrix and against
+comparing the offers again for every query.
+
+Usage:
+    python benchmarks/bench_delta_matrix.py [--offers N] [--queries Q]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+from delta_matrix import DeltaMatrix
+from offer_batch import OfferBatch
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def query_by_recomputing(engine, batch, indices):
+    """Offers beating each offer by more than $10k of take-home pay, comparing all offers per query"""
+    found = []
+    for index in indices:
+        take_home = engine.compare_batch(batch)["compensation"]["take_home_pay"]
+        found.append(np.flatnonzero(take_home - take_home[index] > 10000))
+    return found
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark pairwise delta matrices')
+    arg_parser.add_argument('--offers', type=int, default=5000, help='Number of offers')
+    arg_parser.add_argument('--queries', type=int, default=100, help='Number of queries to time')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    batch = OfferBatch(offers)
+    columns = engine.compare_batch(batch)
+    indices = np.random.default_rng(0).integers(0, args.offers, args.queries).tolist()
+    
+    matrix, memory_time = timed(engine.get_batch_delta_matrix, batch, columns)
+    size = sum(deltas.nbytes for deltas in matrix.deltas.values())
+    print(f"{'Offers:':30}{args.offers:,} ({size / 2 ** 20:,.0f} MiB of deltas)")
+    print(f"{'In memory:':30}{memory_time:.3f}s ({size / memory_time / 2 ** 30:.1f} GiB/s)")
+    del matrix
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "deltas")
+        mapped, mapped_time = timed(engine.get_batch_delta_matrix, batch, columns, path=path, dtype="float32")
+        print(f"{'Memory-mapped (float32):':30}{mapped_time:.3f}s")
+        del mapped
+        
+        loaded = DeltaMatrix.load(path)
+        found, query_time = timed(lambda: [loaded.beating("take_home_pay", index, 10000) for index in indices])
+        expected, recompute_time = timed(query_by_recomputing, engine, batch, indices)
+        _, count_time = timed(loaded.count_beating, "weekly_commute_hours", 1)
+        print(f"{'Query from the matrix:':30}{query_time / args.queries * 1e6:.0f}us per query")
+        print(f"{'Query by recomputing:':30}{recompute_time / args.queries * 1e6:.0f}us per query "
+              f"({recompute_time / query_time:.0f}x slower)")
+        print(f"{'count_beating for all offers:':30}{count_time:.3f}s")
+        print(f"{'Identical:':30}{all(np.array_equal(a, b) for a, b in zip(found, expected))}")
+        del loaded
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for duplicate offer detection.
+
+Creates N offers, a tenth of which repeat an earlier offer with the company
+in other case and spacing and another tenth with a base compensation 1%
+higher, then finds the duplicates with find_duplicates in exact mode and in
+near mode (2% tolerance). For comparison, the first P offers are also
+deduplicated by checking every pair.
+
+Usage:
+    python benchmarks/bench_duplicates.py [--offers N] [--pairwise P]
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from offer_index import find_duplicates, offer_fingerprint
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def make_offers_with_duplicates(count: int, seed: int = 0):
+    """Offers where every fifth repeats an earlier one, exactly or with 1% more base compensation"""
+    rng = random.Random(seed)
+    offers = make_offers(count - 2 * (count // 10), seed=seed)
+    for i in range(count // 10):
+        exact = copy.copy(rng.choice(offers))
+        exact.company = "  " + exact.company.upper()
+        near = copy.copy(rng.choice(offers))
+        near.base_compensation *= 1.01
+        offers.extend((exact, near))
+    rng.shuffle(offers)
+    return offers
+
+
+def pairwise_duplicates(offers):
+    """Exact duplicates found by comparing each offer with every earlier offer kept"""
+    kept = []
+    duplicates = 0
+    for offer in offers:
+        fingerprint = offer_fingerprint(offer)
+        if any(fingerprint == other for other in kept):
+            duplicates += 1
+        else:
+            kept.append(fingerprint)
+    return duplicates
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark duplicate offer detection')
+    arg_parser.add_argument('--offers', type=int, default=200000, help='Number of offers')
+    arg_parser.add_argument('--pairwise', type=int, default=5000, help='Number of offers to check pair by pair')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers_with_duplicates(args.offers)
+    exact, exact_time = timed(find_duplicates, offers)
+    near, near_time = timed(find_duplicates, offers, 0.02)
+    subset = offers[:args.pairwise]
+    pairwise, pairwise_time = timed(pairwise_duplicates, subset)
+    
+    print(f"{'Offers:':30}{args.offers:,}")
+    print(f"{'Exact:':30}{exact_time:.3f}s ({exact_time / args.offers * 1e6:.1f}us per offer), "
+          f"{sum(original is not None for original in exact):,} duplicates")
+    print(f"{'Near (2%):':30}{near_time:.3f}s ({near_time / args.offers * 1e6:.1f}us per offer), "
+          f"{sum(original is not None for original in near):,} duplicates")
+    print(f"{'Pairwise, ' + f'{len(subset):,} offers:':30}{pairwise_time:.3f}s "
+          f"({pairwise_time / len(subset) * 1e6:.1f}us per offer)")
+    print(f"{'Identical pairwise:':30}"
+          f"{pairwise == sum(original is not None for original in find_duplicates(subset))}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the vectorized OfferBatch comparison against the per-offer loop.
+
+Builds N varied job offers, compares them with ComparisonEngine.compare_offers
+and with ComparisonEngine.compare_batch, and checks that every metric is
+identical. Building the OfferBatch columns is timed separately, since a batch
+is built once and can be compared many times; the first compare_batch call
+also pays for first-touch page faults on its result arrays.
+
+Usage:
+    python benchmarks/bench_offer_batch.py [--offers N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from comparison_engine import ComparisonEngine
+from commute_calculator import DriveType
+from job_offer import (JobOffer, Benefits, CommuteDetails, CommuteCalculationType, CompensationType,
+                       EmploymentType, WorkLocationType)
+from offer_batch import OfferBatch, BENEFITS_KEYS, COMPENSATION_KEYS
+
+LOCATIONS = ['Austin, TX', 'New York City, NY', 'San Francisco, CA', 'Philadelphia, PA',
+             'Seattle, WA', 'Denver, CO', 'Remote']
+
+
+def make_offers(count: int, seed: int = 0):
+    """Create varied job offers covering every compensation, location and commute branch"""
+    rng = random.Random(seed)
+    offers = []
+    for i in range(count):
+        hourly = rng.random() < 0.3
+        benefits = Benefits(
+            retirement_match_percent=rng.choice([0, 0.03, 0.05]),
+            retirement_match_limit=rng.choice([0, 5000, 10000]),
+            health_insurance_monthly_premium=rng.uniform(0, 400),
+            health_insurance_coverage_percent=rng.uniform(0, 1),
+            dental_insurance_monthly_premium=rng.uniform(0, 40),
+            dental_insurance_coverage_percent=rng.uniform(0, 1),
+            life_insurance_coverage=rng.choice([0, 50000, 100000]),
+            paid_time_off_days=rng.randint(0, 25),
+            paid_holidays=rng.randint(0, 12),
+            paid_parental_leave_weeks=rng.randint(0, 16),
+            equity_value=rng.choice([0, 10000, 50000])
+        )
+        offers.append(JobOffer(
+            title=f'Engineer {i}',
+            company=f'Company {i}',
+            location=rng.choice(LOCATIONS),
+            work_location_type=rng.choice(list(WorkLocationType)),
+            employment_type=rng.choice(list(EmploymentType)),
+            compensation_type=CompensationType.HOURLY if hourly else CompensationType.SALARY,
+            base_compensation=rng.uniform(30, 150) if hourly else rng.uniform(50000, 400000),
+            bonus_amount=rng.uniform(0, 30000),
+            bonus_guaranteed=rng.random() < 0.5,
+            signing_bonus=rng.choice([0, 10000]),
+            benefits=benefits,
+            cost_of_living_index=rng.uniform(80, 180),
+            commute_time_minutes=rng.randint(0, 60),
+            commute_days_per_week=rng.randint(0, 5),
+            commute_calc_type=rng.choice(list(CommuteCalculationType)),
+            commute_cost_monthly=rng.uniform(0, 300),
+            commute_details=CommuteDetails(distance_miles=rng.uniform(0, 40),
+                                           drive_type=rng.choice(list(DriveType))),
+            expected_hours_per_week=rng.uniform(35, 60)
+        ))
+    return offers
+
+
+def same_metrics(per_offer_results, columns) -> bool:
+    """Check that the columnar results equal the per-offer results exactly"""
+    tax_rates = columns['effective_tax_rate'].tolist()
+    benefits = {key: columns['benefits_value'][key].tolist() for key in BENEFITS_KEYS}
+    compensation = {key: columns['compensation'][key].tolist() for key in COMPENSATION_KEYS}
+    for i, result in enumerate(per_offer_results):
+        if result['effective_tax_rate'] != tax_rates[i]:
+            return False
+        if any(result['benefits_value'][key] != benefits[key][i] for key in BENEFITS_KEYS):
+            return False
+        if any(result['compensation'][key] != compensation[key][i] for key in COMPENSATION_KEYS):
+            return False
+    return True
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark vectorized offer comparison')
+    arg_parser.add_argument('--offers', type=int, default=1000000, help='Number of offers to compare')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    engine.add_offers(offers)
+    
+    start = time.perf_counter()
+    per_offer_results = engine.compare_offers()
+    loop_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch = OfferBatch(offers)
+    build_time = time.perf_counter() - start
+    
+    batch_times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        columns = engine.compare_batch(batch)
+        batch_times.append(time.perf_counter() - start)
+    first_time, best_time = batch_times[0], min(batch_times)
+    
+    print(f"Offers:                          {args.offers:,}")
+    print(f"Per-offer compare_offers:        {loop_time:.3f}s")
+    print(f"OfferBatch build:                {build_time:.3f}s")
+    print(f"compare_batch, first call:       {first_time:.3f}s ({loop_time / first_time:.1f}x)")
+    print(f"compare_batch, best of 3:        {best_time:.3f}s ({loop_time / best_time:.1f}x)")
+    print(f"Build + first compare_batch:     {build_time + first_time:.3f}s "
+          f"({loop_time / (build_time + first_time):.1f}x)")
+    print(f"Identical results:               {same_metrics(per_offer_results, columns)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Pareto frontiers over many offers.
+
+Compares N offers with compare_batch and finds the Pareto frontier over
+growing sets of metrics with get_batch_pareto_frontier, which uses the
+O(n log n) sweeps for two and three metrics and the block-based algorithm
+for more. get_pareto_frontier over the per-offer results is timed on the
+same offers and checked against it.
+
+Offers from one distribution have small frontiers, so the benchmark also
+times pareto_frontier on N random normal points in 2 to 5 dimensions,
+whose frontiers are much larger.
+
+Usage:
+    python benchmarks/bench_pareto.py [--offers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+from offer_batch import OfferBatch
+from pareto import pareto_frontier
+
+METRIC_SETS = [
+    ['take_home_pay', 'weekly_commute_hours'],
+    ['take_home_pay', 'benefits_value', 'weekly_commute_hours'],
+    ['take_home_pay', 'benefits_value', 'weekly_commute_hours', 'annual_commute_cost'],
+    ['total_annual_value', 'take_home_pay', 'hourly_rate', 'benefits_value', 'cost_of_living_adjusted'],
+]
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark Pareto frontiers')
+    arg_parser.add_argument('--offers', type=int, default=1000000, help='Number of offers')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    engine.add_offers(offers)
+    batch = OfferBatch(offers)
+    columns = engine.compare_batch(batch)
+    
+    print(f"{'Offers:':40}{args.offers:,}")
+    for metrics in METRIC_SETS:
+        frontier, seconds = timed(engine.get_batch_pareto_frontier, batch, columns, metrics)
+        print(f"{f'{len(metrics)} metrics, batch:':40}{seconds:.3f}s ({len(frontier):,} on the frontier)")
+    
+    results = engine.compare_offers()
+    metrics = METRIC_SETS[-1]
+    frontier_results, seconds = timed(engine.get_pareto_frontier, metrics, results)
+    print(f"{f'{len(metrics)} metrics, per-offer results:':40}{seconds:.3f}s")
+    print(f"{'Identical:':40}"
+          f"{[result['offer'] for result in frontier_results] == [offers[i] for i in frontier.tolist()]}")
+    
+    rng = np.random.default_rng(0)
+    for dimensions in range(2, 6):
+        points = rng.normal(size=(args.offers, dimensions))
+        frontier, seconds = timed(pareto_frontier, points)
+        print(f"{f'{dimensions}-D random normal points:':40}{seconds:.3f}s ({len(frontier):,} on the frontier)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for top-k rankings against full rankings.
+
+Compares N offers once, then ranks them with ComparisonEngine.get_rankings
+(every offer, fully sorted), get_rankings with top_k (heap selection) and
+get_batch_rankings with top_k (partial sort over the compare_batch arrays),
+and checks that the top-k rankings are the prefix of the full rankings.
+It also times get_recommendations on its own and from the full rankings.
+
+It then replaces offers one at a time with update_offer and ranks after
+each change, with get_rankings over the memoized compare_offers results
+and with the incrementally maintained get_indexed_rankings.
+
+Usage:
+    python benchmarks/bench_rankings.py [--offers N] [--top-k K] [--updates U]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+from offer_batch import OfferBatch
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark top-k rankings')
+    arg_parser.add_argument('--offers', type=int, default=1000000, help='Number of offers to rank')
+    arg_parser.add_argument('--top-k', type=int, default=20, help='Number of offers to rank per criterion')
+    arg_parser.add_argument('--updates', type=int, default=20, help='Number of offer updates to rank after')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    engine.add_offers(offers)
+    results = engine.compare_offers()
+    batch = OfferBatch(offers)
+    columns = engine.compare_batch(batch)
+    
+    full, full_time = timed(engine.get_rankings, results)
+    top, top_time = timed(engine.get_rankings, results, top_k=args.top_k)
+    batch_top, batch_time = timed(engine.get_batch_rankings, batch, columns, top_k=args.top_k)
+    
+    prefix = {
+        criterion: dict(ranking_data, ranking=ranking_data['ranking'][:args.top_k])
+        for criterion, ranking_data in full.items()
+    }
+    
+    top_label = f"top {args.top_k}"
+    print(f"{'Offers:':33}{args.offers:,}")
+    print(f"{'get_rankings, all offers:':33}{full_time:.3f}s")
+    print(f"{'get_rankings, ' + top_label + ':':33}{top_time:.3f}s ({full_time / top_time:.1f}x)")
+    print(f"{'get_batch_rankings, ' + top_label + ':':33}{batch_time:.3f}s ({full_time / batch_time:.1f}x)")
+    print(f"{'Identical ' + top_label + ':':33}{top == prefix and batch_top == prefix}")
+    
+    recommendations, recommend_time = timed(engine.get_recommendations, results, include_ties=True)
+    reused, reuse_time = timed(engine.get_recommendations, results, full, include_ties=True)
+    print(f"{'get_recommendations:':33}{recommend_time:.3f}s")
+    print(f"{'get_recommendations, rankings:':33}{reuse_time:.3f}s")
+    print(f"{'Identical recommendations:':33}{reused == recommendations}")
+    
+    _, index_build_time = timed(engine.get_indexed_rankings, top_k=args.top_k)
+    rng = random.Random(1)
+    replacements = make_offers(args.updates, seed=1)
+    sorted_time = indexed_time = 0.0
+    identical = True
+    for replacement in replacements:
+        engine.update_offer(rng.randrange(args.offers), replacement)
+        expected, seconds = timed(lambda: engine.get_rankings(engine.compare_offers(), top_k=args.top_k))
+        sorted_time += seconds
+        indexed, seconds = timed(engine.get_indexed_rankings, top_k=args.top_k)
+        indexed_time += seconds
+        identical = identical and indexed == expected
+    
+    print(f"{'Ranking index build:':33}{index_build_time:.3f}s")
+    print(f"{'Per update, get_rankings:':33}{sorted_time / args.updates * 1000:.2f}ms")
+    print(f"{'Per update, indexed rankings:':33}{indexed_time / args.updates * 1000:.2f}ms "
+          f"({sorted_time / indexed_time:.1f}x)")
+    print(f"{'Identical after updates:':33}{identical}")
+
+if __name__ == '__main__':
+    main()
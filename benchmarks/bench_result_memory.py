@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the memory used by per-offer comparison results.
+
+Compares N offers with ComparisonEngine.compare_offers and measures, with
+tracemalloc, the memory held by the results: once with the compact
+BenefitsBreakdown and CompensationResult records, and once with the same
+results converted to the nested dictionaries compare_offers used to return.
+The JobOffer objects themselves are not counted.
+
+Usage:
+    python benchmarks/bench_result_memory.py [--offers N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+
+
+def measure(build):
+    """Return (result of build(), bytes allocated by it and still held)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def as_dicts(results):
+    """The results with the records replaced by plain dictionaries"""
+    return [
+        dict(result, benefits_value=result["benefits_value"].to_dict(),
+             compensation=result["compensation"].to_dict())
+        for result in results
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark memory used by comparison results')
+    arg_parser.add_argument('--offers', type=int, default=100000, help='Number of offers to compare')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    
+    records, record_bytes = measure(lambda: list(engine.compare_offers_iter(offers)))
+    dicts, dict_bytes = measure(lambda: as_dicts(engine.compare_offers_iter(offers)))
+    
+    print(f"{'Offers:':28}{args.offers:,}")
+    print(f"{'Nested dictionaries:':28}{dict_bytes / args.offers:,.0f} bytes per offer")
+    print(f"{'Slotted records:':28}{record_bytes / args.offers:,.0f} bytes per offer "
+          f"({1 - record_bytes / dict_bytes:.0%} less)")
+    print(f"{'Identical values:':28}{records == dicts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark for re-scoring offers with changing weights.
+
+Compares N offers with compare_batch, prepares an OfferScorer over a set of
+metrics once with get_batch_scorer, then scores every offer with a series
+of random weights, as when weights are tuned interactively. Each re-score
+is timed alone and together with selecting the top K offers and their
+per-metric contributions, and compared with a per-offer Python loop over
+the compare_offers results for the first set of weights.
+
+Usage:
+    python benchmarks/bench_scoring.py [--offers N] [--rescores R] [--top-k K]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine, OFFER_METRICS
+from offer_batch import OfferBatch, top_k_indices
+
+METRICS = ['take_home_pay', 'benefits_value', 'cost_of_living_adjusted', 'paid_days_off',
+           'total_weekly_hours', 'annual_commute_cost']
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def python_scores(results, weights):
+    """Min-max normalized weighted scores with a loop over the per-offer results"""
+    scores = [0.0] * len(results)
+    for metric, weight in weights.items():
+        _, higher_is_better, getter, _ = OFFER_METRICS[metric]
+        values = [getter(result) if higher_is_better else -getter(result) for result in results]
+        low, high = min(values), max(values)
+        spread = high - low if high > low else 1.0
+        for i, value in enumerate(values):
+            scores[i] += weight * (value - low) / spread
+    return scores
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark weighted scoring')
+    arg_parser.add_argument('--offers', type=int, default=1000000, help='Number of offers to score')
+    arg_parser.add_argument('--rescores', type=int, default=20, help='Number of weight changes to score')
+    arg_parser.add_argument('--top-k', type=int, default=20, help='Number of best offers to break down')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    engine.add_offers(offers)
+    batch = OfferBatch(offers)
+    columns = engine.compare_batch(batch)
+    
+    scorer, build_time = timed(engine.get_batch_scorer, batch, columns, METRICS)
+    rng = random.Random(0)
+    weight_sets = [{metric: rng.uniform(0, 5) for metric in METRICS} for _ in range(args.rescores)]
+    
+    score_time = top_time = 0.0
+    for weights in weight_sets:
+        scores, seconds = timed(scorer.score, weights)
+        score_time += seconds
+        start = time.perf_counter()
+        indices = top_k_indices(scores, args.top_k)
+        scorer.contributions(weights, indices)
+        top_time += time.perf_counter() - start
+    
+    results = engine.compare_offers()
+    expected, loop_time = timed(python_scores, results, weight_sets[0])
+    scores = scorer.score(weight_sets[0]).tolist()
+    matches = max(abs(a - b) for a, b in zip(scores, expected)) < 1e-9
+    
+    print(f"{'Offers:':36}{args.offers:,}")
+    print(f"{'Metrics:':36}{len(METRICS)}")
+    print(f"{'Scorer build (once):':36}{build_time:.3f}s")
+    print(f"{'Per re-score, vectorized:':36}{score_time / args.rescores * 1000:.1f}ms")
+    print(f"{'Per re-score with top ' + str(args.top_k) + ':':36}"
+          f"{(score_time + top_time) / args.rescores * 1000:.1f}ms")
+    print(f"{'Per re-score, Python loop:':36}{loop_time * 1000:.1f}ms "
+          f"({loop_time / (score_time / args.rescores):.0f}x)")
+    print(f"{'Matches the Python loop:':36}{matches}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Monte Carlo simulation of offers.
+
+Simulates N offers with D draws each through ComparisonEngine.simulate_batch
+(one broadcast batch computation per chunk of offers) and, for a few
+offers, compares it with a loop that rebuilds each drawn offer and runs
+compare_offer on it.
+
+Usage:
+    python benchmarks/bench_simulation.py [--offers N] [--draws D] [--loop-offers L]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+from offer_batch import OfferBatch
+from simulation import UncertaintyModel, sample_overrides
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def simulate_in_loop(engine, offers, draws, seed):
+    """Mean total annual value of each offer, comparing every draw as its own JobOffer"""
+    batch = OfferBatch(offers)
+    overrides = sample_overrides(batch, UncertaintyModel(), draws, np.random.default_rng(seed))
+    means = []
+    for i, offer in enumerate(offers):
+        total = 0.0
+        for draw in range(draws):
+            drawn = copy.deepcopy(offer)
+            for column, values in overrides.items():
+                value = values[i, min(draw, values.shape[1] - 1)].item()
+                target = drawn.benefits if column == 'equity_value' else drawn
+                setattr(target, column, value)
+            total += engine.compare_offer(drawn)["compensation"]["total_annual_value"]
+        means.append(total / draws)
+    return means
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark Monte Carlo simulation')
+    arg_parser.add_argument('--offers', type=int, default=1000, help='Number of offers to simulate')
+    arg_parser.add_argument('--draws', type=int, default=10000, help='Number of draws per offer')
+    arg_parser.add_argument('--loop-offers', type=int, default=5, help='Number of offers to simulate in a loop')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    batch = OfferBatch(offers)
+    
+    summary, batch_time = timed(engine.simulate_batch, batch, args.draws, seed=1)
+    
+    loop_offers = offers[:args.loop_offers]
+    loop_means, loop_time = timed(simulate_in_loop, engine, loop_offers, args.draws, 2)
+    # Same draws as the loop, through the batched computation
+    loop_batch = OfferBatch(loop_offers)
+    overrides = sample_overrides(loop_batch, UncertaintyModel(), args.draws, np.random.default_rng(2))
+    simulated = loop_batch.broadcast(overrides, (args.draws,))
+    values = np.broadcast_to(engine.compare_batch(simulated)["compensation"]["total_annual_value"],
+                             (len(loop_offers), args.draws))
+    matches = np.allclose(values.mean(axis=1), loop_means, rtol=1e-12)
+    
+    draws_per_second = args.offers * args.draws / batch_time
+    loop_per_draw = loop_time / (len(loop_offers) * args.draws)
+    print(f"{'Offers x draws:':32}{args.offers:,} x {args.draws:,}")
+    print(f"{'simulate_batch:':32}{batch_time:.3f}s ({draws_per_second / 1e6:.1f}M draws/s)")
+    print(f"{'Loop over JobOffer draws:':32}{loop_per_draw * 1e6:.1f}us per draw "
+          f"({loop_per_draw * draws_per_second:.0f}x slower)")
+    print(f"{'Loop matches batch:':32}{matches}")
+    bands = summary['total_annual_value']['percentiles']
+    print(f"{'Median 5-95% band of value:':32}{np.median(bands[:, -1] - bands[:, 0]):,.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark for converting spreadsheet data to JobOffer objects.
+
+Compares the column-wise conversion in SpreadsheetParser._dataframe_to_job_offers
+with the row-by-row conversion (iterrows + row_to_job_offer below) it replaced.
+
+Usage:
+    python benchmarks/bench_spreadsheet_parser.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from commute_calculator import DriveType
+from job_offer import JobOffer, Benefits, CommuteCalculationType, CompensationType, EmploymentType, WorkLocationType
+from spreadsheet_parser import (SpreadsheetParser, BENEFITS_COLUMNS, COMMUTE_CALC_TYPES, COMPENSATION_TYPES,
+                                DRIVE_TYPES, EMPLOYMENT_TYPES, JOB_OFFER_COLUMNS, TRUE_STRINGS, WORK_LOCATION_TYPES)
+
+
+def get_value(row: pd.Series, column: str, kind: str, default):
+    """Convert one cell of a row the way the row-by-row converter did"""
+    if column not in row or pd.isna(row[column]):
+        return default
+    value = row[column]
+    if kind == 'bool':
+        if isinstance(value, str):
+            return value.lower() in TRUE_STRINGS
+        return bool(value) if isinstance(value, (bool, int, float)) else default
+    if kind == 'str':
+        return str(value)
+    try:
+        return float(value) if kind == 'float' else int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def row_to_job_offer(row: pd.Series) -> JobOffer:
+    """Convert one row to a JobOffer, as SpreadsheetParser did before the column-wise conversion"""
+    def enum_value(column, mapping, default):
+        return mapping.get(str(row[column]).strip().upper(), default)
+    
+    if 'commute_drive_type' not in row or pd.isna(row['commute_drive_type']):
+        drive_type = None
+    else:
+        drive_type = enum_value('commute_drive_type', DRIVE_TYPES, DriveType.MIXED)
+    if 'commute_calc_type' not in row or pd.isna(row['commute_calc_type']):
+        if get_value(row, 'commute_distance_miles', 'float', 0.0) > 0:
+            calc_type = CommuteCalculationType.DISTANCE_BASED
+        else:
+            calc_type = CommuteCalculationType.DIRECT
+    else:
+        calc_type = enum_value('commute_calc_type', COMMUTE_CALC_TYPES, CommuteCalculationType.DIRECT)
+    
+    return JobOffer(
+        title=str(row['title']),
+        company=str(row['company']),
+        location=str(row['location']),
+        work_location_type=enum_value('work_location_type', WORK_LOCATION_TYPES, WorkLocationType.ONSITE),
+        employment_type=enum_value('employment_type', EMPLOYMENT_TYPES, EmploymentType.W2),
+        compensation_type=enum_value('compensation_type', COMPENSATION_TYPES, CompensationType.SALARY),
+        base_compensation=float(row['base_compensation']),
+        benefits=Benefits(**{name: get_value(row, name, kind, default)
+                             for name, kind, default in BENEFITS_COLUMNS}),
+        commute_drive_type=drive_type,
+        commute_calc_type=calc_type,
+        expected_hours_per_week=get_value(row, 'hours_per_week', 'float', 40.0),
+        **{name: get_value(row, name, kind, default) for name, kind, default in JOB_OFFER_COLUMNS}
+    )
+
+
+def build_frame(parser: SpreadsheetParser, rows: int) -> pd.DataFrame:
+    """Build a frame of the given size by repeating the template rows"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, 'template.csv')
+        parser.create_template_file(template_path)
+        template = pd.read_csv(template_path)
+        
+        repeats = rows // len(template) + 1
+        df = pd.concat([template] * repeats, ignore_index=True).iloc[:rows]
+        df['base_compensation'] = df['base_compensation'] + (df.index % 1000)
+        
+        # Round-trip through CSV so the frame has the same layout as a real import
+        offers_path = os.path.join(tmp_dir, 'offers.csv')
+        df.to_csv(offers_path, index=False)
+        return pd.read_csv(offers_path)
+
+
+def time_call(func, *args):
+    """Return (elapsed seconds, result) for a single call"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark spreadsheet row conversion')
+    arg_parser.add_argument('--rows', type=int, default=20000, help='Number of offer rows')
+    args = arg_parser.parse_args()
+    
+    parser = SpreadsheetParser()
+    df = build_frame(parser, args.rows)
+    
+    def row_wise(frame):
+        return [row_to_job_offer(row) for _, row in frame.iterrows()]
+    
+    row_time, row_offers = time_call(row_wise, df)
+    column_time, column_offers = time_call(parser._dataframe_to_job_offers, df)
+    
+    same = all(vars(a) == vars(b) for a, b in zip(row_offers, column_offers))
+    
+    print(f"Rows:              {args.rows:,}")
+    print(f"Row-wise:          {row_time:.3f}s")
+    print(f"Column-wise:       {column_time:.3f}s")
+    print(f"Speedup:           {row_time / column_time:.1f}x")
+    print(f"Identical results: {same}")
+
+
+if __name__ == '__main__':
+    main()
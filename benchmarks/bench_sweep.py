@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark for what-if parameter sweeps.
+
+Evaluates N offers for every combination of tenure (2, 3, 5 years),
+commute days (1 to 5) and fuel cost ($3 to $5) with
+ComparisonEngine.sweep_offers, one broadcast computation per chunk of
+offers, and compares it with building a modified JobOffer for every
+combination and comparing it with compare_offer, for a few offers.
+
+Usage:
+    python benchmarks/bench_sweep.py [--offers N] [--loop-offers L]
+"""
+
+import argparse
+import copy
+import itertools
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_offer_batch import make_offers
+from comparison_engine import ComparisonEngine
+
+GRID = {
+    "expected_tenure_years": [2, 3, 5],
+    "commute_days_per_week": [1, 2, 3, 4, 5],
+    "commute_details_fuel_cost_per_gallon": [3.0, 3.5, 4.0, 4.5, 5.0],
+}
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def sweep_in_loop(engine, offers):
+    """Total annual value of each offer and grid cell, from a modified copy of the offer per cell"""
+    values = []
+    for offer in offers:
+        for tenure, days, fuel_cost in itertools.product(*GRID.values()):
+            changed = copy.deepcopy(offer)
+            changed.expected_tenure_years = tenure
+            changed.commute_days_per_week = days
+            changed.commute_details.fuel_cost_per_gallon = fuel_cost
+            values.append(engine.compare_offer(changed)["compensation"]["total_annual_value"])
+    return values
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark what-if parameter sweeps')
+    arg_parser.add_argument('--offers', type=int, default=10000, help='Number of offers to sweep')
+    arg_parser.add_argument('--loop-offers', type=int, default=20, help='Number of offers to sweep in a loop')
+    args = arg_parser.parse_args()
+    
+    offers = make_offers(args.offers)
+    engine = ComparisonEngine()
+    
+    result, sweep_time = timed(engine.sweep_offers, GRID, offers=offers)
+    expected, loop_time = timed(sweep_in_loop, engine, offers[:args.loop_offers])
+    cells = result.values["total_annual_value"]
+    
+    evaluations = cells.size
+    loop_per_cell = loop_time / len(expected)
+    print(f"{'Offers x grid cells:':30}{args.offers:,} x {cells[0].size}")
+    print(f"{'sweep_offers:':30}{sweep_time:.3f}s ({evaluations / sweep_time / 1e6:.1f}M cells/s)")
+    print(f"{'Loop over modified offers:':30}{loop_per_cell * 1e6:.1f}us per cell "
+          f"({loop_per_cell * evaluations / sweep_time:.0f}x slower)")
+    print(f"{'Identical:':30}{cells[:args.loop_offers].ravel().tolist() == expected}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Break-even values of an offer field for a metric
+
+The break-even value answers questions like "what base salary would make
+offer B worth as much as offer A?": the value of one field of an offer at
+which one of its metrics equals a target.
+
+Every metric of OFFER_METRICS is a simple function of each field between a
+few known points. Federal tax is piecewise linear in the base salary, with
+a kink at each bracket bound; state and local taxes are flat rates; Social
+Security stops at its wage base, the additional Medicare tax starts at a
+threshold, and the retirement match stops at its limit. Between these
+salaries, the metric times the field's value is a quadratic in the field
+(exactly: a rational function for take-home pay, whose tax is a share of
+gross income, or for values divided by the field, like the amortized
+signing bonus). So each segment between kinks is fitted exactly from three
+evaluations and solved in closed form, for every target at once.
+
+Every closed-form solution is checked by evaluating the metric there.
+Where that fails (fields with kinks the solver does not know about, such as
+an insurance premium above the coverage), the metric is sampled across the
+bounds and the first sampled interval where it crosses the target is
+bisected.
+"""
+
+import math
+from typing import Callable, Tuple
+
+import numpy as np
+
+from offer_batch import OfferBatch
+from tax_calculator import TaxCalculator
+
+
+# Income above which the additional Medicare tax applies, as in TaxCalculator
+ADDITIONAL_MEDICARE_THRESHOLD = 200000
+
+# Default search bounds: 0 to this many times an offer's current value of the field (at least 1)
+DEFAULT_BOUND_FACTOR = 10
+
+# Pairs (offers x targets) solved at once, bounding the size of temporary arrays
+BREAK_EVEN_CHUNK_SIZE = 1 << 20
+
+# A value is a break-even value if the metric is within this share of the target (or of 1)
+BREAK_EVEN_TOLERANCE = 1e-9
+
+# Bisection steps of the fallback; enough to narrow any float64 interval to adjacent values
+BISECTION_STEPS = 64
+
+# Positions of the evaluations in each segment, from -1 (start) to 1 (end): the
+# middle three fit the quadratic, and all five are the fallback's samples
+_SEGMENT_SAMPLES = np.array([-1 + 1e-9, -0.5, 0.0, 0.5, 1 - 1e-9])
+
+# Roots this close to 0, relative to the segment's half width, count as 0
+_ZERO_ROOT = 1e-6
+
+
+def field_breakpoints(batch: OfferBatch, field: str, tax_calculator: TaxCalculator) -> np.ndarray:
+    """
+    Values of a field at which an offer's tax or benefit formulas change slope
+    
+    These are the salaries of the federal bracket bounds, the Social Security
+    wage base, the additional Medicare threshold and the end of the
+    retirement match, converted to values of the field through the base
+    salary (which is linear in every field). Fields that do not change the
+    base salary have no breakpoints.
+    
+    Args:
+        batch: Offers to solve for
+        field: Column of the batch being solved for
+        tax_calculator: TaxCalculator providing brackets and thresholds
+    
+    Returns:
+        Array of shape (offers, breakpoints), NaN where an offer's base
+        salary does not depend on the field
+    """
+    salaries = {bound for lower, upper, _ in tax_calculator.federal_brackets
+                for bound in (lower, upper) if math.isfinite(bound)}
+    salaries.update((tax_calculator.social_security_wage_base, ADDITIONAL_MEDICARE_THRESHOLD))
+    salaries = np.broadcast_to(np.array(sorted(salaries), dtype=np.float64), (len(batch), len(salaries)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        match_end = np.where(batch.retirement_match_percent != 0,
+                             batch.retirement_match_limit / batch.retirement_match_percent, np.nan)
+    salaries = np.concatenate((salaries, match_end[:, None]), axis=1)
+    
+    # Base salary at field values 0 and 1 gives the line salary = start + slope * value
+    ends = np.broadcast_to(batch.broadcast({field: np.array([[0.0, 1.0]])}, (2,)).base_salary, (len(batch), 2))
+    slope = ends[:, 1] - ends[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(slope[:, None] != 0, (salaries - ends[:, :1]) / slope[:, None], np.nan)
+
+
+def solve_break_even(evaluate: Callable[[OfferBatch, np.ndarray], np.ndarray], batch: OfferBatch,
+                     targets: np.ndarray, bounds: Tuple, breakpoints: np.ndarray) -> np.ndarray:
+    """
+    Values of a field at which each offer's metric equals each target
+    
+    Args:
+        evaluate: Function of a batch and an array of field values of shape
+                  (offers, k), returning the metric at each value
+        batch: Offers to solve for
+        targets: Target values of the metric
+        bounds: Lowest and highest field value to consider, each a number
+                or an array with one value per offer
+        breakpoints: Field values where the metric may change slope, per
+                     offer, as returned by field_breakpoints
+    
+    Returns:
+        Array of shape (offers, targets), NaN where the metric does not
+        reach the target within the bounds. If it reaches the target more
+        than once, the smallest value found is returned.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    low, high = (np.broadcast_to(np.asarray(bound, dtype=np.float64), (len(batch),))[:, None] for bound in bounds)
+    result = np.empty((len(batch), len(targets)))
+    if not result.size:
+        return result
+    chunk_size = max(1, BREAK_EVEN_CHUNK_SIZE // max(len(targets), 1))
+    for start in range(0, len(batch), chunk_size):
+        chunk = batch[start:start + chunk_size]
+        chunk_low, chunk_high = low[start:start + chunk_size], high[start:start + chunk_size]
+        inside = breakpoints[start:start + chunk_size]
+        inside = np.clip(np.where(np.isnan(inside), chunk_low, inside), chunk_low, chunk_high)
+        edges = np.sort(np.concatenate((chunk_low, inside, chunk_high), axis=1), axis=1)
+        result[start:start + chunk_size] = _solve_chunk(evaluate, chunk, targets, edges)
+    return result
+
+
+def _solve_chunk(evaluate, batch: OfferBatch, targets: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Closed-form solutions per segment between edges, checked, with the fallback where they fail"""
+    centers = (edges[:, 1:] + edges[:, :-1]) / 2
+    halves = (edges[:, 1:] - edges[:, :-1]) / 2
+    positions = centers[:, :, None] + halves[:, :, None] * _SEGMENT_SAMPLES
+    # Empty segments (breakpoints outside the bounds or repeated) are left out
+    empty = halves == 0
+    positions[empty] = np.nan
+    samples = np.array(evaluate(batch, positions.reshape(len(batch), -1)).reshape(positions.shape))
+    samples[empty] = np.nan
+    
+    # x * metric(x) = A u^2 + B u + C in the segment's coordinate u = (x - center) / half,
+    # from its values at u = -1/2, 0 and 1/2
+    products = positions[:, :, 1:4] * samples[:, :, 1:4]
+    quadratic = 2 * (products[:, :, 2] + products[:, :, 0] - 2 * products[:, :, 1])
+    linear = products[:, :, 2] - products[:, :, 0]
+    constant = products[:, :, 1]
+    
+    # The fit is exact where it also gives the products at the segment's ends;
+    # solutions in the other segments are checked by evaluating the metric
+    ends = _SEGMENT_SAMPLES[[0, -1]]
+    predicted = quadratic[:, :, None] * ends ** 2 + linear[:, :, None] * ends + constant[:, :, None]
+    end_products = positions[:, :, [0, -1]] * samples[:, :, [0, -1]]
+    scale = np.maximum(np.abs(products).max(axis=2), 1)[:, :, None]
+    exact = (np.abs(predicted - end_products) <= BREAK_EVEN_TOLERANCE * scale).all(axis=2)
+    
+    # x * metric(x) = x * target, solved in every segment from the left for the
+    # targets within the range sampled in it; the first root wins. x = 0 solves
+    # it for any target, so roots at 0 are dropped
+    lowest, highest = samples.min(axis=2), samples.max(axis=2)
+    margin = 1e-6 * (highest - lowest)
+    solutions = np.full((len(batch), len(targets)), np.nan)
+    unchecked_rows = np.zeros(len(batch), dtype=bool)
+    for segment in np.flatnonzero((halves > 0).any(axis=0)):
+        rows, columns = np.nonzero(np.isnan(solutions)
+                                   & (targets >= (lowest - margin)[:, segment, None])
+                                   & (targets <= (highest + margin)[:, segment, None]))
+        pair_targets = targets[columns]
+        center, half = centers[rows, segment], halves[rows, segment]
+        smallest = np.full(len(rows), np.nan)
+        for u in _roots_in_unit_interval(quadratic[rows, segment],
+                                         linear[rows, segment] - pair_targets * half,
+                                         constant[rows, segment] - pair_targets * center):
+            x = center + half * u
+            smallest = np.fmin(smallest, np.where(np.abs(x) > _ZERO_ROOT * half, x, np.nan))
+        solutions[rows, columns] = smallest
+        unchecked_rows[rows[~exact[rows, segment] & ~np.isnan(smallest)]] = True
+    
+    check = np.flatnonzero(unchecked_rows)
+    if len(check):
+        wrong = ~_within_tolerance(evaluate(batch[check], solutions[check]), targets)
+        solutions[check] = np.where(wrong, np.nan, solutions[check])
+    
+    # Fallback for targets within the sampled range of the metric that were not solved
+    points = positions.reshape(len(batch), -1)
+    values = samples.reshape(len(batch), -1)
+    with np.errstate(invalid='ignore'):
+        in_range = (targets >= np.nanmin(values, axis=1, keepdims=True)) & \
+            (targets <= np.nanmax(values, axis=1, keepdims=True))
+    rows, columns = np.nonzero(np.isnan(solutions) & in_range)
+    pairs_per_chunk = max(1, BREAK_EVEN_CHUNK_SIZE // points.shape[1])
+    for start in range(0, len(rows), pairs_per_chunk):
+        pair_rows, pair_columns = rows[start:start + pairs_per_chunk], columns[start:start + pairs_per_chunk]
+        solutions[pair_rows, pair_columns] = _bisect(evaluate, batch, pair_rows, targets[pair_columns],
+                                                     points[pair_rows], values[pair_rows])
+    return solutions
+
+
+def _roots_in_unit_interval(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Both roots of a u^2 + b u + c = 0, NaN unless in [-1, 1]
+    
+    Uses the numerically stable pair q / a and c / q, which also gives the
+    root of the linear equation when a is (nearly) zero.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = -0.5 * (b + np.copysign(np.sqrt(b * b - 4 * a * c), b))
+        roots = (q / a, c / q)
+    # Roots on the ends are moved just inside, where the metric is evaluated
+    slack = 1e-9
+    return tuple(np.where((root >= -1 - slack) & (root <= 1 + slack),
+                          np.clip(root, _SEGMENT_SAMPLES[0], _SEGMENT_SAMPLES[-1]), np.nan)
+                 for root in roots)
+
+
+def _within_tolerance(values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Whether metric values are close enough to their targets to count as equal"""
+    return np.abs(values - targets) <= BREAK_EVEN_TOLERANCE * np.maximum(np.abs(targets), 1)
+
+
+def _bisect(evaluate, batch: OfferBatch, rows: np.ndarray, targets: np.ndarray,
+            points: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Bisect the first sampled interval where each pair's metric crosses its target
+    
+    Args:
+        evaluate: As for solve_break_even
+        batch: Offers being solved for
+        rows: Offer of each pair
+        targets: Target of each pair
+        points: Sampled field values of each pair's offer, in ascending order
+        values: Metric at the sampled points
+    
+    Returns:
+        Break-even value of each pair, NaN where there is no crossing or the
+        crossing is a jump of the metric rather than a root
+    """
+    differences = values - targets[:, None]
+    with np.errstate(invalid='ignore'):
+        crossing = differences[:, :-1] * differences[:, 1:] <= 0
+    has_crossing = crossing.any(axis=1)
+    first = crossing.argmax(axis=1)
+    
+    pairs = np.arange(len(rows))
+    low, high = points[pairs, first], points[pairs, first + 1]
+    low_sign = np.sign(differences[pairs, first])
+    pair_batch = batch[rows]
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2
+        same_side = np.sign(evaluate(pair_batch, middle[:, None])[:, 0] - targets) == low_sign
+        low = np.where(same_side, middle, low)
+        high = np.where(same_side, high, middle)
+    
+    solutions = np.where(low_sign == 0, low, (low + high) / 2)
+    found = has_crossing & _within_tolerance(evaluate(pair_batch, solutions[:, None])[:, 0], targets)
+    return np.where(found, solutions, np.nan)
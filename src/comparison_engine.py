@@ -1,15 +1,277 @@
 """
 Job offer comparison engine that analyzes multiple job offers and provides comparison metrics.
 """
+import heapq
 import json
+import math
 import os
 import pickle
-from typing import Dict, List, Optional
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
 
 from benefits_calculator import BenefitsCalculator
 from tax_calculator import TaxCalculator
-from job_offer import JobOffer, CommuteCalculationType, WorkLocationType, CompensationType, EmploymentType, Benefits
+from job_offer import (JobOffer, CommuteCalculationType, WorkLocationType, CompensationType, EmploymentType, Benefits,
+                       CommuteDetails)
 from commute_calculator import CommuteCalculator, DriveType
+from comparison_result import BenefitsBreakdown, CompensationResult
+from offer_index import OfferIndex, find_duplicates
+from ranking_index import RankingIndex
+
+if TYPE_CHECKING:
+    import numpy as np
+    from delta_matrix import DeltaMatrix
+    from offer_batch import OfferBatch
+    from scoring import OfferScorer
+    from simulation import UncertaintyModel
+    from sweep import SweepResult
+
+# Chunks handed to each worker process by compare_offers(workers=...), so
+# faster workers pick up more of the work
+CHUNKS_PER_WORKER = 4
+
+# Below this many offers per chunk, comparing in worker processes costs more than it saves
+MIN_OFFERS_PER_CHUNK = 2000
+
+# Ranking criteria as (key, label, description), in the order get_rankings returns them
+RANKING_CRITERIA = [
+    ("total_annual_value", "Total Annual Value",
+     "Total annual value including salary, bonuses, and benefits"),
+    ("take_home_pay", "Take-Home Pay",
+     "Annual take-home pay after taxes and deductions"),
+    ("hourly_rate", "Effective Hourly Rate",
+     "Effective hourly rate based on total compensation and hours worked"),
+    ("benefits_value", "Benefits Value",
+     "Total annual value of all benefits"),
+    ("cost_of_living_adjusted", "Cost of Living Adjusted Value",
+     "Total annual value adjusted for local cost of living"),
+]
+
+
+# Offer metrics for Pareto frontiers and weighted scores, as key: (label,
+# whether larger is better, value of a comparison result, values of an
+# OfferBatch from its compare_batch arrays)
+OFFER_METRICS = {
+    "total_annual_value": (
+        "Total Annual Value", True,
+        lambda result: result["compensation"]["total_annual_value"],
+        lambda batch, columns: columns["compensation"]["total_annual_value"]),
+    "take_home_pay": (
+        "Take-Home Pay", True,
+        lambda result: result["compensation"]["take_home_pay"],
+        lambda batch, columns: columns["compensation"]["take_home_pay"]),
+    "hourly_rate": (
+        "Effective Hourly Rate", True,
+        lambda result: result["compensation"]["effective_hourly_rate"],
+        lambda batch, columns: columns["compensation"]["effective_hourly_rate"]),
+    "benefits_value": (
+        "Benefits Value", True,
+        lambda result: result["benefits_value"]["total"],
+        lambda batch, columns: columns["benefits_value"]["total"]),
+    "cost_of_living_adjusted": (
+        "Cost of Living Adjusted Value", True,
+        lambda result: result["compensation"]["total_annual_value"] * (100 / result["offer"].cost_of_living_index),
+        lambda batch, columns: columns["compensation"]["total_annual_value"] * (100 / batch.cost_of_living_index)),
+    "paid_days_off": (
+        "Paid Days Off", True,
+        lambda result: (result["offer"].benefits.paid_time_off_days + result["offer"].benefits.paid_holidays
+                        + result["offer"].benefits.paid_sick_days),
+        lambda batch, columns: batch.paid_time_off_days + batch.paid_holidays + batch.paid_sick_days),
+    "total_weekly_hours": (
+        "Weekly Hours Including Commute", False,
+        lambda result: result["compensation"]["total_weekly_hours"],
+        lambda batch, columns: columns["compensation"]["total_weekly_hours"]),
+    "weekly_commute_hours": (
+        "Weekly Commute Hours", False,
+        lambda result: result["compensation"]["weekly_commute_hours"],
+        lambda batch, columns: columns["compensation"]["weekly_commute_hours"]),
+    "annual_commute_cost": (
+        "Annual Commute Cost", False,
+        lambda result: result["compensation"]["annual_commute_cost"],
+        lambda batch, columns: columns["compensation"]["annual_commute_cost"]),
+    "effective_tax_rate": (
+        "Effective Tax Rate", False,
+        lambda result: result["effective_tax_rate"],
+        lambda batch, columns: columns["effective_tax_rate"]),
+}
+
+# Scoring profile of the work-life balance recommendation, in the format of
+# scoring.ScoringProfile.from_dict: the hours of every week of the year,
+# commute included, count against an offer, and every paid day off (as 8
+# hours) for it
+WORK_LIFE_SCORING = {
+    "normalization": "none",
+    "weights": {"total_weekly_hours": 52, "paid_days_off": 8},
+}
+
+# Recommendations of get_recommendations that are the top offer of a
+# ranking, with their criterion of RANKING_CRITERIA; best_commute and
+# best_work_life_balance follow them
+RECOMMENDATION_CRITERIA = (
+    ("best_overall", "total_annual_value"),
+    ("best_take_home_pay", "take_home_pay"),
+    ("best_hourly_rate", "hourly_rate"),
+    ("best_benefits", "benefits_value"),
+    ("best_cost_adjusted", "cost_of_living_adjusted"),
+)
+
+# Metrics of get_delta_matrix by default
+DELTA_METRICS = ("take_home_pay", "total_annual_value", "weekly_commute_hours")
+
+
+def top_indices(values: List[float], top_k: Optional[int] = None) -> List[int]:
+    """
+    Indices of the largest values, largest first
+    
+    Equivalent to sorting the indices by value in descending order and
+    keeping the first top_k, with ties in index order. A heap is used when
+    top_k is smaller than the number of values.
+    
+    Args:
+        values: Values to rank
+        top_k: Number of indices to return; all if None
+        
+    Returns:
+        List of indices into values
+    """
+    if top_k is not None and top_k < len(values):
+        return heapq.nlargest(top_k, range(len(values)), key=values.__getitem__)
+    return sorted(range(len(values)), key=values.__getitem__, reverse=True)
+
+
+def work_life_score(result: Dict) -> float:
+    """
+    Score of a comparison result under WORK_LIFE_SCORING, without NumPy
+    
+    Gives the same numbers as scoring the results with the profile, whose
+    metrics are not normalized, so the recommendation and the CLI ranking
+    work where NumPy is not installed.
+    
+    Args:
+        result: Comparison result from compare_offers
+        
+    Returns:
+        Weighted paid days off minus weighted weekly hours (larger is better)
+    """
+    weights = WORK_LIFE_SCORING["weights"]
+    benefits = result["offer"].benefits
+    days_off = benefits.paid_time_off_days + benefits.paid_holidays + benefits.paid_sick_days
+    return (weights["total_weekly_hours"] * -result["compensation"]["total_weekly_hours"]
+            + weights["paid_days_off"] * days_off)
+
+
+def _ranking_values(result: Dict) -> Tuple:
+    """Values of a comparison result for each of RANKING_CRITERIA, in order"""
+    compensation = result["compensation"]
+    return (
+        compensation["total_annual_value"],
+        compensation["take_home_pay"],
+        compensation["effective_hourly_rate"],
+        result["benefits_value"]["total"],
+        # Adjust salary by cost of living index
+        compensation["total_annual_value"] * (100 / result["offer"].cost_of_living_index)
+    )
+
+
+def _build_ranking(offers: List[JobOffer], values: List[float], indices: List[int]) -> List[Dict]:
+    """Ranking entries for the offers at the given indices, in order"""
+    return [
+        {
+            "rank": rank,
+            "company": offers[i].company,
+            "title": offers[i].title,
+            "value": values[i]
+        }
+        for rank, i in enumerate(indices, 1)
+    ]
+
+
+def _check_metrics(metrics: Sequence[str]) -> None:
+    """Raise ValueError if no metrics are given or one is not a key of OFFER_METRICS"""
+    if not metrics:
+        raise ValueError("At least one metric is required")
+    unknown = [metric for metric in metrics if metric not in OFFER_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}; expected one of {', '.join(OFFER_METRICS)}")
+
+
+def _result_metric_columns(results: List[Dict], metrics: Sequence[str]) -> Dict[str, 'np.ndarray']:
+    """Array of each metric's values over the comparison results"""
+    import numpy as np
+    
+    return {
+        metric: np.fromiter(map(OFFER_METRICS[metric][2], results), dtype=np.float64, count=len(results))
+        for metric in metrics
+    }
+
+
+def _batch_metric_columns(batch: 'OfferBatch', columns: Dict, metrics: Sequence[str]) -> Dict[str, 'np.ndarray']:
+    """Array of each metric's values over a batch, from its compare_batch arrays"""
+    if "cost_of_living_adjusted" in metrics and (batch.cost_of_living_index == 0).any():
+        raise ZeroDivisionError("float division by zero")
+    return {metric: OFFER_METRICS[metric][3](batch, columns) for metric in metrics}
+
+
+def _signed_metric_points(metric_columns: Dict[str, 'np.ndarray']) -> 'np.ndarray':
+    """Points with one column per metric, negated where lower is better, so larger is always better"""
+    import numpy as np
+    
+    points = np.empty((len(next(iter(metric_columns.values()))), len(metric_columns)))
+    for column, (metric, values) in enumerate(metric_columns.items()):
+        points[:, column] = values if OFFER_METRICS[metric][1] else -values
+    return points
+
+
+def _offer_payload_fields(offer: JobOffer) -> List[str]:
+    """Attribute paths sent to worker processes for each offer, such as benefits.paid_holidays"""
+    fields = [name for name in vars(offer) if name not in ("benefits", "commute_details")]
+    fields.extend("benefits." + name for name in vars(offer.benefits))
+    fields.extend("commute_details." + name for name in vars(offer.commute_details))
+    return fields
+
+
+def _unpack_offers(fields: List[str], rows: List[Tuple]) -> Iterator[JobOffer]:
+    """Rebuild JobOffer objects from payload rows without calling __init__"""
+    offer_names = [field for field in fields if "." not in field]
+    benefits_names = [field.split(".", 1)[1] for field in fields if field.startswith("benefits.")]
+    commute_names = [field.split(".", 1)[1] for field in fields if field.startswith("commute_details.")]
+    benefits_end = len(offer_names) + len(benefits_names)
+    
+    for row in rows:
+        offer = JobOffer.__new__(JobOffer)
+        offer.__dict__.update(zip(offer_names, row))
+        offer.benefits = Benefits.__new__(Benefits)
+        offer.benefits.__dict__.update(zip(benefits_names, row[len(offer_names):benefits_end]))
+        offer.commute_details = CommuteDetails.__new__(CommuteDetails)
+        offer.commute_details.__dict__.update(zip(commute_names, row[benefits_end:]))
+        yield offer
+
+
+# Engine that compares offers in a worker process, set up once per process
+_worker_engine: Optional['ComparisonEngine'] = None
+
+
+def _init_compare_worker(tax_calculator: TaxCalculator, benefits_calculator: BenefitsCalculator,
+                         commute_calculator: CommuteCalculator) -> None:
+    """Give a worker process an engine with the parent engine's calculators"""
+    global _worker_engine
+    _worker_engine = ComparisonEngine()
+    _worker_engine.tax_calculator = tax_calculator
+    _worker_engine.benefits_calculator = benefits_calculator
+    _worker_engine.commute_calculator = commute_calculator
+
+
+def _compare_chunk_in_worker(chunk: Tuple[List[str], List[Tuple]]) -> List[Tuple]:
+    """Compare a chunk of offer payload rows and return (tax rate, benefits, compensation) value tuples"""
+    packed_results = []
+    for offer in _unpack_offers(*chunk):
+        result = _worker_engine.compare_offer(offer)
+        packed_results.append((
+            result["effective_tax_rate"],
+            result["benefits_value"].as_tuple(),
+            result["compensation"].as_tuple()
+        ))
+    return packed_results
 
 
 class ComparisonEngine:
@@ -27,15 +289,63 @@ class ComparisonEngine:
         self.benefits_calculator = BenefitsCalculator()
         self.tax_calculator = TaxCalculator()
         self.commute_calculator = CommuteCalculator()
+        
+        # Comparison results of unchanged offers, keyed by id(offer); each
+        # result keeps a reference to its offer, so the id stays unique
+        self._results: Dict[int, Dict] = {}
+        self._calculator_config: Optional[bytes] = None
+        
+        # Every position in job_offers has a slot number, increasing in list
+        # order, which breaks ties in the ranking indexes
+        self._slots: List[int] = []
+        self._slot_offers: Dict[int, JobOffer] = {}
+        self._next_slot = 0
+        
+        # Sorted (-value, slot) keys per ranking criterion, built on first use
+        # and then updated only for the slots changed since the last query
+        self._ranking_indexes: Optional[Dict[str, RankingIndex]] = None
+        self._ranked_slots: Dict[int, Tuple] = {}
+        self._dirty_slots: Set[int] = set()
+        self._ranking_config: Optional[bytes] = None
+        self._ranked_offers: Optional[List[JobOffer]] = None
+        
+        # Contents of the offers by slot while deduplication is enabled
+        self._duplicate_index: Optional[OfferIndex] = None
     
-    def add_offer(self, offer: JobOffer) -> None:
+    def add_offer(self, offer: JobOffer) -> bool:
         """
         Add a job offer to the comparison
         
         Args:
             offer: JobOffer object to add
+            
+        Returns:
+            False if deduplication is enabled and the offer duplicates one
+            already in the comparison, so it was not added; True otherwise
         """
+        if (self._duplicate_index is not None
+                and self._duplicate_index.add_unique(self._next_slot, offer) is not None):
+            return False
+        self._results.pop(id(offer), None)
         self.job_offers.append(offer)
+        slot = self._next_slot
+        self._next_slot += 1
+        self._slots.append(slot)
+        self._set_slot_offer(slot, offer)
+        return True
+    
+    def add_offers(self, offers: Iterable[JobOffer]) -> int:
+        """
+        Add several job offers to the comparison
+        
+        Args:
+            offers: Iterable of JobOffer objects to add
+            
+        Returns:
+            Number of offers added, which is less than given if deduplication
+            skipped duplicates
+        """
+        return sum(self.add_offer(offer) for offer in offers)
     
     def update_offer(self, index: int, offer: JobOffer) -> None:
         """
@@ -46,7 +356,13 @@ class ComparisonEngine:
             offer: New JobOffer object to replace existing one
         """
         if 0 <= index < len(self.job_offers):
+            # Passing the same, modified offer also refreshes its result
+            self._results.pop(id(self.job_offers[index]), None)
+            self._results.pop(id(offer), None)
             self.job_offers[index] = offer
+            self._set_slot_offer(self._slots[index], offer)
+            if self._duplicate_index is not None:
+                self._duplicate_index.add(self._slots[index], offer)
     
     def remove_offer(self, index: int) -> None:
         """
@@ -56,11 +372,120 @@ class ComparisonEngine:
             index: Index of offer to remove
         """
         if 0 <= index < len(self.job_offers):
-            self.job_offers.pop(index)
+            self._results.pop(id(self.job_offers.pop(index)), None)
+            self._set_slot_offer(self._slots.pop(index), None)
+    
+    def remove_offers(self, offers: Iterable[JobOffer]) -> None:
+        """
+        Remove specific job offer objects from the comparison
+        
+        Args:
+            offers: JobOffer objects to remove, matched by identity
+        """
+        offer_ids = {id(offer) for offer in offers}
+        if offer_ids:
+            self._remove_positions({index for index, offer in enumerate(self.job_offers) if id(offer) in offer_ids})
+    
+    def _remove_positions(self, positions: Set[int]) -> None:
+        """Remove the offers at some positions in one pass over the offers"""
+        job_offers, slots = [], []
+        for index, (offer, slot) in enumerate(zip(self.job_offers, self._slots)):
+            if index in positions:
+                self._set_slot_offer(slot, None)
+                self._results.pop(id(offer), None)
+            else:
+                job_offers.append(offer)
+                slots.append(slot)
+        if self._ranked_offers is self.job_offers:
+            self._ranked_offers = job_offers
+        self.job_offers, self._slots = job_offers, slots
     
     def clear_offers(self) -> None:
         """Remove all job offers from the comparison"""
         self.job_offers = []
+        self._results.clear()
+        self._slots = []
+        self._slot_offers.clear()
+        self._ranking_indexes = None
+        if self._duplicate_index is not None:
+            self._duplicate_index = OfferIndex(self._duplicate_index.tolerance)
+    
+    def enable_deduplication(self, tolerance: Optional[float] = None) -> None:
+        """
+        Skip offers that duplicate an offer in the comparison when adding them
+        
+        Offers already in the comparison are kept, duplicates included (see
+        remove_duplicate_offers). Offers modified in place afterwards must be
+        passed to update_offer for their duplicates to be recognized.
+        
+        Args:
+            tolerance: Fraction by which the base compensations of offers with
+                       the same company, title and compensation type may
+                       differ to count as duplicates, e.g. 0.02; None to skip
+                       exact duplicates only
+            
+        Raises:
+            ValueError: If the tolerance is not in [0, 1)
+        """
+        duplicate_index = OfferIndex(tolerance)
+        for slot, offer in zip(self._slots, self.job_offers):
+            duplicate_index.add(slot, offer)
+        self._duplicate_index = duplicate_index
+    
+    def disable_deduplication(self) -> None:
+        """Add every offer again, duplicates included"""
+        self._duplicate_index = None
+    
+    def find_duplicate_offers(self, tolerance: Optional[float] = None) -> List[Optional[int]]:
+        """
+        Find the offers in the comparison that duplicate an earlier offer
+        
+        Args:
+            tolerance: Fraction by which base compensations of near duplicates
+                       may differ, as for enable_deduplication; None for exact
+                       duplicates only
+            
+        Returns:
+            For each offer, the index of the earlier offer it duplicates, or
+            None if it is the first of its kind
+        """
+        return find_duplicates(self.job_offers, tolerance)
+    
+    def remove_duplicate_offers(self, tolerance: Optional[float] = None) -> int:
+        """
+        Remove the offers that duplicate an earlier offer, keeping the first
+        
+        Args:
+            tolerance: As for find_duplicate_offers
+            
+        Returns:
+            Number of offers removed
+        """
+        duplicates = {index for index, original in enumerate(self.find_duplicate_offers(tolerance))
+                      if original is not None}
+        if duplicates:
+            self._remove_positions(duplicates)
+        return len(duplicates)
+    
+    def _set_slot_offer(self, slot: int, offer: Optional[JobOffer]) -> None:
+        """Record the offer in a slot (None when removed) and mark it for re-ranking"""
+        if offer is None:
+            self._slot_offers.pop(slot, None)
+        else:
+            self._slot_offers[slot] = offer
+        if self._ranking_indexes is not None:
+            self._dirty_slots.add(slot)
+        if offer is None and self._duplicate_index is not None:
+            self._duplicate_index.discard(slot)
+    
+    def clear_results_cache(self) -> None:
+        """
+        Forget all memoized comparison results
+        
+        Needed after modifying offers in place without passing them to
+        update_offer; calculator configuration changes are detected automatically.
+        """
+        self._results.clear()
     
     def save_offers(self) -> None:
         """Save job offers to file"""
@@ -138,7 +563,7 @@ class ComparisonEngine:
             with open(self.data_file, 'rb') as f:
                 serialized_offers = pickle.load(f)
             
-            self.job_offers = []
+            self.clear_offers()
             
             for offer_dict in serialized_offers:
                 # Map string values back to enums
@@ -209,7 +634,7 @@ class ComparisonEngine:
                     expected_tenure_years=offer_dict.get('expected_tenure_years', 3)
                 )
                 
-                self.job_offers.append(offer)
+                self.add_offer(offer)
             
             return True
         except Exception as e:
@@ -286,183 +711,949 @@ class ComparisonEngine:
             salary=offer.base_salary
         )
     
-    def compare_offers(self) -> List[Dict]:
+    def compare_offers(self, workers: Optional[int] = None) -> List[Dict]:
         """
         Compare job offers and return detailed analysis
         
+        Results are memoized per offer and only recomputed for offers passed
+        to add_offer, update_offer or remove_offer since the last call, or
+        for all offers when the calculator configuration has changed. The
+        result dictionaries are shared between calls and should not be modified.
+        
+        Args:
+            workers: Number of worker processes for the offers that need
+                comparing; None or 1 compares them in this process
+            
         Returns:
             List of dictionaries with comparison results for each offer
         """
-        results = []
+        self._check_calculator_config()
         
-        for offer in self.job_offers:
-            # Calculate effective tax rate
-            effective_tax_rate = self.calculate_effective_tax_rate(offer)
-            
-            # Calculate benefits value
-            benefits_value = self.calculate_total_benefits_value(offer)
-            
-            # Calculate total compensation
-            compensation = offer.calculate_total_compensation(
-                effective_tax_rate=effective_tax_rate,
-                commute_calculator=self.commute_calculator
-            )
-            
-            # Add benefits value to total annual value
-            total_benefits_value = benefits_value["total"]
-            compensation["total_annual_value"] = compensation["annual_gross_income"] + total_benefits_value
-            
-            # Add metrics to results
-            result = {
-                "offer": offer,
-                "effective_tax_rate": effective_tax_rate,
-                "benefits_value": benefits_value,
-                "compensation": compensation
+        if workers is not None and workers > 1:
+            pending = {
+                id(offer): offer for offer in self.job_offers
+                if self._results.get(id(offer), {}).get("offer") is not offer
             }
+            if len(pending) >= 2 * MIN_OFFERS_PER_CHUNK:
+                pending_offers = list(pending.values())
+                for offer, result in zip(pending_offers, self._compare_in_workers(pending_offers, workers)):
+                    self._results[id(offer)] = result
+        
+        results = [self._compare_cached(offer) for offer in self.job_offers]
+        
+        # Drop results of offers removed from job_offers directly
+        if len(self._results) > len(results):
+            self._results = {id(result["offer"]): result for result in results}
+        
+        return results
+    
+    def _compare_in_workers(self, offers: List[JobOffer], workers: int) -> List[Dict]:
+        """
+        Compare offers in a pool of worker processes
+        
+        Offers are sent in chunks as one tuple of attribute values per offer
+        rather than pickled objects, and the calculators once per worker.
+        Results come back as value tuples too and are rebuilt in input order.
+        
+        Args:
+            offers: JobOffer objects to compare
+            workers: Number of worker processes
             
-            results.append(result)
+        Returns:
+            List of comparison results, in the order of offers
+        """
+        # Only loaded when comparing in parallel, to keep startup fast
+        from concurrent.futures import ProcessPoolExecutor
+        
+        chunksize = max(MIN_OFFERS_PER_CHUNK, math.ceil(len(offers) / (workers * CHUNKS_PER_WORKER)))
+        fields = _offer_payload_fields(offers[0])
+        payload_row = attrgetter(*fields)
+        chunks = (
+            (fields, list(map(payload_row, offers[start:start + chunksize])))
+            for start in range(0, len(offers), chunksize)
+        )
         
+        results = []
+        remaining_offers = iter(offers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_compare_worker,
+                                 initargs=(self.tax_calculator, self.benefits_calculator,
+                                           self.commute_calculator)) as executor:
+            for packed_results in executor.map(_compare_chunk_in_worker, chunks):
+                for offer, (effective_tax_rate, benefits_value, compensation) in zip(remaining_offers,
+                                                                                     packed_results):
+                    results.append({
+                        "offer": offer,
+                        "effective_tax_rate": effective_tax_rate,
+                        "benefits_value": BenefitsBreakdown(*benefits_value),
+                        "compensation": CompensationResult(*compensation)
+                    })
         return results
+    
+    def _compare_cached(self, offer: JobOffer) -> Dict:
+        """Memoized compare_offer, assuming the calculator configuration has been checked"""
+        result = self._results.get(id(offer))
+        if result is None or result["offer"] is not offer:
+            result = self._results[id(offer)] = self.compare_offer(offer)
+        return result
+    
+    def _check_calculator_config(self) -> None:
+        """Forget the memoized results if the calculator configuration has changed"""
+        calculator_config = self._get_calculator_config()
+        if calculator_config != self._calculator_config:
+            self._results.clear()
+            self._calculator_config = calculator_config
+    
+    def _get_calculator_config(self) -> bytes:
+        """Snapshot of the calculators' settings, used to detect configuration changes"""
+        calculators = (self.tax_calculator, self.benefits_calculator, self.commute_calculator)
+        return pickle.dumps([(type(calculator), vars(calculator)) for calculator in calculators])
+    
+    def compare_offer(self, offer: JobOffer) -> Dict:
+        """
+        Calculate the comparison metrics for a single job offer
+        
+        Args:
+            offer: JobOffer object
+            
+        Returns:
+            Dictionary with the offer, effective tax rate, benefits value (a
+            BenefitsBreakdown) and compensation (a CompensationResult); both
+            records can be read like the dictionaries they replace
+        """
+        # Calculate effective tax rate
+        effective_tax_rate = self.calculate_effective_tax_rate(offer)
+        
+        # Calculate benefits value
+        benefits_value = self.calculate_total_benefits_value(offer)
+        
+        # Calculate total compensation
+        compensation = offer.calculate_total_compensation(
+            effective_tax_rate=effective_tax_rate,
+            commute_calculator=self.commute_calculator
+        )
+        
+        # Add benefits value to total annual value
+        total_benefits_value = benefits_value["total"]
+        compensation["total_annual_value"] = compensation["annual_gross_income"] + total_benefits_value
+        
+        # Store the breakdowns as compact read-only records
+        benefits_value = BenefitsBreakdown(**benefits_value)
+        compensation = CompensationResult(**compensation)
+        
+        # Add metrics to results
+        return {
+            "offer": offer,
+            "effective_tax_rate": effective_tax_rate,
+            "benefits_value": benefits_value,
+            "compensation": compensation
+        }
+    
+    def compare_batch(self, batch: Optional['OfferBatch'] = None) -> Dict:
+        """
+        Compare job offers with array operations over a columnar OfferBatch
+        
+        Computes the same numbers as compare_offers, as one array per metric
+        instead of one dictionary per offer. Use OfferBatch.to_results to get
+        the per-offer format.
+        
+        Args:
+            batch: OfferBatch to compare; defaults to a batch of all offers in the engine
+            
+        Returns:
+            Dictionary with the effective tax rate array and dictionaries of
+            benefits value and compensation arrays, keyed like compare_offer
+        """
+        # NumPy is only imported when the vectorized path is used
+        from offer_batch import OfferBatch
+        
+        if batch is None:
+            batch = OfferBatch(self.job_offers)
+        
+        effective_tax_rates = batch.calculate_effective_tax_rates(self.tax_calculator)
+        benefits_value = batch.calculate_total_benefits_values(self.benefits_calculator)
+        compensation = batch.calculate_total_compensation(
+            effective_tax_rates=effective_tax_rates,
+            commute_calculator=self.commute_calculator
+        )
+        compensation["total_annual_value"] = compensation["annual_gross_income"] + benefits_value["total"]
+        
+        return {
+            "effective_tax_rate": effective_tax_rates,
+            "benefits_value": benefits_value,
+            "compensation": compensation
+        }
+    
+    def compare_offers_iter(self, offers: Optional[Iterable[JobOffer]] = None) -> Iterator[Dict]:
+        """
+        Compare job offers lazily, yielding one result at a time
+        
+        Unlike compare_offers, no list of results is built and new results
+        are not memoized, so memory stays constant however many offers are
+        compared and consumers can start on the first result right away.
+        Results already memoized by compare_offers are reused.
+        
+        Args:
+            offers: Iterable of JobOffer objects, e.g.
+                itertools.chain.from_iterable(parser.iter_file(path));
+                defaults to the offers in the engine
+            
+        Yields:
+            Comparison result for each offer, in the same format as compare_offers
+        """
+        self._check_calculator_config()
+        
+        cached_results = self._results
+        for offer in self.job_offers if offers is None else offers:
+            result = cached_results.get(id(offer))
+            if result is None or result["offer"] is not offer:
+                result = self.compare_offer(offer)
+            yield result
+    
+    def compare_offer_batches(self, batches: Iterable[List[JobOffer]]) -> Iterator[List[Dict]]:
+        """
+        Compare batches of job offers without adding them to the engine
+        
+        Intended for SpreadsheetParser.iter_file, so large files can be
+        scored with memory bounded by the batch size.
+        
+        Args:
+            batches: Iterable of lists of JobOffer objects
+            
+        Yields:
+            List of comparison results for each batch, in the same format as compare_offers
+        """
+        for batch in batches:
+            yield [self.compare_offer(offer) for offer in batch]
 
-    def get_rankings(self, results: List[Dict]) -> Dict:
+    def get_rankings(self, results: Iterable[Dict], top_k: Optional[int] = None) -> Dict:
         """
         Generate rankings of job offers by different criteria
         
+        All criteria are computed in one pass over the results. With top_k,
+        only the best offers of each criterion are selected and ranked, which
+        avoids sorting every offer. Ties keep the order of the results.
+        
+        Results can also be streamed, e.g. from compare_offers_iter; with
+        top_k, only top_k entries per criterion are kept while consuming them.
+        
         Args:
-            results: List of dictionaries with comparison results from compare_offers
+            results: Comparison results from compare_offers, as a list or any iterable
+            top_k: Number of offers to rank per criterion; all offers if None
             
         Returns:
             Dictionary with rankings by different criteria
         """
+        if not isinstance(results, list):
+            if top_k is not None:
+                return self._get_streamed_rankings(results, top_k)
+            results = list(results)
+        
         rankings = {}
         
         # Check if we have results to rank
         if not results:
             return rankings
         
-        # Rank by total annual value
-        total_value_ranking = []
-        sorted_by_value = sorted(
-            results, 
-            key=lambda x: x["compensation"]["total_annual_value"], 
-            reverse=True
-        )
+        # One column of ranking values per criterion
+        columns = [[] for _ in RANKING_CRITERIA]
+        total_values, take_home_pays, hourly_rates, benefits_values, cola_values = columns
+        for result in results:
+            compensation = result["compensation"]
+            total_values.append(compensation["total_annual_value"])
+            take_home_pays.append(compensation["take_home_pay"])
+            hourly_rates.append(compensation["effective_hourly_rate"])
+            benefits_values.append(result["benefits_value"]["total"])
+            
+            # Adjust salary by cost of living index
+            cola_values.append(compensation["total_annual_value"] * (100 / result["offer"].cost_of_living_index))
         
-        for i, result in enumerate(sorted_by_value):
-            total_value_ranking.append({
-                "rank": i + 1,
-                "company": result["offer"].company,
-                "title": result["offer"].title,
-                "value": result["compensation"]["total_annual_value"]
-            })
-        
-        rankings["total_annual_value"] = {
-            "label": "Total Annual Value",
-            "description": "Total annual value including salary, bonuses, and benefits",
-            "ranking": total_value_ranking
-        }
+        offers = [result["offer"] for result in results]
+        for (criterion, label, description), values in zip(RANKING_CRITERIA, columns):
+            rankings[criterion] = {
+                "label": label,
+                "description": description,
+                "ranking": _build_ranking(offers, values, top_indices(values, top_k))
+            }
         
-        # Rank by take-home pay
-        take_home_ranking = []
-        sorted_by_take_home = sorted(
-            results, 
-            key=lambda x: x["compensation"]["take_home_pay"], 
-            reverse=True
-        )
+        return rankings
+    
+    def _get_streamed_rankings(self, results: Iterable[Dict], top_k: int) -> Dict:
+        """Top-k rankings of a stream of results, holding only top_k entries per criterion"""
+        # Min-heaps of (value, -position, company, title); on equal values the
+        # earlier result is larger, so it is kept, as in get_rankings
+        heaps = [[] for _ in RANKING_CRITERIA]
+        position = -1
+        for position, result in enumerate(results):
+            values = _ranking_values(result)
+            offer = result["offer"]
+            for heap, value in zip(heaps, values):
+                entry = (value, -position, offer.company, offer.title)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif heap and entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
         
-        for i, result in enumerate(sorted_by_take_home):
-            take_home_ranking.append({
-                "rank": i + 1,
-                "company": result["offer"].company,
-                "title": result["offer"].title,
-                "value": result["compensation"]["take_home_pay"]
-            })
-        
-        rankings["take_home_pay"] = {
-            "label": "Take-Home Pay",
-            "description": "Annual take-home pay after taxes and deductions",
-            "ranking": take_home_ranking
-        }
+        rankings = {}
+        if position < 0:
+            return rankings
         
-        # Rank by hourly rate
-        hourly_ranking = []
-        sorted_by_hourly = sorted(
-            results, 
-            key=lambda x: x["compensation"]["effective_hourly_rate"], 
-            reverse=True
-        )
+        for (criterion, label, description), heap in zip(RANKING_CRITERIA, heaps):
+            rankings[criterion] = {
+                "label": label,
+                "description": description,
+                "ranking": [
+                    {
+                        "rank": rank,
+                        "company": company,
+                        "title": title,
+                        "value": value
+                    }
+                    for rank, (value, _, company, title) in enumerate(sorted(heap, reverse=True), 1)
+                ]
+            }
         
-        for i, result in enumerate(sorted_by_hourly):
-            hourly_ranking.append({
-                "rank": i + 1,
-                "company": result["offer"].company,
-                "title": result["offer"].title,
-                "value": result["compensation"]["effective_hourly_rate"]
-            })
-        
-        rankings["hourly_rate"] = {
-            "label": "Effective Hourly Rate",
-            "description": "Effective hourly rate based on total compensation and hours worked",
-            "ranking": hourly_ranking
-        }
+        return rankings
+    
+    def get_indexed_rankings(self, top_k: Optional[int] = None) -> Dict:
+        """
+        Rankings of the engine's offers from incrementally maintained indexes
         
-        # Rank by benefits value
-        benefits_ranking = []
-        sorted_by_benefits = sorted(
-            results, 
-            key=lambda x: x["benefits_value"]["total"], 
-            reverse=True
-        )
+        Gives the same rankings as get_rankings(compare_offers(), top_k). The
+        sorted indexes are built on the first call; after that only offers
+        changed through add_offer, update_offer or remove_offer are
+        re-ranked, in O(log n) each, so no call re-sorts all offers unless
+        the calculator configuration changed.
         
-        for i, result in enumerate(sorted_by_benefits):
-            benefits_ranking.append({
-                "rank": i + 1,
-                "company": result["offer"].company,
-                "title": result["offer"].title,
-                "value": result["benefits_value"]["total"]
-            })
-        
-        rankings["benefits_value"] = {
-            "label": "Benefits Value",
-            "description": "Total annual value of all benefits",
-            "ranking": benefits_ranking
-        }
+        Args:
+            top_k: Number of offers to rank per criterion; all offers if None
+            
+        Returns:
+            Dictionary with rankings by different criteria
+        """
+        rankings = {}
+        if not self.job_offers:
+            return rankings
         
-        # Rank by adjusted cost of living
-        cola_ranking = []
-        for result in results:
-            # Adjust salary by cost of living index
-            cola_adjusted = result["compensation"]["total_annual_value"] * (100 / result["offer"].cost_of_living_index)
-            result["cola_adjusted"] = cola_adjusted
+        self._refresh_ranking_indexes()
+        for position, (criterion, label, description) in enumerate(RANKING_CRITERIA):
+            ranking = []
+            for rank, (_, slot) in enumerate(self._ranking_indexes[criterion].first(top_k), 1):
+                offer, values = self._ranked_slots[slot]
+                ranking.append({
+                    "rank": rank,
+                    "company": offer.company,
+                    "title": offer.title,
+                    "value": values[position]
+                })
+            rankings[criterion] = {
+                "label": label,
+                "description": description,
+                "ranking": ranking
+            }
         
-        sorted_by_cola = sorted(
-            results, 
-            key=lambda x: x["cola_adjusted"], 
-            reverse=True
-        )
+        return rankings
+    
+    def get_offer_rank(self, index: int, criterion: str) -> Optional[int]:
+        """
+        Rank of one offer under a ranking criterion, without sorting all offers
+        
+        Args:
+            index: Index of the offer in the engine
+            criterion: Ranking key, e.g. "total_annual_value" (see RANKING_CRITERIA)
+            
+        Returns:
+            1-based rank as in get_indexed_rankings, or None if index is invalid
+        """
+        positions = {key: position for position, (key, _, _) in enumerate(RANKING_CRITERIA)}
+        if criterion not in positions:
+            raise ValueError(f"Unknown ranking criterion: {criterion}")
+        if not 0 <= index < len(self.job_offers):
+            return None
+        
+        self._refresh_ranking_indexes()
+        slot = self._slots[index]
+        value = self._ranked_slots[slot][1][positions[criterion]]
+        return self._ranking_indexes[criterion].rank((-value, slot)) + 1
+    
+    def _refresh_ranking_indexes(self) -> None:
+        """Bring the ranking indexes up to date with the offers"""
+        calculator_config = self._get_calculator_config()
+        if (self._ranking_indexes is None or calculator_config != self._ranking_config
+                or self._ranked_offers is not self.job_offers or len(self._slots) != len(self.job_offers)):
+            self._rebuild_ranking_indexes()
+            self._ranking_config = calculator_config
+            return
+        
+        for slot in list(self._dirty_slots):
+            # Compute the new values first so a failure leaves the indexes consistent
+            offer = self._slot_offers.get(slot)
+            values = _ranking_values(self._compare_cached(offer)) if offer is not None else None
+            
+            previous = self._ranked_slots.pop(slot, None)
+            if previous is not None:
+                for position, index in enumerate(self._ranking_indexes.values()):
+                    index.remove((-previous[1][position], slot))
+            if values is not None:
+                for position, index in enumerate(self._ranking_indexes.values()):
+                    index.add((-values[position], slot))
+                self._ranked_slots[slot] = (offer, values)
+            self._dirty_slots.discard(slot)
+    
+    def _rebuild_ranking_indexes(self) -> None:
+        """Build the ranking indexes for all offers with one sort per criterion"""
+        if len(self._slots) != len(self.job_offers):
+            # job_offers was changed directly; renumber the slots
+            self._slots = list(range(self._next_slot, self._next_slot + len(self.job_offers)))
+            self._next_slot += len(self.job_offers)
+        self._slot_offers = dict(zip(self._slots, self.job_offers))
         
-        for i, result in enumerate(sorted_by_cola):
-            cola_ranking.append({
-                "rank": i + 1,
-                "company": result["offer"].company,
-                "title": result["offer"].title,
-                "value": result["cola_adjusted"]
-            })
-        
-        rankings["cost_of_living_adjusted"] = {
-            "label": "Cost of Living Adjusted Value",
-            "description": "Total annual value adjusted for local cost of living",
-            "ranking": cola_ranking
+        results = self.compare_offers()
+        self._ranked_slots = {
+            slot: (result["offer"], _ranking_values(result)) for slot, result in zip(self._slots, results)
         }
+        self._ranking_indexes = {
+            criterion: RankingIndex((-values[position], slot) for slot, (_, values) in self._ranked_slots.items())
+            for position, (criterion, _, _) in enumerate(RANKING_CRITERIA)
+        }
+        self._dirty_slots.clear()
+        self._ranked_offers = self.job_offers
+    
+    def get_batch_rankings(self, batch: 'OfferBatch', columns: Dict, top_k: Optional[int] = None) -> Dict:
+        """
+        Generate rankings from the arrays returned by compare_batch
+        
+        Selects the top offers of each criterion with a partial sort, so the
+        rankings match get_rankings on the same offers without building a
+        result per offer.
+        
+        Args:
+            batch: OfferBatch that was compared
+            columns: Result of compare_batch for the batch
+            top_k: Number of offers to rank per criterion; all offers if None
+            
+        Returns:
+            Dictionary with rankings by different criteria, like get_rankings
+        """
+        from offer_batch import top_k_indices
+        
+        rankings = {}
+        if not len(batch):
+            return rankings
+        
+        compensation = columns["compensation"]
+        if (batch.cost_of_living_index == 0).any():
+            raise ZeroDivisionError("float division by zero")
+        criterion_values = [
+            compensation["total_annual_value"],
+            compensation["take_home_pay"],
+            compensation["effective_hourly_rate"],
+            columns["benefits_value"]["total"],
+            compensation["total_annual_value"] * (100 / batch.cost_of_living_index),
+        ]
+        
+        for (criterion, label, description), values in zip(RANKING_CRITERIA, criterion_values):
+            indices = top_k_indices(values, top_k).tolist()
+            rankings[criterion] = {
+                "label": label,
+                "description": description,
+                "ranking": _build_ranking(batch.offers, values.tolist(), indices)
+            }
         
         return rankings
     
-    def get_recommendations(self, results: List[Dict]) -> Dict:
+    def get_pareto_frontier(self, metrics: Sequence[str], results: Optional[Iterable[Dict]] = None) -> List[Dict]:
+        """
+        Find the offers that are not beaten on every one of several metrics
+        
+        An offer is on the Pareto frontier if no other offer is at least as
+        good on every metric and better on at least one, so the frontier is
+        the set of reasonable choices for any weighting of the metrics. Two
+        or three metrics take O(n log n); more use a block-based algorithm.
+        
+        Args:
+            metrics: Keys of OFFER_METRICS to compare on
+            results: Comparison results from compare_offers; defaults to compare_offers()
+            
+        Returns:
+            Comparison results of the frontier offers, in the order of results
+            
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        _check_metrics(metrics)
+        results = self._results_list(results)
+        if not results:
+            return []
+        
+        # NumPy is only imported when a frontier is computed
+        from pareto import pareto_frontier
+        
+        points = _signed_metric_points(_result_metric_columns(results, metrics))
+        return [results[i] for i in pareto_frontier(points).tolist()]
+    
+    def get_batch_pareto_frontier(self, batch: 'OfferBatch', columns: Dict, metrics: Sequence[str]) -> 'np.ndarray':
+        """
+        Find the Pareto frontier from the arrays returned by compare_batch
+        
+        Args:
+            batch: OfferBatch that was compared
+            columns: Result of compare_batch for the batch
+            metrics: Keys of OFFER_METRICS to compare on
+            
+        Returns:
+            Sorted array of the positions of the frontier offers in the batch
+            
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        from pareto import pareto_frontier
+        
+        _check_metrics(metrics)
+        return pareto_frontier(_signed_metric_points(_batch_metric_columns(batch, columns, metrics)))
+    
+    def get_scorer(self, metrics: Sequence[str], normalization: str = "minmax",
+                   results: Optional[Iterable[Dict]] = None) -> 'OfferScorer':
+        """
+        Prepare comparison results for weighted scoring
+        
+        The metric values are extracted and normalized once; the returned
+        scorer then scores every offer with any weights in one vectorized
+        pass, so weights can be changed interactively:
+        
+            scorer = engine.get_scorer(["take_home_pay", "weekly_commute_hours"])
+            scores = scorer.score({"take_home_pay": 3, "weekly_commute_hours": 1})
+        
+        Args:
+            metrics: Keys of OFFER_METRICS that weights can be given for
+            normalization: One of scoring.NORMALIZATIONS
+            results: Comparison results from compare_offers; defaults to compare_offers()
+            
+        Returns:
+            OfferScorer over the results, in their order
+            
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        from scoring import OfferScorer
+        
+        _check_metrics(metrics)
+        results = self._results_list(results)
+        return OfferScorer(_result_metric_columns(results, metrics),
+                           {metric: OFFER_METRICS[metric][1] for metric in metrics}, normalization)
+    
+    def get_batch_scorer(self, batch: 'OfferBatch', columns: Dict, metrics: Sequence[str],
+                         normalization: str = "minmax") -> 'OfferScorer':
+        """
+        Prepare the arrays returned by compare_batch for weighted scoring
+        
+        Args:
+            batch: OfferBatch that was compared
+            columns: Result of compare_batch for the batch
+            metrics: Keys of OFFER_METRICS that weights can be given for
+            normalization: One of scoring.NORMALIZATIONS
+            
+        Returns:
+            OfferScorer over the offers of the batch
+            
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        from scoring import OfferScorer
+        
+        _check_metrics(metrics)
+        return OfferScorer(_batch_metric_columns(batch, columns, metrics),
+                           {metric: OFFER_METRICS[metric][1] for metric in metrics}, normalization)
+    
+    def get_delta_matrix(self, metrics: Sequence[str] = DELTA_METRICS, results: Optional[Iterable[Dict]] = None,
+                         path: Optional[str] = None, dtype: str = "float64") -> 'DeltaMatrix':
+        """
+        Compute the differences of metrics between every pair of offers
+        
+        Entry [i, j] of each metric's matrix is offer j's value minus offer
+        i's. The matrices are filled in blocks and, with a path, written to
+        memory-mapped files, so they can be larger than memory and reopened
+        with DeltaMatrix.load. Queries read the stored differences:
+        
+            matrix = engine.get_delta_matrix()
+            matrix.beating("take_home_pay", 3, 10000)  # offers paying $10k+ more than offer 3
+        
+        Args:
+            metrics: Keys of OFFER_METRICS to compare
+            results: Comparison results from compare_offers; defaults to compare_offers()
+            path: Directory for memory-mapped .npy files; in memory if None
+            dtype: Data type of the matrices, e.g. "float32" for half the size
+        
+        Returns:
+            DeltaMatrix with offers in the order of results
+        
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        from delta_matrix import DeltaMatrix
+        
+        _check_metrics(metrics)
+        results = self._results_list(results)
+        return DeltaMatrix.compute(_result_metric_columns(results, metrics),
+                                   {metric: OFFER_METRICS[metric][1] for metric in metrics}, path, dtype)
+    
+    def get_batch_delta_matrix(self, batch: 'OfferBatch', columns: Dict, metrics: Sequence[str] = DELTA_METRICS,
+                               path: Optional[str] = None, dtype: str = "float64") -> 'DeltaMatrix':
+        """
+        Compute pairwise metric differences from the arrays returned by compare_batch
+        
+        Args:
+            batch: OfferBatch that was compared
+            columns: Result of compare_batch for the batch
+            metrics: Keys of OFFER_METRICS to compare
+            path: Directory for memory-mapped .npy files; in memory if None
+            dtype: Data type of the matrices
+        
+        Returns:
+            DeltaMatrix with offers in the order of the batch
+        
+        Raises:
+            ValueError: If no metrics or an unknown metric are given
+        """
+        from delta_matrix import DeltaMatrix
+        
+        _check_metrics(metrics)
+        return DeltaMatrix.compute(_batch_metric_columns(batch, columns, metrics),
+                                   {metric: OFFER_METRICS[metric][1] for metric in metrics}, path, dtype)
+    
+    def score_offers(self, profile, results: Optional[Iterable[Dict]] = None,
+                     top_k: Optional[int] = None) -> Dict:
+        """
+        Rank offers by a weighted score
+        
+        Args:
+            profile: scoring.ScoringProfile, or a dictionary in its JSON format
+                     ({"weights": {metric: weight}, "normalization": ...})
+            results: Comparison results from compare_offers; defaults to compare_offers()
+            top_k: Number of offers to rank; all offers if None
+            
+        Returns:
+            Dictionary with a label, a description and a ranking like those of
+            get_rankings, whose entries also hold each metric's contribution
+            to the score
+            
+        Raises:
+            ValueError: If the profile is invalid or uses an unknown metric
+        """
+        from offer_batch import top_k_indices
+        from scoring import ScoringProfile
+        
+        if not isinstance(profile, ScoringProfile):
+            profile = ScoringProfile.from_dict(profile)
+        results = self._results_list(results)
+        scorer = self.get_scorer(list(profile.weights), profile.normalization, results)
+        scores = scorer.score(profile.weights)
+        indices = top_k_indices(scores, top_k)
+        contributions = scorer.contributions(profile.weights, indices)
+        
+        offers = [results[i]["offer"] for i in indices.tolist()]
+        ranking = _build_ranking(offers, scores[indices].tolist(), range(len(offers)))
+        for position, entry in enumerate(ranking):
+            entry["contributions"] = {metric: values[position].item() for metric, values in contributions.items()}
+        return {
+            "label": "Weighted Score",
+            "description": "Weighted sum of " + ", ".join(
+                f"{OFFER_METRICS[metric][0]} ({weight:g})" for metric, weight in profile.weights.items()),
+            "ranking": ranking
+        }
+    
+    def simulate_batch(self, batch: 'OfferBatch', draws: int = 10000, model: Optional['UncertaintyModel'] = None,
+                       metrics: Sequence[str] = ("total_annual_value",),
+                       percentiles: Optional[Sequence[float]] = None, seed: Optional[int] = None) -> Dict:
+        """
+        Simulate the uncertain parts of every offer in a batch
+        
+        Draws bonus payouts, equity values, tenures and commute days from
+        the model for every offer and computes the metrics of each draw
+        with the vectorized comparison, one chunk of offers at a time.
+        
+        Args:
+            batch: OfferBatch to simulate
+            draws: Number of draws per offer
+            model: simulation.UncertaintyModel; defaults to UncertaintyModel()
+            metrics: Keys of OFFER_METRICS to summarize
+            percentiles: Percentiles to report; defaults to simulation.DEFAULT_PERCENTILES
+            seed: Seed for reproducible draws
+            
+        Returns:
+            Dictionary with the list of "percentiles" and, per metric, a
+            dictionary of arrays with each offer's "mean", "std" and
+            "percentiles" (offers x percentiles)
+            
+        Raises:
+            ValueError: If draws is not positive or a metric is unknown
+        """
+        import numpy as np
+        from simulation import DEFAULT_PERCENTILES, SIMULATION_CHUNK_SIZE, UncertaintyModel, sample_overrides
+        
+        if draws < 1:
+            raise ValueError(f"draws must be at least 1, got {draws}")
+        _check_metrics(metrics)
+        model = UncertaintyModel() if model is None else model
+        percentiles = list(DEFAULT_PERCENTILES if percentiles is None else percentiles)
+        rng = np.random.default_rng(seed)
+        
+        summary = {"percentiles": percentiles}
+        for metric in metrics:
+            summary[metric] = {
+                "mean": np.empty(len(batch)),
+                "std": np.empty(len(batch)),
+                "percentiles": np.empty((len(batch), len(percentiles))),
+            }
+        
+        chunk_size = max(1, SIMULATION_CHUNK_SIZE // draws)
+        for start in range(0, len(batch), chunk_size):
+            chunk = batch[start:start + chunk_size]
+            simulated = chunk.broadcast(sample_overrides(chunk, model, draws, rng), (draws,))
+            metric_columns = _batch_metric_columns(simulated, self.compare_batch(simulated), metrics)
+            rows = slice(start, start + len(chunk))
+            for metric, values in metric_columns.items():
+                # Metrics that no draw changes come back with a single column
+                values = np.broadcast_to(values, (len(chunk), draws))
+                summary[metric]["mean"][rows] = values.mean(axis=1)
+                summary[metric]["std"][rows] = values.std(axis=1)
+                summary[metric]["percentiles"][rows] = np.percentile(values, percentiles, axis=1).T
+        return summary
+    
+    def simulate_offers(self, draws: int = 10000, model: Optional['UncertaintyModel'] = None,
+                        metrics: Sequence[str] = ("total_annual_value",),
+                        percentiles: Optional[Sequence[float]] = None, seed: Optional[int] = None,
+                        offers: Optional[List[JobOffer]] = None) -> List[Dict]:
+        """
+        Simulate the uncertain parts of job offers and summarize each offer
+        
+        Args:
+            draws: Number of draws per offer
+            model: simulation.UncertaintyModel; defaults to UncertaintyModel()
+            metrics: Keys of OFFER_METRICS to summarize
+            percentiles: Percentiles to report; defaults to simulation.DEFAULT_PERCENTILES
+            seed: Seed for reproducible draws
+            offers: Offers to simulate; defaults to all offers in the engine
+            
+        Returns:
+            List with a dictionary per offer holding the offer and, per
+            metric, its "mean", "std" and "percentiles" ({percentile: value})
+        """
+        from offer_batch import OfferBatch
+        
+        batch = OfferBatch(self.job_offers if offers is None else offers)
+        summary = self.simulate_batch(batch, draws, model, metrics, percentiles, seed)
+        percentiles = summary["percentiles"]
+        
+        results = [{"offer": offer} for offer in batch.offers]
+        for metric in metrics:
+            metric_summary = summary[metric]
+            for result, mean, std, values in zip(results, metric_summary["mean"].tolist(),
+                                                 metric_summary["std"].tolist(),
+                                                 metric_summary["percentiles"].tolist()):
+                result[metric] = {"mean": mean, "std": std, "percentiles": dict(zip(percentiles, values))}
+        return results
+    
+    def sweep_batch(self, batch: 'OfferBatch', grid: Dict[str, Sequence],
+                    metrics: Sequence[str] = ("total_annual_value",)) -> 'SweepResult':
+        """
+        Evaluate offers for every combination of a grid of parameter values
+        
+        Each parameter replaces an OfferBatch column (see
+        offer_batch.OVERRIDABLE_COLUMNS) for every offer. The whole
+        Cartesian product is computed as one broadcast comparison per chunk
+        of offers, without copying the offers:
+        
+            engine.sweep_batch(batch, {"expected_tenure_years": [2, 3, 5],
+                                       "commute_days_per_week": [1, 2, 3, 4, 5],
+                                       "commute_details_fuel_cost_per_gallon": [3.0, 4.0, 5.0]})
+        
+        Args:
+            batch: OfferBatch to evaluate
+            grid: Values to try per column, in the order of the result's axes
+            metrics: Keys of OFFER_METRICS to compute
+            
+        Returns:
+            SweepResult with a cube of shape (offers, *grid sizes) per metric
+            
+        Raises:
+            ValueError: If the grid is empty, a column cannot be swept or a metric is unknown
+        """
+        import numpy as np
+        from offer_batch import OVERRIDABLE_COLUMNS
+        from sweep import SWEEP_CHUNK_SIZE, SweepResult
+        
+        _check_metrics(metrics)
+        if not grid:
+            raise ValueError("A sweep needs at least one parameter")
+        for name, values in grid.items():
+            if name not in OVERRIDABLE_COLUMNS:
+                raise ValueError(f"Cannot sweep {name}; expected one of {', '.join(OVERRIDABLE_COLUMNS)}")
+            if np.ndim(values) != 1 or not len(values):
+                raise ValueError(f"Values of {name} must be a non-empty list")
+        
+        # Each parameter varies along its own axis
+        shape = tuple(len(values) for values in grid.values())
+        overrides = {}
+        for axis, (name, values) in enumerate(grid.items(), 1):
+            axis_shape = [1] * (len(shape) + 1)
+            axis_shape[axis] = len(values)
+            overrides[name] = np.asarray(values).reshape(axis_shape)
+        
+        cubes = {metric: np.empty((len(batch),) + shape) for metric in metrics}
+        chunk_size = max(1, SWEEP_CHUNK_SIZE // math.prod(shape))
+        for start in range(0, len(batch), chunk_size):
+            swept = batch[start:start + chunk_size].broadcast(overrides, shape)
+            for metric, values in _batch_metric_columns(swept, self.compare_batch(swept), metrics).items():
+                cubes[metric][start:start + chunk_size] = values
+        
+        coords = {"offer": list(batch.offers)}
+        coords.update((name, list(values)) for name, values in grid.items())
+        return SweepResult(dims=list(coords), coords=coords, values=cubes)
+    
+    def sweep_offers(self, grid: Dict[str, Sequence], metrics: Sequence[str] = ("total_annual_value",),
+                     offers: Optional[List[JobOffer]] = None) -> 'SweepResult':
+        """
+        Evaluate job offers for every combination of a grid of parameter values
+        
+        Args:
+            grid: Values to try per OfferBatch column, as for sweep_batch
+            metrics: Keys of OFFER_METRICS to compute
+            offers: Offers to evaluate; defaults to all offers in the engine
+            
+        Returns:
+            SweepResult with a cube of shape (offers, *grid sizes) per metric
+        """
+        from offer_batch import OfferBatch
+        
+        return self.sweep_batch(OfferBatch(self.job_offers if offers is None else offers), grid, metrics)
+    
+    def break_even_batch(self, batch: 'OfferBatch', field: str, targets: Sequence[float],
+                         metric: str = "total_annual_value", bounds: Optional[Tuple] = None) -> 'np.ndarray':
+        """
+        Find the value of a field at which each offer's metric equals each target
+        
+        Solved in closed form between the salaries where taxes and benefits
+        change slope, with bisection where that fails (see break_even).
+        
+        Args:
+            batch: OfferBatch of the offers to change
+            field: Numeric column to solve for (see offer_batch.OVERRIDABLE_COLUMNS)
+            targets: Values of the metric to reach
+            metric: Key of OFFER_METRICS
+            bounds: Lowest and highest value of the field to consider, each a
+                    number or an array with one value per offer; defaults to 0 to
+                    break_even.DEFAULT_BOUND_FACTOR times each offer's current value
+        
+        Returns:
+            Array of shape (offers, targets), NaN where the metric does not
+            reach the target within the bounds
+        
+        Raises:
+            ValueError: If the field, metric or bounds are invalid
+        """
+        import numpy as np
+        from break_even import DEFAULT_BOUND_FACTOR, field_breakpoints, solve_break_even
+        from offer_batch import OVERRIDABLE_COLUMNS
+        
+        _check_metrics([metric])
+        if field not in OVERRIDABLE_COLUMNS or getattr(batch, field).dtype == bool:
+            numeric = [name for name in OVERRIDABLE_COLUMNS if getattr(batch, name).dtype != bool]
+            raise ValueError(f"Cannot solve for {field}; expected one of {', '.join(numeric)}")
+        if bounds is None:
+            bounds = (0.0, DEFAULT_BOUND_FACTOR * np.maximum(np.abs(getattr(batch, field)), 1.0))
+        if not np.all(np.less(*bounds)):
+            raise ValueError("The lower bound must be below the upper bound")
+        
+        def evaluate(offers, values):
+            changed = offers.broadcast({field: values}, values.shape[1:])
+            metric_values = _batch_metric_columns(changed, self.compare_batch(changed), [metric])[metric]
+            return np.broadcast_to(metric_values, values.shape)
+        
+        return solve_break_even(evaluate, batch, targets, bounds,
+                                field_breakpoints(batch, field, self.tax_calculator))
+        
+    def find_break_even(self, offer: JobOffer, reference: JobOffer, field: str,
+                        metric: str = "total_annual_value",
+                        bounds: Optional[Tuple[float, float]] = None) -> Optional[float]:
+        """
+        Find the value of an offer's field at which it matches another offer
+        
+        For example, the base salary at which offer B is worth as much as offer A:
+        
+            engine.find_break_even(offer_b, offer_a, "base_compensation")
+        
+        Args:
+            offer: Offer to change
+            reference: Offer whose metric is the target
+            field: Numeric column to solve for, as for break_even_batch
+            metric: Key of OFFER_METRICS
+            bounds: Lowest and highest value of the field to consider; defaults
+                    to 0 to break_even.DEFAULT_BOUND_FACTOR times the larger of
+                    the two offers' values
+        
+        Returns:
+            Value of the field, or None if the metric does not reach the
+            reference's within the bounds
+        """
+        from break_even import DEFAULT_BOUND_FACTOR
+        from offer_batch import OfferBatch
+        
+        batch = OfferBatch([offer, reference])
+        _check_metrics([metric])
+        target = _batch_metric_columns(batch[1:], self.compare_batch(batch[1:]), [metric])[metric]
+        if bounds is None and hasattr(batch, field):
+            bounds = (0.0, DEFAULT_BOUND_FACTOR * max(float(abs(getattr(batch, field)).max()), 1.0))
+        value = self.break_even_batch(batch[:1], field, target, metric, bounds)[0, 0]
+        return None if value != value else float(value)
+        
+    def break_even_matrix(self, field: str, metric: str = "total_annual_value",
+                          offers: Optional[List[JobOffer]] = None,
+                          bounds: Optional[Tuple] = None) -> 'np.ndarray':
+        """
+        Find the break-even value of a field for every pair of offers
+        
+        Args:
+            field: Numeric column to solve for, as for break_even_batch
+            metric: Key of OFFER_METRICS
+            offers: Offers to pair up; defaults to all offers in the engine
+            bounds: Range of the field to consider, as for break_even_batch
+        
+        Returns:
+            Array where entry [i, j] is the value of offer j's field at which
+            its metric equals offer i's, NaN if there is none within the bounds
+        """
+        from offer_batch import OfferBatch
+        
+        batch = OfferBatch(self.job_offers if offers is None else offers)
+        _check_metrics([metric])
+        targets = _batch_metric_columns(batch, self.compare_batch(batch), [metric])[metric]
+        return self.break_even_batch(batch, field, targets, metric, bounds).T
+    
+    def _results_list(self, results: Optional[Iterable[Dict]]) -> List[Dict]:
+        """Comparison results as a list, comparing all offers if results is None"""
+        if results is None:
+            return self.compare_offers()
+        return results if isinstance(results, list) else list(results)
+    
+    def get_recommendations(self, results: List[Dict], rankings: Optional[Dict] = None,
+                            include_ties: bool = False) -> Dict:
         """
         Generate recommendations based on comparison results
         
+        The values behind every recommendation are collected in one pass
+        over the results, and each winner is the arg-max of its values, so nothing is sorted
+        and the cost is O(n). Rankings of the same results from get_rankings
+        or get_indexed_rankings can be passed in, and the winners of their
+        criteria are then read from them; only the commute and work-life
+        winners are searched for. As in get_rankings, ties go to the
+        earliest offer.
+        
         Args:
             results: List of dictionaries with comparison results from compare_offers
+            rankings: Rankings of the results to take the winners of RANKING_CRITERIA from
+            include_ties: Also return "ties": {recommendation: [companies]} for the
+                          recommendations that several offers share the best value of;
+                          from rankings, only the ties within the ranked entries are seen
             
         Returns:
             Dictionary with recommendations for different criteria
@@ -473,54 +1664,52 @@ class ComparisonEngine:
         if not results:
             return recommendations
         
-        # Get rankings
-        rankings = self.get_rankings(results)
-        
-        # Best overall (total annual value)
-        if "total_annual_value" in rankings:
-            top_value = rankings["total_annual_value"]["ranking"][0]
-            recommendations["best_overall"] = top_value["company"]
+        # One column of values per recommendation, larger is better, all
+        # filled in a single pass; the shortest commute has the largest
+        # negated time
+        commute_times, work_life_scores = [], []
+        if rankings is None:
+            columns = [[] for _ in RECOMMENDATION_CRITERIA]
+            appends = [column.append for column in columns]
+            for result in results:
+                for append, value in zip(appends, _ranking_values(result)):
+                    append(value)
+                commute_times.append(-result["offer"].commute_time_minutes)
+                work_life_scores.append(work_life_score(result))
+            columns = dict(zip((key for key, _ in RECOMMENDATION_CRITERIA), columns))
+        else:
+            columns = {}
+            for result in results:
+                commute_times.append(-result["offer"].commute_time_minutes)
+                work_life_scores.append(work_life_score(result))
+        columns["best_commute"] = commute_times
+        columns["best_work_life_balance"] = work_life_scores
         
-        # Best take-home pay
-        if "take_home_pay" in rankings:
-            top_take_home = rankings["take_home_pay"]["ranking"][0]
-            recommendations["best_take_home_pay"] = top_take_home["company"]
+        # Companies of the offers with the best value, per recommendation; the
+        # winner is the first of them, and the rest are only collected if
+        # there are any
+        winners = {}
+        if rankings is not None:
+            for key, criterion in RECOMMENDATION_CRITERIA:
+                ranking = rankings[criterion]["ranking"] if criterion in rankings else None
+                if ranking:
+                    top_value = ranking[0]["value"]
+                    winners[key] = [entry["company"] for entry in ranking if entry["value"] == top_value]
+        for key, column in columns.items():
+            top_value = max(column)
+            if column.count(top_value) > 1:
+                tied = [position for position, value in enumerate(column) if value == top_value]
+            else:
+                tied = [column.index(top_value)]
+            winners[key] = [results[position]["offer"].company for position in tied]
         
-        # Best hourly rate
-        if "hourly_rate" in rankings:
-            top_hourly = rankings["hourly_rate"]["ranking"][0]
-            recommendations["best_hourly_rate"] = top_hourly["company"]
+        for key, _ in RECOMMENDATION_CRITERIA:
+            if key in winners:
+                recommendations[key] = winners[key][0]
+        recommendations["best_commute"] = winners["best_commute"][0]
+        recommendations["best_work_life_balance"] = winners["best_work_life_balance"][0]
         
-        # Best benefits
-        if "benefits_value" in rankings:
-            top_benefits = rankings["benefits_value"]["ranking"][0]
-            recommendations["best_benefits"] = top_benefits["company"]
-        
-        # Best adjusted for cost of living
-        if "cost_of_living_adjusted" in rankings:
-            top_cola = rankings["cost_of_living_adjusted"]["ranking"][0]
-            recommendations["best_cost_adjusted"] = top_cola["company"]
-        
-        # Best commute (shortest)
-        commute_best = min(results, key=lambda x: x["offer"].commute_time_minutes)
-        recommendations["best_commute"] = commute_best["offer"].company
-        
-        # Best work-life balance (simplified calculation)
-        work_life_scores = []
-        for result in results:
-            offer = result["offer"]
-            # Calculate a work-life score based on hours, commute, and PTO
-            pto_days = offer.benefits.paid_time_off_days + offer.benefits.paid_holidays + offer.benefits.paid_sick_days
-            weekly_hours = offer.hours_per_week
-            commute_hours = (offer.commute_time_minutes / 60) * offer.commute_days_per_week
-            
-            # Lower score is better (fewer hours working/commuting, more time off)
-            score = (weekly_hours + commute_hours) * 52 - (pto_days * 8)
-            work_life_scores.append((offer.company, score))
-        
-        # Sort by score (lower is better)
-        work_life_scores.sort(key=lambda x: x[1])
-        if work_life_scores:
-            recommendations["best_work_life_balance"] = work_life_scores[0][0]
+        if include_ties:
+            recommendations["ties"] = {key: companies for key, companies in winners.items() if len(companies) > 1}
         
         return recommendations
\ No newline at end of file
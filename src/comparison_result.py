@@ -0,0 +1,101 @@
+"""
+Compact records for the per-offer results of ComparisonEngine
+
+Each record is a dataclass that declares __slots__, so it stores its values without
+a per-object dictionary. Records also implement the read-only Mapping
+interface, so code written for the original result dictionaries
+(result["compensation"]["take_home_pay"], .get(), "key" in ..., comparing
+with a dict) keeps working; to_dict() returns a plain dictionary copy.
+
+The records are not frozen: a frozen dataclass's __init__ costs about three
+times as much, which is a noticeable share of comparing an offer. Results
+are shared by the engine's memoization and should be treated as read-only.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Dict, Iterator, Tuple
+
+
+class _RecordMapping(Mapping):
+    """Read-only dictionary view of a dataclass record's fields"""
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__dataclass_fields__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__dataclass_fields__)
+    
+    def __len__(self) -> int:
+        return len(self.__dataclass_fields__)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self, self.as_tuple()))
+        return f"{type(self).__name__}({fields})"
+    
+    def as_tuple(self) -> Tuple:
+        """Field values in field order (shallow, unlike dataclasses.astuple)"""
+        return self._fields_getter(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary with the same keys as the original result dictionaries"""
+        return dict(zip(self, self.as_tuple()))
+
+
+@dataclass(eq=False, repr=False)
+class BenefitsBreakdown(_RecordMapping):
+    """Annual value of each benefit, as calculated by BenefitsCalculator"""
+    __slots__ = (
+        'retirement', 'health_insurance', 'dental_insurance', 'vision_insurance', 'life_insurance', 'time_off',
+        'parental_leave', 'equity', 'other', 'total',
+    )
+    
+    retirement: float
+    health_insurance: float
+    dental_insurance: float
+    vision_insurance: float
+    life_insurance: float
+    time_off: float
+    parental_leave: float
+    equity: float
+    other: float
+    total: float
+
+
+@dataclass(eq=False, repr=False)
+class CompensationResult(_RecordMapping):
+    """Compensation metrics of one offer, as calculated by JobOffer.calculate_total_compensation"""
+    __slots__ = (
+        'compensation_type', 'base_salary', 'hourly_rate', 'annual_gross_income', 'tax_amount', 'take_home_pay',
+        'monthly_commute_cost', 'annual_commute_cost', 'total_direct_compensation', 'col_adjusted_income',
+        'col_adjusted_take_home', 'weekly_commute_hours', 'total_weekly_hours', 'effective_hourly_rate',
+        'commute_adjusted_hourly_rate', 'col_adjusted_value', 'daily_value', 'total_annual_value',
+    )
+    
+    compensation_type: str
+    base_salary: float
+    hourly_rate: float
+    annual_gross_income: float
+    tax_amount: float
+    take_home_pay: float
+    monthly_commute_cost: float
+    annual_commute_cost: float
+    total_direct_compensation: float
+    col_adjusted_income: float
+    col_adjusted_take_home: float
+    weekly_commute_hours: float
+    total_weekly_hours: float
+    effective_hourly_rate: float
+    commute_adjusted_hourly_rate: float
+    col_adjusted_value: float
+    daily_value: float
+    total_annual_value: float
+
+
+for _record_type in (BenefitsBreakdown, CompensationResult):
+    _record_type._fields_getter = attrgetter(*_record_type.__dataclass_fields__)
@@ -0,0 +1,194 @@
+"""
+Pairwise differences of offer metrics
+
+A DeltaMatrix holds, for each chosen metric, the n x n matrix of
+differences between every pair of offers: entry [i, j] is offer j's value
+minus offer i's, so row i shows how every offer compares with offer i. The
+matrices are filled in blocks of rows with NumPy broadcasting, each block
+written in place into the result without temporaries, and can live in
+memory-mapped .npy files when n is too large for RAM. Queries such as
+"which offers beat offer 3 by more than $10k" read the stored rows instead
+of recomputing anything.
+
+Directories written with a path can be reopened with DeltaMatrix.load:
+
+    deltas/
+        metrics.json          {"metrics": {metric: higher_is_better}}
+        take_home_pay.npy     n x n differences
+        ...
+"""
+
+import json
+import os
+from typing import List, Mapping, Optional
+
+import numpy as np
+
+
+# Bytes per block of rows that is computed or read at once: small enough for
+# the cache, and a contiguous part of a memory-mapped file
+DELTA_BLOCK_BYTES = 1 << 22
+
+# Name of the file describing the metrics of a memory-mapped DeltaMatrix
+METRICS_FILE = "metrics.json"
+
+
+class DeltaMatrix:
+    """Differences of metric values between every pair of offers"""
+    
+    def __init__(self, deltas: Mapping[str, np.ndarray], higher_is_better: Mapping[str, bool]):
+        """
+        Wrap difference matrices; use compute or load to create them
+        
+        Args:
+            deltas: Square matrix per metric, [i, j] = value of j - value of i
+            higher_is_better: Whether larger values are better, per metric
+        """
+        self.deltas = dict(deltas)
+        self.higher_is_better = {metric: bool(higher_is_better[metric]) for metric in self.deltas}
+    
+    @classmethod
+    def compute(cls, columns: Mapping[str, np.ndarray], higher_is_better: Mapping[str, bool],
+                path: Optional[str] = None, dtype=np.float64) -> 'DeltaMatrix':
+        """
+        Compute the difference matrices of metric columns block by block
+        
+        Args:
+            columns: One array of values per metric, all of the same length
+            higher_is_better: Whether larger values are better, per metric
+            path: Directory to write memory-mapped .npy files to; in memory if None
+            dtype: Data type of the matrices (np.float32 halves their size)
+        
+        Returns:
+            DeltaMatrix over the columns
+        """
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, METRICS_FILE), 'w') as f:
+                json.dump({"metrics": {metric: bool(higher_is_better[metric]) for metric in columns}}, f)
+        
+        deltas = {}
+        for metric, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)
+            shape = (len(values), len(values))
+            if path is None:
+                matrix = np.empty(shape, dtype=dtype)
+            else:
+                matrix = np.lib.format.open_memmap(os.path.join(path, metric + ".npy"), mode='w+',
+                                                   dtype=dtype, shape=shape)
+            rows = _block_rows(matrix)
+            for row in range(0, len(values), rows):
+                np.subtract(values, values[row:row + rows, None], out=matrix[row:row + rows])
+            if path is not None:
+                matrix.flush()
+            deltas[metric] = matrix
+        return cls(deltas, higher_is_better)
+    
+    @classmethod
+    def load(cls, path: str, mode: str = 'r') -> 'DeltaMatrix':
+        """
+        Open the memory-mapped matrices written by compute
+        
+        Args:
+            path: Directory given to compute
+            mode: Memory-map mode; 'r' for read-only
+        
+        Returns:
+            DeltaMatrix reading from the files
+        """
+        with open(os.path.join(path, METRICS_FILE), 'r') as f:
+            higher_is_better = json.load(f)["metrics"]
+        deltas = {metric: np.load(os.path.join(path, metric + ".npy"), mmap_mode=mode) for metric in higher_is_better}
+        return cls(deltas, higher_is_better)
+    
+    def __len__(self) -> int:
+        return len(next(iter(self.deltas.values()))) if self.deltas else 0
+    
+    @property
+    def metrics(self) -> List[str]:
+        """Metrics of the matrices, in order"""
+        return list(self.deltas)
+    
+    def delta(self, metric: str, i: int, j: int) -> float:
+        """Offer j's value of a metric minus offer i's"""
+        return float(self._matrix(metric)[i, j])
+    
+    def advantages(self, metric: str, index: int) -> np.ndarray:
+        """
+        How much every offer is better than one offer
+        
+        Args:
+            metric: Metric to compare
+            index: Position of the offer to compare with
+        
+        Returns:
+            Array with each offer's advantage (negative if it is worse),
+            negated for metrics where lower is better
+        """
+        row = np.asarray(self._matrix(metric)[index])
+        return row if self.higher_is_better[metric] else -row
+    
+    def beating(self, metric: str, index: int, margin: float = 0.0) -> np.ndarray:
+        """
+        Offers that are better than one offer by more than a margin
+        
+        For example, the offers that pay more than $10k more take-home than offer 3:
+        
+            matrix.beating("take_home_pay", 3, 10000)
+        
+        Args:
+            metric: Metric to compare
+            index: Position of the offer to compare with
+            margin: Advantage to exceed, in the metric's units
+        
+        Returns:
+            Sorted positions of the offers
+        """
+        return np.flatnonzero(self.advantages(metric, index) > margin)
+    
+    def beaten_by(self, metric: str, index: int, margin: float = 0.0) -> np.ndarray:
+        """
+        Offers that one offer is better than by more than a margin
+        
+        Args:
+            metric: Metric to compare
+            index: Position of the offer to compare with
+            margin: Advantage to exceed, in the metric's units
+        
+        Returns:
+            Sorted positions of the offers
+        """
+        return np.flatnonzero(self.advantages(metric, index) < -margin)
+    
+    def count_beating(self, metric: str, margin: float = 0.0) -> np.ndarray:
+        """
+        Number of offers that are better than each offer by more than a margin
+        
+        Reads the matrix block by block of rows, so memory-mapped matrices
+        are not loaded at once.
+        
+        Args:
+            metric: Metric to compare
+            margin: Advantage to exceed, in the metric's units
+        
+        Returns:
+            Array with a count per offer
+        """
+        matrix = self._matrix(metric)
+        sign = 1 if self.higher_is_better[metric] else -1
+        counts = np.empty(len(matrix), dtype=np.int64)
+        rows = _block_rows(matrix)
+        for row in range(0, len(matrix), rows):
+            counts[row:row + rows] = np.count_nonzero(sign * matrix[row:row + rows] > margin, axis=1)
+        return counts
+    
+    def _matrix(self, metric: str) -> np.ndarray:
+        """Difference matrix of a metric, rejecting metrics the matrix does not have"""
+        if metric not in self.deltas:
+            raise KeyError(f"Metric not in this matrix: {metric}; available: {', '.join(self.deltas)}")
+        return self.deltas[metric]
+
+
+def _block_rows(matrix: np.ndarray) -> int:
+    """Rows of a matrix per block of DELTA_BLOCK_BYTES"""
+    return max(1, DELTA_BLOCK_BYTES // max(matrix.shape[1] * matrix.itemsize, 1))
@@ -12,18 +12,26 @@ This tool helps compare multiple job offers considering various factors like:
 
 import sys
 import argparse
-from job_offer import JobOffer
-from comparison_engine import ComparisonEngine
-from tax_calculator import TaxCalculator
-from benefits_calculator import BenefitsCalculator
+from comparison_engine import ComparisonEngine, top_indices, work_life_score
+from offer_index import OfferIndex
 from ui_handler import ConsoleUI
 
-# Import spreadsheet parser with error handling
-try:
-    from spreadsheet_parser import SpreadsheetParser
-    spreadsheet_support = True
-except ImportError:
-    spreadsheet_support = False
+
+def load_spreadsheet_parser():
+    """
+    Import the spreadsheet parser on demand
+    
+    The parser pulls in pandas, which is slow to import, so it is only
+    loaded when a spreadsheet option is used.
+    
+    Returns:
+        SpreadsheetParser class, or None if its dependencies are missing
+    """
+    try:
+        from spreadsheet_parser import SpreadsheetParser
+    except ImportError:
+        return None
+    return SpreadsheetParser
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Compare job offers with various factors')
@@ -32,9 +40,32 @@ def parse_args():
     parser.add_argument('--save', type=str, help='Save job offers to a JSON file')
     
     # Add spreadsheet-related arguments
-    parser.add_argument('--spreadsheet', type=str, help='Load job offers from a spreadsheet file (CSV or Excel)')
+    parser.add_argument('--spreadsheet', type=str, nargs='+',
+                        help='Load job offers from spreadsheet files (CSV, Excel, Parquet or Feather), '
+                             'directories or glob patterns')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of processes for parsing multiple spreadsheets (default: one per CPU) '
+                             'and for comparing large numbers of offers (default: one)')
+    parser.add_argument('--cache-dir', type=str,
+                        help='Cache parsed spreadsheet offers in this directory so unchanged files load instantly')
+    parser.add_argument('--cache-max-mb', type=int, default=1024,
+                        help='Maximum size of the spreadsheet cache in megabytes (default: 1024)')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Remove all cached spreadsheet offers before loading')
+    parser.add_argument('--top', type=int, default=None,
+                        help='Only show the top N offers in each ranking (default: all)')
+    parser.add_argument('--scoring', type=str,
+                        help='Rank offers by a weighted score defined in a JSON scoring profile '
+                             '(e.g. {"weights": {"take_home_pay": 3, "weekly_commute_hours": 1}})')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Drop offers that duplicate an earlier offer from any source, ignoring differences '
+                             'in whitespace and case')
+    parser.add_argument('--dedupe-tolerance', type=float, metavar='PERCENT',
+                        help='Like --dedupe, and also drop offers with the same company, title and compensation '
+                             'type whose base compensation is within PERCENT of an earlier offer\'s')
     parser.add_argument('--create-template', type=str, 
-                        help='Create a template spreadsheet file (specify output path with .csv or .xlsx extension)')
+                        help='Create a template spreadsheet file (specify output path with .csv, .xlsx, '
+                             '.parquet or .feather extension)')
     
     return parser.parse_args()
 
@@ -47,12 +78,15 @@ def main():
     comparison_engine = ComparisonEngine()
     
     # Check if any spreadsheet operations were requested
-    if (args.spreadsheet or args.create_template) and not spreadsheet_support:
-        ui.display_error(
-            "Spreadsheet functionality requires additional packages.\n"
-            "Please install with: pip install pandas openpyxl"
-        )
-        return 1
+    SpreadsheetParser = None
+    if args.spreadsheet or args.create_template:
+        SpreadsheetParser = load_spreadsheet_parser()
+        if SpreadsheetParser is None:
+            ui.display_error(
+                "Spreadsheet functionality requires additional packages.\n"
+                "Please install with: pip install pandas openpyxl"
+            )
+            return 1
     
     # Create template spreadsheet if requested
     if args.create_template:
@@ -66,6 +100,31 @@ def main():
             ui.display_error(f"Failed to create template: {e}")
             return 1
     
+    # Load the scoring profile before collecting offers, so a bad profile fails fast
+    scoring_profile = None
+    if args.scoring:
+        try:
+            from scoring import ScoringProfile
+            scoring_profile = ScoringProfile.load(args.scoring)
+            # A scorer over no offers checks the metric names
+            comparison_engine.get_scorer(list(scoring_profile.weights), scoring_profile.normalization, results=[])
+        except Exception as e:
+            ui.display_error(f"Failed to load scoring profile from {args.scoring}: {e}")
+            return 1
+    
+    # Check the duplicate tolerance before collecting offers, too
+    dedupe_tolerance = None
+    if args.dedupe_tolerance is not None:
+        # A tolerance implies --dedupe
+        args.dedupe = True
+        dedupe_tolerance = args.dedupe_tolerance / 100
+        try:
+            # An empty index checks the tolerance
+            OfferIndex(dedupe_tolerance)
+        except ValueError as e:
+            ui.display_error(f"Invalid --dedupe-tolerance: {e}")
+            return 1
+    
     # Initialize empty job offers list
     job_offers = []
     
@@ -80,12 +139,32 @@ def main():
             ui.display_error(f"Failed to load job offers from JSON: {e}")
             return 1
     
-    # Load from spreadsheet if specified
+    # Load from spreadsheets if specified
     if args.spreadsheet:
         try:
-            spreadsheet_parser = SpreadsheetParser()
-            spreadsheet_job_offers = spreadsheet_parser.parse_file(args.spreadsheet)
-            ui.display_message(f"Loaded {len(spreadsheet_job_offers)} job offers from spreadsheet {args.spreadsheet}")
+            spreadsheet_parser = SpreadsheetParser(
+                cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 * 1024)
+            if args.clear_cache:
+                spreadsheet_parser.invalidate_cache()
+            spreadsheet_paths = spreadsheet_parser.expand_paths(args.spreadsheet)
+            if not spreadsheet_paths:
+                raise ValueError(f"No spreadsheet files found in {', '.join(args.spreadsheet)}")
+            
+            spreadsheet_job_offers, failures = spreadsheet_parser.parse_files(
+                spreadsheet_paths, max_workers=args.workers)
+            
+            # Report per-file failures without aborting the batch
+            for path, error in failures.items():
+                ui.display_error(f"Failed to load job offers from spreadsheet {path}: {error}")
+            if len(failures) == len(spreadsheet_paths):
+                return 1
+            
+            if len(spreadsheet_paths) == 1:
+                ui.display_message(f"Loaded {len(spreadsheet_job_offers)} job offers from spreadsheet {spreadsheet_paths[0]}")
+            else:
+                ui.display_message(
+                    f"Loaded {len(spreadsheet_job_offers)} job offers from "
+                    f"{len(spreadsheet_paths) - len(failures)} of {len(spreadsheet_paths)} spreadsheets")
             
             # Add to existing job offers or replace
             if job_offers:
@@ -116,13 +195,20 @@ def main():
         for offer in interactive_job_offers:
             comparison_engine.add_offer(offer)
     
+    # Drop duplicates of offers from the same or an earlier source
+    if args.dedupe:
+        removed = comparison_engine.remove_duplicate_offers(dedupe_tolerance)
+        if removed:
+            ui.display_message(f"Removed {removed} duplicate offers.")
+        job_offers = comparison_engine.get_offers()
+    
     # Compare offers
     if len(job_offers) < 2:
         ui.display_error("At least two job offers are needed for comparison")
         return 1
     
     # Get comparison results and format them for the UI
-    raw_comparison_results = comparison_engine.compare_offers()
+    raw_comparison_results = comparison_engine.compare_offers(workers=args.workers)
     
     # Transform results into the format expected by the UI
     comparison_results = {
@@ -210,152 +296,83 @@ def main():
     # Note: These would normally come from comparison_engine.get_rankings() and get_recommendations(),
     # but for simplicity we'll set values based on specific metrics for each category
 
-    # Total value ranking (simplified)
-    sorted_by_value = sorted(
-        comparison_results["offers"], 
-        key=lambda x: x["compensation"]["total_annual_value"], 
-        reverse=True
-    )
-
-    # Create a simple ranking
-    total_value_ranking = []
-    for i, offer in enumerate(sorted_by_value):
-        total_value_ranking.append({
-            "rank": i + 1,
-            "company": offer["company"],
-            "title": offer["title"],
-            "value": offer["compensation"]["total_annual_value"]
-        })
-
-    comparison_results["rankings"]["total_annual_value"] = {
-        "label": "Total Annual Value",
-        "description": "Total annual value including salary, bonuses, and benefits",
-        "ranking": total_value_ranking
-    }
-
-    # Create additional rankings for different metrics
-    # Take home pay ranking
-    sorted_by_take_home = sorted(
-        comparison_results["offers"], 
-        key=lambda x: x["compensation"]["take_home_pay"], 
-        reverse=True
-    )
-    take_home_ranking = []
-    for i, offer in enumerate(sorted_by_take_home):
-        take_home_ranking.append({
-            "rank": i + 1,
-            "company": offer["company"],
-            "title": offer["title"],
-            "value": offer["compensation"]["take_home_pay"]
-        })
-    comparison_results["rankings"]["take_home_pay"] = {
-        "label": "Take-Home Pay",
-        "description": "Annual take-home pay after taxes",
-        "ranking": take_home_ranking
-    }
+    # Compute every ranking value in one pass over the offers
+    offers = comparison_results["offers"]
+    total_values = []
+    take_home_pays = []
+    benefits_values = []
+    hourly_rates = []
+    col_adjusted_values = []
+    for offer in offers:
+        total_values.append(offer["compensation"]["total_annual_value"])
+        take_home_pays.append(offer["compensation"]["take_home_pay"])
+        benefits_values.append(offer["benefits_value"]["total"])
+        hourly_rates.append(offer["compensation"]["hourly_rate"])
 
-    # Benefits value ranking
-    sorted_by_benefits = sorted(
-        comparison_results["offers"], 
-        key=lambda x: x["benefits_value"]["total"], 
-        reverse=True
-    )
-    benefits_ranking = []
-    for i, offer in enumerate(sorted_by_benefits):
-        benefits_ranking.append({
-            "rank": i + 1,
-            "company": offer["company"],
-            "title": offer["title"],
-            "value": offer["benefits_value"]["total"]
-        })
-    comparison_results["rankings"]["benefits_value"] = {
-        "label": "Benefits Value",
-        "description": "Total value of all benefits",
-        "ranking": benefits_ranking
-    }
+        # Cost of living adjusted value
+        # Note: This is a simplistic approach. A real implementation would do a more
+        # sophisticated calculation based on actual cost of living differences
+        col_index = 100  # Default
+        # Use cost of living index if available in the data (not currently passed through)
+        col_adjusted_values.append(offer["compensation"]["total_annual_value"] * (100 / col_index))
 
-    # Hourly rate ranking
-    sorted_by_hourly = sorted(
-        comparison_results["offers"], 
-        key=lambda x: x["compensation"]["hourly_rate"], 
-        reverse=True
-    )
-    hourly_ranking = []
-    for i, offer in enumerate(sorted_by_hourly):
-        hourly_ranking.append({
-            "rank": i + 1,
-            "company": offer["company"],
-            "title": offer["title"],
-            "value": offer["compensation"]["hourly_rate"]
-        })
-    comparison_results["rankings"]["hourly_rate"] = {
-        "label": "Hourly Rate",
-        "description": "Base hourly compensation rate",
-        "ranking": hourly_ranking
-    }
+    # Work-life balance is scored the same way as the engine's recommendation
+    work_life_scores = [work_life_score(result) for result in raw_comparison_results]
 
-    # Work-life balance ranking (simplistic implementation)
-    # For this example, we'll use a simple heuristic: remote > hybrid > onsite,
-    # and consider commute time and effective hours (including commute)
-    work_life_scores = []
-    for offer in comparison_results["offers"]:
-        score = 0
-        # Remote work is preferred
-        if offer["work_location_type"] == "Remote":
-            score += 10
-        elif offer["work_location_type"] == "Hybrid":
-            score += 5
-        
-        # Account for commute time
-        if "monthly_commute_cost" in offer["compensation"]:
-            # Lower commute cost is better
-            score -= offer["compensation"]["monthly_commute_cost"] / 100
-        
-        work_life_scores.append((offer, score))
+    ranking_criteria = [
+        ("total_annual_value", "Total Annual Value",
+         "Total annual value including salary, bonuses, and benefits", total_values),
+        ("take_home_pay", "Take-Home Pay",
+         "Annual take-home pay after taxes", take_home_pays),
+        ("benefits_value", "Benefits Value",
+         "Total value of all benefits", benefits_values),
+        ("hourly_rate", "Hourly Rate",
+         "Base hourly compensation rate", hourly_rates),
+        ("work_life_balance", "Work-Life Balance",
+         "Paid time off minus yearly hours of work and commuting (higher is better)", work_life_scores),
+    ]
+    if scoring_profile is not None:
+        scores = comparison_engine.get_scorer(
+            list(scoring_profile.weights), scoring_profile.normalization, raw_comparison_results
+        ).score(scoring_profile.weights).tolist()
+        ranking_criteria.append(("weighted_score", "Weighted Score", f"Weighted score from {args.scoring}", scores))
 
-    # Sort by score (higher is better)
-    sorted_by_work_life = sorted(work_life_scores, key=lambda x: x[1], reverse=True)
-    work_life_ranking = []
-    for i, (offer, score) in enumerate(sorted_by_work_life):
-        work_life_ranking.append({
-            "rank": i + 1,
-            "company": offer["company"],
-            "title": offer["title"],
-            "value": score
-        })
-    comparison_results["rankings"]["work_life_balance"] = {
-        "label": "Work-Life Balance",
-        "description": "Score based on work location type, commute, and flexibility",
-        "ranking": work_life_ranking
-    }
+    # Only the top offers of each criterion are selected and ranked (higher is better)
+    best = {}
+    for criterion, label, description, values in ranking_criteria:
+        indices = top_indices(values, args.top)
+        best[criterion] = indices[0] if indices else None
+        comparison_results["rankings"][criterion] = {
+            "label": label,
+            "description": description,
+            "ranking": [
+                {
+                    "rank": rank,
+                    "company": offers[i]["company"],
+                    "title": offers[i]["title"],
+                    "value": values[i]
+                }
+                for rank, i in enumerate(indices, 1)
+            ]
+        }
+    best_col_adjusted = top_indices(col_adjusted_values, 1)
 
     # Now set specific recommendations based on the appropriate rankings
-    if sorted_by_value and len(sorted_by_value) > 0:
-        comparison_results["recommendations"]["best_overall"] = sorted_by_value[0]["company"]
+    if best["total_annual_value"] is not None:
+        comparison_results["recommendations"]["best_overall"] = offers[best["total_annual_value"]]["company"]
 
-    if sorted_by_take_home and len(sorted_by_take_home) > 0:
-        comparison_results["recommendations"]["best_after_tax"] = sorted_by_take_home[0]["company"]
-        comparison_results["recommendations"]["best_total_comp"] = sorted_by_take_home[0]["company"]
+    if best["take_home_pay"] is not None:
+        comparison_results["recommendations"]["best_after_tax"] = offers[best["take_home_pay"]]["company"]
+        comparison_results["recommendations"]["best_total_comp"] = offers[best["take_home_pay"]]["company"]
 
-    if sorted_by_benefits and len(sorted_by_benefits) > 0:
-        comparison_results["recommendations"]["best_benefits"] = sorted_by_benefits[0]["company"]
+    if best["benefits_value"] is not None:
+        comparison_results["recommendations"]["best_benefits"] = offers[best["benefits_value"]]["company"]
 
-    if sorted_by_work_life and len(sorted_by_work_life) > 0:
-        comparison_results["recommendations"]["best_work_life_balance"] = sorted_by_work_life[0][0]["company"]
-
-    # Cost of living adjusted value
-    # Note: This is a simplistic approach. A real implementation would do a more
-    # sophisticated calculation based on actual cost of living differences
-    col_adjusted_values = []
-    for offer in comparison_results["offers"]:
-        col_index = 100  # Default
-        # Use cost of living index if available in the data (not currently passed through)
-        adjusted_value = offer["compensation"]["total_annual_value"] * (100 / col_index)
-        col_adjusted_values.append((offer, adjusted_value))
+    if best["work_life_balance"] is not None:
+        comparison_results["recommendations"]["best_work_life_balance"] = offers[best["work_life_balance"]]["company"]
 
-    sorted_by_col = sorted(col_adjusted_values, key=lambda x: x[1], reverse=True)
-    if sorted_by_col and len(sorted_by_col) > 0:
-        comparison_results["recommendations"]["best_col_adjusted"] = sorted_by_col[0][0]["company"]
+    if best_col_adjusted:
+        comparison_results["recommendations"]["best_col_adjusted"] = offers[best_col_adjusted[0]]["company"]
     
     # Display the transformed comparison results
     ui.display_comparison_results(comparison_results)
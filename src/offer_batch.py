@@ -0,0 +1,499 @@
+"""
+Columnar (struct-of-arrays) view of many job offers for vectorized comparison
+
+OfferBatch holds one NumPy array per numeric JobOffer, Benefits and commute
+field, so the comparison metrics for all offers can be computed with array
+operations instead of one offer at a time. Every calculation mirrors the
+per-offer code in JobOffer, TaxCalculator, BenefitsCalculator and
+CommuteCalculator operation for operation, so the results are the same
+numbers.
+"""
+
+import itertools
+from operator import attrgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from benefits_calculator import BenefitsCalculator
+from commute_calculator import CommuteCalculator, DriveType
+from comparison_result import BenefitsBreakdown, CompensationResult
+from job_offer import JobOffer, CommuteCalculationType, CompensationType, EmploymentType, WorkLocationType
+from tax_calculator import TaxCalculator
+
+
+# Numeric JobOffer attributes used by the comparison
+OFFER_COLUMNS = [
+    'base_compensation', 'hours_per_week', 'weeks_per_year', 'bonus_amount', 'signing_bonus',
+    'relocation_package', 'cost_of_living_index', 'commute_time_minutes', 'commute_days_per_week',
+    'commute_cost_monthly', 'expected_hours_per_week', 'expected_tenure_years',
+]
+
+# Numeric Benefits attributes
+BENEFITS_COLUMNS = [
+    'retirement_match_percent', 'retirement_match_limit',
+    'health_insurance_monthly_premium', 'health_insurance_coverage_percent',
+    'dental_insurance_monthly_premium', 'dental_insurance_coverage_percent',
+    'vision_insurance_monthly_premium', 'vision_insurance_coverage_percent',
+    'life_insurance_coverage', 'life_insurance_monthly_premium',
+    'paid_time_off_days', 'paid_holidays', 'paid_sick_days', 'paid_parental_leave_weeks',
+    'equity_value', 'other_benefits_value',
+]
+
+# Numeric CommuteDetails attributes, stored with a 'commute_details_' prefix
+COMMUTE_DETAILS_COLUMNS = [
+    'distance_miles', 'fuel_cost_per_gallon', 'city_mpg', 'highway_mpg', 'combined_mpg',
+]
+
+# Columns that OfferBatch.broadcast can replace
+OVERRIDABLE_COLUMNS = (OFFER_COLUMNS + BENEFITS_COLUMNS
+                       + ['commute_details_' + name for name in COMMUTE_DETAILS_COLUMNS]
+                       + ['bonus_guaranteed', 'commute_details_include_maintenance'])
+
+# Keys of the per-offer result records, in field order; compensation_type is not numeric
+BENEFITS_KEYS = list(BenefitsBreakdown.__dataclass_fields__)
+COMPENSATION_KEYS = [key for key in CompensationResult.__dataclass_fields__ if key != 'compensation_type']
+
+
+def _python_min(a: np.ndarray, b) -> np.ndarray:
+    """Element-wise min(a, b) with Python's semantics (a unless b < a), including for NaN"""
+    return np.where(b < a, b, a)
+
+
+def _python_max_zero(values: np.ndarray) -> np.ndarray:
+    """Element-wise max(0, values) with Python's semantics (values only if they are > 0)"""
+    return np.where(values > 0, values, 0.0)
+
+
+def _parse_location(location: str):
+    """Split a location into (state, locality) the way ComparisonEngine does"""
+    location_parts = location.split(", ")
+    state = location_parts[-1] if len(location_parts) > 1 else ""
+    if len(state) > 2:
+        state = state[-2:]
+    locality = location_parts[0] if len(location_parts) > 1 else ""
+    return state, locality
+
+
+def top_k_indices(values: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the largest values, largest first, with ties in index order
+    
+    Matches comparison_engine.top_indices, but selects the candidates with a
+    partial sort (np.partition) so only top_k values are fully sorted.
+    
+    Args:
+        values: Array of values to rank
+        top_k: Number of indices to return; all if None
+        
+    Returns:
+        Array of indices into values
+    """
+    count = len(values)
+    if top_k is None or top_k >= count:
+        candidates = np.arange(count)
+    elif top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    else:
+        # Everything above the top_k-th largest value, then the earliest ties with it
+        threshold = np.partition(values, count - top_k)[count - top_k]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:top_k - len(above)]
+        candidates = np.concatenate((above, ties))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+class OfferBatch:
+    """Struct-of-arrays copy of a list of job offers"""
+    
+    def __init__(self, offers: Sequence[JobOffer]):
+        """
+        Build the column arrays for a list of job offers
+        
+        Args:
+            offers: JobOffer objects; the batch keeps a reference for building results
+        """
+        self.offers = list(offers)
+        count = len(self.offers)
+        
+        def numeric_columns(objects, names, prefix=''):
+            # One pass over the objects, reading all attributes of each
+            values = np.fromiter(itertools.chain.from_iterable(map(attrgetter(*names), objects)),
+                                 dtype=np.float64, count=count * len(names)).reshape(count, len(names))
+            for i, name in enumerate(names):
+                setattr(self, prefix + name, np.ascontiguousarray(values[:, i]))
+        
+        def bool_column(objects, name):
+            return np.fromiter(map(bool, map(attrgetter(name), objects)), dtype=bool, count=count)
+        
+        def enum_codes(objects, name, enum):
+            # Position of each value in the enum, or -1 for anything else (e.g. None)
+            positions = {member: i for i, member in enumerate(enum)}
+            return np.fromiter(map(positions.get, map(attrgetter(name), objects), itertools.repeat(-1)),
+                               dtype=np.int64, count=count)
+        
+        benefits = list(map(attrgetter('benefits'), self.offers))
+        commute_details = list(map(attrgetter('commute_details'), self.offers))
+        numeric_columns(self.offers, OFFER_COLUMNS)
+        numeric_columns(benefits, BENEFITS_COLUMNS)
+        numeric_columns(commute_details, COMMUTE_DETAILS_COLUMNS, prefix='commute_details_')
+        
+        compensation_types = enum_codes(self.offers, 'compensation_type', CompensationType)
+        drive_types = enum_codes(commute_details, 'drive_type', DriveType)
+        members = list(CompensationType), list(DriveType)
+        self.bonus_guaranteed = bool_column(self.offers, 'bonus_guaranteed')
+        self.is_salary = compensation_types == members[0].index(CompensationType.SALARY)
+        self.is_hourly = compensation_types == members[0].index(CompensationType.HOURLY)
+        self.is_remote = enum_codes(self.offers, 'work_location_type', WorkLocationType) == \
+            list(WorkLocationType).index(WorkLocationType.REMOTE)
+        self.is_w2 = enum_codes(self.offers, 'employment_type', EmploymentType) == \
+            list(EmploymentType).index(EmploymentType.W2)
+        self.is_distance_based = enum_codes(self.offers, 'commute_calc_type', CommuteCalculationType) == \
+            list(CommuteCalculationType).index(CommuteCalculationType.DISTANCE_BASED)
+        self.commute_details_is_city = drive_types == members[1].index(DriveType.CITY)
+        self.commute_details_is_highway = drive_types == members[1].index(DriveType.HIGHWAY)
+        self.commute_details_include_maintenance = bool_column(commute_details, 'include_maintenance')
+        
+        # Locations are parsed once per distinct value
+        locations = list(map(attrgetter('location'), self.offers))
+        self.locations = list(dict.fromkeys(locations))
+        location_codes = {location: i for i, location in enumerate(self.locations)}
+        self.location_codes = np.fromiter(map(location_codes.__getitem__, locations), dtype=np.int64, count=count)
+    
+    def __len__(self) -> int:
+        return len(self.offers)
+    
+    def __getitem__(self, index) -> 'OfferBatch':
+        """
+        Batch of some of the offers
+        
+        A slice shares the column data; an array of positions (which may
+        repeat) copies the selected rows.
+        """
+        if isinstance(index, slice):
+            offers = self.offers[index]
+        elif isinstance(index, np.ndarray) and index.ndim == 1 and np.issubdtype(index.dtype, np.integer):
+            offers = [self.offers[position] for position in index.tolist()]
+        else:
+            raise TypeError(f"OfferBatch indices must be slices or integer arrays, not {type(index).__name__}")
+        batch = object.__new__(OfferBatch)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                value = value[index]
+            setattr(batch, name, value)
+        batch.offers = offers
+        return batch
+    
+    def broadcast(self, overrides: Dict[str, np.ndarray], shape: Tuple[int, ...]) -> 'OfferBatch':
+        """
+        Copy of the batch with columns replaced by arrays over extra axes
+        
+        Every column is viewed with shape (offers, 1, ..., 1), one 1 per
+        extra axis, so the comparison methods broadcast it against the
+        overrides and compute every metric for all values of the extra axes
+        at once, without copying the other columns. Each resulting array
+        broadcasts to (offers, *shape).
+        
+        Args:
+            overrides: Arrays for columns of OVERRIDABLE_COLUMNS, each
+                       broadcastable to (offers, *shape)
+            shape: Sizes of the extra axes
+        
+        Returns:
+            OfferBatch sharing the offers and column data of this batch
+        
+        Raises:
+            ValueError: If a column cannot be overridden or an array does not broadcast
+        """
+        full_shape = (len(self),) + tuple(shape)
+        column_shape = (len(self),) + (1,) * len(shape)
+        batch = object.__new__(OfferBatch)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                value = value.reshape(column_shape)
+            setattr(batch, name, value)
+        
+        for name, value in overrides.items():
+            if name not in OVERRIDABLE_COLUMNS:
+                raise ValueError(f"Cannot override {name}; expected one of {', '.join(OVERRIDABLE_COLUMNS)}")
+            value = np.asarray(value, dtype=getattr(self, name).dtype)
+            if np.broadcast_shapes(value.shape, full_shape) != full_shape:
+                raise ValueError(f"Override of {name} with shape {value.shape} does not broadcast to {full_shape}")
+            setattr(batch, name, value)
+        return batch
+    
+    @property
+    def base_salary(self) -> np.ndarray:
+        """Annual base salaries, calculated from hourly rates where needed"""
+        return np.where(self.is_salary, self.base_compensation,
+                        self.base_compensation * self.hours_per_week * self.weeks_per_year)
+    
+    @property
+    def hourly_rate(self) -> np.ndarray:
+        """Hourly rates, calculated from annual salaries where needed"""
+        annual_hours = self.hours_per_week * self.weeks_per_year
+        self._check_divisor(~self.is_hourly, annual_hours)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.is_hourly, self.base_compensation, self.base_compensation / annual_hours)
+    
+    def calculate_annual_gross_income(self) -> np.ndarray:
+        """Calculate annual gross income including salary and bonuses"""
+        annual_income = self.base_salary
+        annual_income = np.where(self.bonus_guaranteed, annual_income + self.bonus_amount, annual_income)
+        
+        # Amortize signing bonus and relocation over expected tenure
+        has_tenure = self.expected_tenure_years > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amortized = (self.signing_bonus + self.relocation_package) / self.expected_tenure_years
+        return np.where(has_tenure, annual_income + amortized, annual_income)
+    
+    def calculate_effective_tax_rates(self, tax_calculator: TaxCalculator) -> np.ndarray:
+        """
+        Calculate the effective tax rate of every offer
+        
+        Mirrors ComparisonEngine.calculate_effective_tax_rate and
+        TaxCalculator.calculate_effective_tax_rate for single filers.
+        
+        Args:
+            tax_calculator: TaxCalculator providing brackets and rates
+        
+        Returns:
+            Array of effective tax rates as decimals
+        """
+        income = self.base_salary
+        
+        federal_tax = self._calculate_federal_tax(income, tax_calculator.federal_brackets)
+        
+        # State and local rates, looked up once per distinct location
+        state_rates = np.empty(len(self.locations))
+        local_rates = np.empty(len(self.locations))
+        for i, location in enumerate(self.locations):
+            state, locality = _parse_location(location)
+            state_rates[i] = tax_calculator.state_tax_rates.get(state.upper(), 0)
+            local_rates[i] = tax_calculator.local_tax_rates.get(locality, 0)
+        state_tax = income * state_rates[self.location_codes]
+        local_tax = income * local_rates[self.location_codes]
+        
+        # FICA taxes for W2 employees
+        ss_tax = _python_min(income, tax_calculator.social_security_wage_base) * tax_calculator.social_security_rate
+        medicare_tax = income * tax_calculator.medicare_rate
+        medicare_tax = np.where(income > 200000,
+                                medicare_tax + (income - 200000) * tax_calculator.additional_medicare_rate,
+                                medicare_tax)
+        fica_tax = np.where(self.is_w2, ss_tax + medicare_tax, 0.0)
+        
+        total_tax = federal_tax + state_tax + local_tax + fica_tax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(income > 0, total_tax / income, 0.0)
+    
+    @staticmethod
+    def _calculate_federal_tax(income: np.ndarray, brackets) -> np.ndarray:
+        """
+        Calculate federal income tax with the same additions as TaxCalculator._calculate_federal_tax
+        
+        Every bracket below an income's top bracket is taxed in full, so for
+        contiguous brackets the tax is the running total of the full brackets
+        below it (added in the same order) plus the partial top bracket.
+        """
+        lowers = [lower for lower, _, _ in brackets]
+        uppers = [upper for _, upper, _ in brackets]
+        if lowers != sorted(lowers) or lowers[1:] != uppers[:-1]:
+            # Arbitrary brackets: add them one at a time like the per-offer code
+            federal_tax = np.zeros(np.shape(income))
+            for lower, upper, rate in brackets:
+                taxable_in_bracket = _python_min(income, upper) - lower
+                federal_tax = np.where(income > lower, federal_tax + taxable_in_bracket * rate, federal_tax)
+            return federal_tax
+        
+        full_bracket_totals = [0]
+        for lower, upper, rate in brackets[:-1]:
+            full_bracket_totals.append(full_bracket_totals[-1] + (upper - lower) * rate)
+        
+        # Top bracket: the last one whose lower bound is below the income
+        top = np.maximum(np.searchsorted(np.array(lowers, dtype=np.float64), income, side='left') - 1, 0)
+        top_lowers = np.array(lowers, dtype=np.float64)[top]
+        top_uppers = np.array(uppers, dtype=np.float64)[top]
+        top_rates = np.array([rate for _, _, rate in brackets], dtype=np.float64)[top]
+        federal_tax = (np.array(full_bracket_totals, dtype=np.float64)[top]
+                       + (_python_min(income, top_uppers) - top_lowers) * top_rates)
+        return np.where(income > lowers[0], federal_tax, 0.0)
+    
+    def calculate_total_benefits_values(self, benefits_calculator: BenefitsCalculator) -> Dict[str, np.ndarray]:
+        """
+        Calculate the annual value of every offer's benefits
+        
+        Mirrors BenefitsCalculator.calculate_total_benefits_value.
+        
+        Args:
+            benefits_calculator: BenefitsCalculator providing average costs
+        
+        Returns:
+            Dictionary of arrays with values for each benefit type and total
+        """
+        salary = self.base_salary
+        daily_rate = salary / 260
+        weekly_rate = salary / 52
+        
+        def insurance_value(market_value, premium, coverage_percent):
+            return _python_max_zero(market_value * coverage_percent - premium * 12)
+        
+        result = {
+            "retirement": _python_min(salary * self.retirement_match_percent, self.retirement_match_limit),
+            "health_insurance": insurance_value(benefits_calculator.avg_health_insurance_cost,
+                                                self.health_insurance_monthly_premium,
+                                                self.health_insurance_coverage_percent),
+            "dental_insurance": insurance_value(benefits_calculator.avg_dental_insurance_cost,
+                                                self.dental_insurance_monthly_premium,
+                                                self.dental_insurance_coverage_percent),
+            "vision_insurance": insurance_value(benefits_calculator.avg_vision_insurance_cost,
+                                                self.vision_insurance_monthly_premium,
+                                                self.vision_insurance_coverage_percent),
+            "life_insurance": _python_max_zero(self.life_insurance_coverage / 1000
+                                               - self.life_insurance_monthly_premium * 12),
+            "time_off": (self.paid_time_off_days + self.paid_holidays + self.paid_sick_days) * daily_rate,
+            "parental_leave": weekly_rate * self.paid_parental_leave_weeks * 2 / 20,
+            "equity": self.equity_value,
+            "other": self.other_benefits_value,
+        }
+        
+        total = np.zeros(np.shape(salary))
+        for values in result.values():
+            total = total + values
+        result["total"] = total
+        
+        return result
+    
+    def calculate_monthly_commute_costs(self, commute_calculator: CommuteCalculator) -> np.ndarray:
+        """
+        Calculate every offer's distance-based monthly commute cost from its commute details
+        
+        Mirrors CommuteCalculator.calculate_monthly_commute_cost.
+        
+        Args:
+            commute_calculator: CommuteCalculator providing defaults
+        
+        Returns:
+            Array of total monthly commute costs
+        """
+        def or_default(values, default):
+            return np.where(values != 0, values, default)
+        
+        fuel_cost = or_default(self.commute_details_fuel_cost_per_gallon, commute_calculator.default_fuel_cost)
+        effective_mpg = np.where(
+            self.commute_details_is_city,
+            or_default(self.commute_details_city_mpg, commute_calculator.default_city_mpg),
+            np.where(self.commute_details_is_highway,
+                     or_default(self.commute_details_highway_mpg, commute_calculator.default_highway_mpg),
+                     or_default(self.commute_details_combined_mpg, commute_calculator.default_combined_mpg)))
+        
+        monthly_distance = self.commute_details_distance_miles * 2 * self.commute_days_per_week * 4.33
+        with np.errstate(divide='ignore', invalid='ignore'):
+            monthly_fuel_cost = np.where(effective_mpg > 0, monthly_distance / effective_mpg * fuel_cost, 0.0)
+        monthly_maintenance_cost = np.where(
+            self.commute_details_include_maintenance,
+            monthly_distance * commute_calculator.default_maintenance_cost_per_mile, 0.0)
+        
+        return monthly_fuel_cost + monthly_maintenance_cost
+    
+    def calculate_total_compensation(self, effective_tax_rates: np.ndarray,
+                                     commute_calculator: CommuteCalculator = None) -> Dict[str, np.ndarray]:
+        """
+        Calculate total compensation and adjusted values for every offer
+        
+        Mirrors JobOffer.calculate_total_compensation, without the
+        'compensation_type' label.
+        
+        Args:
+            effective_tax_rates: Array of effective tax rates as decimals
+            commute_calculator: Optional commute calculator for distance-based commute costs
+        
+        Returns:
+            Dictionary of arrays with compensation calculations
+        """
+        self._check_divisor(np.ones(np.shape(self.cost_of_living_index), dtype=bool), self.cost_of_living_index)
+        
+        base_salary = self.base_salary
+        hourly_rate = self.hourly_rate
+        gross_income = self.calculate_annual_gross_income()
+        
+        tax_amount = gross_income * effective_tax_rates
+        take_home_pay = gross_income - tax_amount
+        
+        # Commute cost: nothing when remote, calculated or entered otherwise
+        monthly_commute_cost = self.commute_cost_monthly
+        if commute_calculator:
+            monthly_commute_cost = np.where(self.is_distance_based,
+                                            self.calculate_monthly_commute_costs(commute_calculator),
+                                            monthly_commute_cost)
+        monthly_commute_cost = np.where(self.is_remote, 0.0, monthly_commute_cost)
+        annual_commute_cost = monthly_commute_cost * 12
+        
+        col_factor = 100 / self.cost_of_living_index
+        
+        # Commute time as lost compensation
+        weekly_commute_hours = np.where(self.is_remote, 0.0,
+                                        self.commute_time_minutes / 60 * 2 * self.commute_days_per_week)
+        total_weekly_hours = self.expected_hours_per_week + weekly_commute_hours
+        
+        has_hours = total_weekly_hours > 0
+        has_expected_hours = self.expected_hours_per_week > 0
+        self._check_divisor(has_hours | has_expected_hours, self.weeks_per_year)
+        workdays_per_year = self.weeks_per_year * 5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            commute_adjusted_hourly_rate = np.where(
+                has_hours, (gross_income - annual_commute_cost) / (total_weekly_hours * self.weeks_per_year), 0.0)
+            effective_hourly_rate = np.where(
+                has_expected_hours, gross_income / (self.expected_hours_per_week * self.weeks_per_year), 0.0)
+            daily_value = np.where(workdays_per_year > 0, gross_income / workdays_per_year, 0.0)
+        
+        return {
+            "base_salary": base_salary,
+            "hourly_rate": hourly_rate,
+            "annual_gross_income": gross_income,
+            "tax_amount": tax_amount,
+            "take_home_pay": take_home_pay,
+            "monthly_commute_cost": monthly_commute_cost,
+            "annual_commute_cost": annual_commute_cost,
+            "total_direct_compensation": gross_income,
+            "col_adjusted_income": gross_income * col_factor,
+            "col_adjusted_take_home": take_home_pay * col_factor,
+            "weekly_commute_hours": weekly_commute_hours,
+            "total_weekly_hours": total_weekly_hours,
+            "effective_hourly_rate": effective_hourly_rate,
+            "commute_adjusted_hourly_rate": commute_adjusted_hourly_rate,
+            "col_adjusted_value": gross_income * col_factor,
+            "daily_value": daily_value,
+            "total_annual_value": gross_income
+        }
+    
+    def to_results(self, columns: Dict) -> List[Dict]:
+        """
+        Convert columnar comparison results to the per-offer format of ComparisonEngine.compare_offers
+        
+        Args:
+            columns: Result of ComparisonEngine.compare_batch for this batch
+        
+        Returns:
+            List of dictionaries with comparison results for each offer
+        """
+        benefits = columns["benefits_value"]
+        compensation = columns["compensation"]
+        benefits_rows = zip(*(benefits[key].tolist() for key in BENEFITS_KEYS))
+        compensation_rows = zip(*(compensation[key].tolist() for key in COMPENSATION_KEYS))
+        
+        results = []
+        for offer, tax_rate, benefits_row, compensation_row in zip(
+                self.offers, columns["effective_tax_rate"].tolist(), benefits_rows, compensation_rows):
+            results.append({
+                "offer": offer,
+                "effective_tax_rate": tax_rate,
+                "benefits_value": BenefitsBreakdown(*benefits_row),
+                "compensation": CompensationResult(offer.compensation_type.value, *compensation_row)
+            })
+        return results
+    
+    @staticmethod
+    def _check_divisor(mask: np.ndarray, divisor: np.ndarray) -> None:
+        """Raise ZeroDivisionError where the per-offer code would divide by zero"""
+        if (mask & (divisor == 0)).any():
+            raise ZeroDivisionError("float division by zero")
@@ -0,0 +1,258 @@
+"""
+Index of job offer contents for finding duplicate offers
+
+Offers merged from saved files, spreadsheets and interactive entry often
+contain the same offer twice. offer_fingerprint reduces an offer to a tuple
+of its fields, with text fields whitespace-collapsed and case-folded, so
+copies of an offer have equal fingerprints whatever their source.
+
+OfferIndex finds the indexed offer that a new offer duplicates, in one of
+two modes:
+
+    exact:  equal fingerprints, looked up by the fingerprint's hash
+    near:   same company, title and compensation type, with base
+            compensations within a tolerance (e.g. 0.02 for 2%) of each
+            other, looked up by binary search in the offers of that company
+            and title sorted by compensation
+
+Both take O(1) or O(log n) per offer, so deduplicating n offers is roughly
+linear in n. Near mode also finds exact duplicates, which have the same
+company, title and compensation.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from operator import attrgetter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from job_offer import JobOffer
+
+
+# Text attributes of a JobOffer, normalized in fingerprints
+TEXT_FIELDS = ('title', 'company', 'location')
+
+# Other JobOffer attributes in fingerprints; benefits and commute_details are
+# expanded into their own fields
+OFFER_FIELDS = (
+    'work_location_type', 'employment_type', 'compensation_type', 'base_compensation', 'hours_per_week',
+    'weeks_per_year', 'bonus_amount', 'bonus_guaranteed', 'signing_bonus', 'relocation_package',
+    'state_tax_rate', 'local_tax_rate', 'self_employment_expenses', 'business_expenses', 'cost_of_living_index',
+    'commute_time_minutes', 'commute_days_per_week', 'commute_calc_type', 'commute_cost_monthly',
+    'commute_distance_miles', 'commute_drive_type', 'commute_fuel_cost', 'commute_city_mpg',
+    'commute_highway_mpg', 'commute_combined_mpg', 'commute_include_maintenance', 'use_calculated_commute_cost',
+    'expected_hours_per_week', 'expected_tenure_years',
+)
+
+# Benefits attributes in fingerprints, other than other_benefits_description
+BENEFITS_FIELDS = (
+    'retirement_match_percent', 'retirement_match_limit',
+    'health_insurance_monthly_premium', 'health_insurance_coverage_percent',
+    'dental_insurance_monthly_premium', 'dental_insurance_coverage_percent',
+    'vision_insurance_monthly_premium', 'vision_insurance_coverage_percent',
+    'life_insurance_coverage', 'life_insurance_monthly_premium',
+    'paid_time_off_days', 'paid_holidays', 'paid_sick_days', 'paid_parental_leave_weeks',
+    'equity_value', 'other_benefits_value',
+)
+
+# CommuteDetails attributes in fingerprints
+COMMUTE_DETAILS_FIELDS = (
+    'distance_miles', 'drive_type', 'fuel_cost_per_gallon', 'city_mpg', 'highway_mpg', 'combined_mpg',
+    'include_maintenance',
+)
+
+_text_fields = attrgetter(*TEXT_FIELDS)
+_offer_fields = attrgetter(*OFFER_FIELDS)
+_benefits_fields = attrgetter(*BENEFITS_FIELDS)
+_commute_details_fields = attrgetter(*COMMUTE_DETAILS_FIELDS)
+
+
+def normalize_text(text: str) -> str:
+    """Text with runs of whitespace collapsed to single spaces, trimmed and case-folded"""
+    return " ".join(text.split()).casefold()
+
+
+def offer_fingerprint(offer: JobOffer) -> Tuple:
+    """
+    Normalized contents of a job offer
+    
+    Args:
+        offer: JobOffer to fingerprint
+    
+    Returns:
+        Tuple of the offer's fields; equal for offers that differ only in
+        the whitespace or case of their text
+    """
+    title, company, location = _text_fields(offer)
+    benefits = offer.benefits
+    return ((normalize_text(title), normalize_text(company), normalize_text(location),
+             normalize_text(benefits.other_benefits_description))
+            + _offer_fields(offer) + _benefits_fields(benefits) + _commute_details_fields(offer.commute_details))
+
+
+def within_tolerance(a: float, b: float, tolerance: float) -> bool:
+    """Whether two amounts differ by at most a fraction of the larger one's magnitude"""
+    return abs(a - b) <= tolerance * max(abs(a), abs(b))
+
+
+class OfferIndex:
+    """Offers by content, to find the offer that another offer duplicates"""
+    
+    def __init__(self, tolerance: Optional[float] = None):
+        """
+        Initialize an empty index
+        
+        Args:
+            tolerance: Fraction by which the base compensations of near
+                       duplicates may differ, e.g. 0.02; None to find exact
+                       duplicates only
+        
+        Raises:
+            ValueError: If the tolerance is not in [0, 1)
+        """
+        if tolerance is not None and not 0 <= tolerance < 1:
+            raise ValueError(f"Duplicate tolerance must be at least 0 and less than 1, got {tolerance}")
+        self.tolerance = tolerance
+        
+        # Per key: the offer and where it is filed (fingerprint hash, or
+        # bucket and sorted entry), so it can be removed after the offer changes
+        self._entries: Dict[Hashable, Tuple] = {}
+        # Exact mode: keys of the offers per fingerprint hash
+        self._hashes: Dict[int, List[Hashable]] = {}
+        # Near mode: (base compensation, sequence number, key) per company,
+        # title and compensation type, sorted; the sequence number orders
+        # equal compensations by insertion and keeps keys from being compared
+        self._buckets: Dict[Tuple, List[Tuple]] = {}
+        self._sequence = count()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def find(self, offer: JobOffer) -> Optional[Hashable]:
+        """
+        Find the indexed offer that an offer duplicates
+        
+        Args:
+            offer: JobOffer to look up
+        
+        Returns:
+            Key of the earliest added matching offer, or None if there is none
+        """
+        return self._find(offer, self._filing(offer))
+    
+    def add(self, key: Hashable, offer: JobOffer) -> None:
+        """
+        Index an offer, replacing any offer with the same key
+        
+        Args:
+            key: Identifier of the offer, returned by find
+            offer: JobOffer to index
+        """
+        self.discard(key)
+        self._add(key, offer, self._filing(offer))
+    
+    def add_unique(self, key: Hashable, offer: JobOffer) -> Optional[Hashable]:
+        """
+        Index an offer unless it duplicates an indexed offer
+        
+        Same as find followed by add if nothing was found, but normalizes
+        the offer only once.
+        
+        Args:
+            key: Identifier of the offer; must not be indexed yet
+            offer: JobOffer to index
+        
+        Returns:
+            Key of the offer it duplicates, or None if it was indexed
+        """
+        filing = self._filing(offer)
+        original = self._find(offer, filing)
+        if original is None:
+            self._add(key, offer, filing)
+        return original
+    
+    def discard(self, key: Hashable) -> None:
+        """
+        Remove an offer from the index, if it is indexed
+        
+        Args:
+            key: Identifier the offer was added with
+        """
+        filed = self._entries.pop(key, None)
+        if filed is None:
+            return
+        if self.tolerance is None:
+            keys = self._hashes[filed[1]]
+            keys.remove(key)
+            if not keys:
+                del self._hashes[filed[1]]
+        else:
+            _, bucket_key, entry = filed
+            bucket = self._buckets[bucket_key]
+            del bucket[bisect_left(bucket, entry[:2])]
+            if not bucket:
+                del self._buckets[bucket_key]
+    
+    def _filing(self, offer: JobOffer) -> Tuple:
+        """Normalized offer for the mode: (fingerprint, its hash) or (bucket key,)"""
+        if self.tolerance is None:
+            fingerprint = offer_fingerprint(offer)
+            return fingerprint, hash(fingerprint)
+        return (normalize_text(offer.company), normalize_text(offer.title), offer.compensation_type),
+    
+    def _find(self, offer: JobOffer, filing: Tuple) -> Optional[Hashable]:
+        """Key of the earliest indexed duplicate of an offer filed as given"""
+        if self.tolerance is None:
+            fingerprint, fingerprint_hash = filing
+            for key in self._hashes.get(fingerprint_hash, ()):
+                # Equal hashes of different fingerprints are possible, if unlikely
+                if offer_fingerprint(self._entries[key][0]) == fingerprint:
+                    return key
+            return None
+        
+        bucket = self._buckets.get(filing[0])
+        if not bucket:
+            return None
+        amount = offer.base_compensation
+        # Every amount within the tolerance of this one, and a little more for rounding
+        low, high = sorted((amount * (1 - self.tolerance), amount / (1 - self.tolerance)))
+        margin = (high - low) * 1e-9 + 1e-12
+        start = bisect_left(bucket, (low - margin,))
+        end = bisect_right(bucket, (high + margin, float('inf')))
+        matches = [entry for entry in bucket[start:end] if within_tolerance(entry[0], amount, self.tolerance)]
+        return min(matches, key=lambda entry: entry[1])[2] if matches else None
+    
+    def _add(self, key: Hashable, offer: JobOffer, filing: Tuple) -> None:
+        """File an offer that is not indexed under its key"""
+        if self.tolerance is None:
+            fingerprint_hash = filing[1]
+            self._hashes.setdefault(fingerprint_hash, []).append(key)
+            self._entries[key] = (offer, fingerprint_hash)
+        else:
+            bucket_key = filing[0]
+            entry = (offer.base_compensation, next(self._sequence), key)
+            insort(self._buckets.setdefault(bucket_key, []), entry)
+            self._entries[key] = (offer, bucket_key, entry)
+
+
+def find_duplicates(offers: Iterable[JobOffer], tolerance: Optional[float] = None) -> List[Optional[int]]:
+    """
+    Find the offers that duplicate an earlier offer
+    
+    Args:
+        offers: JobOffers in order
+        tolerance: Fraction by which base compensations of near duplicates may
+                   differ; None for exact duplicates only
+    
+    Returns:
+        For each offer, the position of the earlier offer it duplicates, or
+        None for the first offer of its kind; duplicates are matched with
+        the offers kept, never with other duplicates
+    """
+    index = OfferIndex(tolerance)
+    duplicates = []
+    for position, offer in enumerate(offers):
+        duplicates.append(index.add_unique(position, offer))
+    return duplicates
@@ -0,0 +1,183 @@
+"""
+Pareto frontier (skyline) of points where every column is to be maximized
+
+A point is on the frontier if no other point is at least as good in every
+column and better in at least one. Identical points do not dominate each
+other, so duplicates of a frontier point are all on the frontier.
+
+Two and three columns use O(n log n) sweeps; more columns use a block-based
+sort-filter: points are visited best-first by their normalized sum, and each
+block is checked against the frontier found so far and against itself with
+array operations. Its cost grows with the size of the frontier, which is
+small for offers but can reach a large share of the points when the
+columns are strongly anti-correlated.
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+
+# Points per block in the block-based algorithm for four or more columns
+PARETO_BLOCK_SIZE = 1024
+
+# Frontier points compared with a block at once; dominated points are dropped
+# after each chunk, and the frontier is in best-first order, so most points
+# are only compared with the first chunk
+PARETO_FRONTIER_CHUNK = 32
+
+
+def pareto_frontier(points: np.ndarray) -> np.ndarray:
+    """
+    Indices of the points not dominated by any other point
+    
+    Args:
+        points: Array of shape (n, d); larger is better in every column
+    
+    Returns:
+        Sorted array of row indices of the frontier points
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+        raise ValueError(f"points must be a 2-D array, got shape {points.shape}")
+    count, dimensions = points.shape
+    if count == 0 or dimensions == 0:
+        return np.arange(count)
+    
+    # The pivot filter keeps duplicates of undominated points together, so
+    # only the (usually few) candidates need to be made distinct
+    candidates = _drop_dominated_by_pivots(points)
+    unique, inverse = _distinct_rows(points[candidates])
+    
+    if dimensions == 1:
+        on_frontier = np.flatnonzero(unique[:, 0] == unique[:, 0].max())
+    elif dimensions == 2:
+        on_frontier = _frontier_2d(unique)
+    elif dimensions == 3:
+        on_frontier = _frontier_3d(unique)
+    else:
+        on_frontier = _frontier_blocks(unique)
+    
+    is_frontier = np.zeros(len(unique), dtype=bool)
+    is_frontier[on_frontier] = True
+    return candidates[is_frontier[inverse]]
+
+def _distinct_rows(points: np.ndarray):
+    """
+    Distinct rows and, for every input row, the index of its distinct row
+    
+    A lexsort plus a neighbour comparison, which is several times faster
+    than np.unique(axis=0) on float rows.
+    """
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    starts = np.ones(len(ordered), dtype=bool)
+    starts[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    inverse = np.empty(len(ordered), dtype=np.intp)
+    inverse[order] = np.cumsum(starts) - 1
+    return ordered[starts], inverse
+
+
+def _dominates(better: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Whether the point better dominates each of the points"""
+    return (points <= better).all(axis=1) & (points < better).any(axis=1)
+
+
+def _drop_dominated_by_pivots(points: np.ndarray) -> np.ndarray:
+    """
+    Indices of the points not dominated by a few strong pivots
+    
+    The pivots (the best point in each column and the best normalized sum)
+    usually dominate most points, which leaves the exact algorithms only a
+    small candidate set.
+    """
+    pivots = set(np.argmax(points, axis=0).tolist())
+    pivots.add(int(np.argmax(_normalized(points).sum(axis=1))))
+    
+    dominated = np.zeros(len(points), dtype=bool)
+    for pivot in pivots:
+        dominated |= _dominates(points[pivot], points)
+    return np.flatnonzero(~dominated)
+
+
+def _normalized(points: np.ndarray) -> np.ndarray:
+    """Scale each column to [0, 1]; monotonic, so dominance is preserved"""
+    low = points.min(axis=0)
+    spread = points.max(axis=0) - low
+    spread[spread == 0] = 1.0
+    return (points - low) / spread
+
+
+def _frontier_2d(points: np.ndarray) -> np.ndarray:
+    """Frontier of distinct 2-D points: a point survives if it beats the best second value before it"""
+    order = np.lexsort((-points[:, 1], -points[:, 0]))
+    second = points[order, 1]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], second[:-1])))
+    return np.sort(order[second > best_before])
+
+
+def _frontier_3d(points: np.ndarray) -> np.ndarray:
+    """
+    Frontier of distinct 3-D points in O(n log n)
+    
+    Points are visited in descending lexicographic order, so every point
+    that could dominate the current one has been seen. The frontier's
+    projection on the last two columns is kept as a staircase (second column
+    increasing, third decreasing); a point is dominated if the staircase has
+    an entry at least as good in both.
+    """
+    order = np.lexsort((-points[:, 2], -points[:, 1], -points[:, 0]))
+    stair_y = []
+    stair_neg_z = []
+    keep = []
+    for index, y, z in zip(order.tolist(), points[order, 1].tolist(), points[order, 2].tolist()):
+        position = bisect_left(stair_y, y)
+        if position < len(stair_y) and -stair_neg_z[position] >= z:
+            continue
+        keep.append(index)
+        
+        # Drop the staircase entries this point covers, then insert it
+        start = bisect_left(stair_neg_z, -z)
+        end = position + 1 if position < len(stair_y) and stair_y[position] == y else position
+        del stair_y[start:end]
+        del stair_neg_z[start:end]
+        stair_y.insert(start, y)
+        stair_neg_z.insert(start, -z)
+    return np.sort(np.array(keep, dtype=np.intp))
+
+
+def _frontier_blocks(points: np.ndarray) -> np.ndarray:
+    """
+    Frontier of distinct points in four or more dimensions, block by block
+    
+    Points are sorted by descending normalized sum, then descending
+    lexicographic order. A dominating point never has a smaller sum (float
+    addition is monotonic) and among equal sums it is lexicographically
+    larger, so it is always visited first.
+    """
+    sums = _normalized(points).sum(axis=1)
+    order = np.lexsort(tuple(-points[:, column] for column in reversed(range(points.shape[1]))) + (-sums,))
+    
+    frontier = np.empty((0, points.shape[1]))
+    keep = []
+    for start in range(0, len(order), PARETO_BLOCK_SIZE):
+        block_order = order[start:start + PARETO_BLOCK_SIZE]
+        block = points[block_order]
+        
+        # Drop points dominated by the frontier so far; frontier points are
+        # distinct from the block's, so "at least as good everywhere" suffices
+        for chunk_start in range(0, len(frontier), PARETO_FRONTIER_CHUNK):
+            chunk = frontier[chunk_start:chunk_start + PARETO_FRONTIER_CHUNK]
+            alive = ~(chunk[None, :, :] >= block[:, None, :]).all(axis=2).any(axis=1)
+            block_order, block = block_order[alive], block[alive]
+            if not len(block):
+                break
+        
+        # Drop points dominated within the block (a point only "dominates" itself)
+        covered = (block[None, :, :] >= block[:, None, :]).all(axis=2)
+        np.fill_diagonal(covered, False)
+        alive = ~covered.any(axis=1)
+        
+        keep.append(block_order[alive])
+        frontier = np.concatenate((frontier, block[alive]))
+    return np.sort(np.concatenate(keep))
@@ -0,0 +1,196 @@
+"""
+On-disk cache of parsed job offers, so unchanged spreadsheets are not re-parsed
+
+Each source file gets one cache entry per parser variant (e.g. CSV engine)
+holding a small metadata header (path, variant, size, modification time,
+content hash and parser schema version) followed by the pickled JobOffer
+objects.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, List, Optional
+
+from job_offer import JobOffer
+
+
+# Default cap on the total size of all cache entries
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+CACHE_EXTENSION = '.offers'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ParseCache:
+    """Cache of converted job offers keyed on source file identity and content"""
+
+    def __init__(self, cache_dir: str, schema_version: int, max_bytes: int = DEFAULT_MAX_BYTES,
+                 variant: str = ''):
+        """
+        Initialize the parse cache
+
+        Args:
+            cache_dir: Directory where cache entries are stored (created if missing)
+            schema_version: Version of the parser's conversion rules; entries
+                written with a different version are ignored
+            max_bytes: Maximum total size of cache entries; least recently
+                used entries are evicted beyond this
+            variant: Parser settings the offers depend on, such as the CSV
+                engine; each variant has its own entry per file
+        """
+        self.cache_dir = cache_dir
+        self.schema_version = schema_version
+        self.max_bytes = max_bytes
+        self.variant = variant
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, filepath: str) -> Optional[List[JobOffer]]:
+        """
+        Return the cached offers for a file, or None if there is no valid entry
+
+        The file is only re-hashed when its size matches but its modification
+        time has changed.
+
+        Args:
+            filepath: Path to the source spreadsheet file
+
+        Returns:
+            List of JobOffer objects or None
+        """
+        entry_path = self._entry_path(filepath)
+        try:
+            stat = os.stat(filepath)
+            with open(entry_path, 'rb') as f:
+                metadata = pickle.load(f)
+                if not self._is_valid(metadata, filepath, stat):
+                    return None
+                offers = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+        # Mark the entry as recently used for eviction
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return offers
+
+    def put(self, filepath: str, offers: List[JobOffer], stat: Optional[os.stat_result] = None) -> None:
+        """
+        Store the offers parsed from a file
+
+        Args:
+            filepath: Path to the source spreadsheet file
+            offers: JobOffer objects parsed from the file
+            stat: Result of os.stat taken before parsing; nothing is stored
+                if the file was modified since then, as the hashed contents
+                may not be the ones that were parsed
+        """
+        stat = stat if stat is not None else os.stat(filepath)
+        content_hash = self._content_hash(filepath)
+        current = os.stat(filepath)
+        if current.st_size != stat.st_size or current.st_mtime_ns != stat.st_mtime_ns:
+            return
+        metadata = self._metadata(filepath, stat, content_hash)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(offers, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(filepath))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._enforce_size_limit()
+
+    def invalidate(self, filepath: str) -> None:
+        """
+        Remove the cache entry for a file, if any
+
+        Args:
+            filepath: Path to the source spreadsheet file
+        """
+        try:
+            os.remove(self._entry_path(filepath))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every cache entry"""
+        for entry_path in self._entry_paths():
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+
+    def _is_valid(self, metadata: Dict, filepath: str, stat: os.stat_result) -> bool:
+        """Check a cache entry's metadata against the current file"""
+        if (metadata.get('schema_version') != self.schema_version
+                or metadata.get('path') != os.path.abspath(filepath)
+                or metadata.get('variant') != self.variant
+                or metadata.get('size') != stat.st_size):
+            return False
+        if metadata.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        # Same size but touched: only a content change invalidates the entry
+        return metadata.get('content_hash') == self._content_hash(filepath)
+
+    def _metadata(self, filepath: str, stat: os.stat_result, content_hash: str) -> Dict:
+        """Build the metadata header for a cache entry"""
+        return {
+            'schema_version': self.schema_version,
+            'path': os.path.abspath(filepath),
+            'variant': self.variant,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'content_hash': content_hash
+        }
+
+    def _entry_path(self, filepath: str) -> str:
+        """Path of the cache entry for a source file"""
+        identity = f"{os.path.abspath(filepath)}\0{self.variant}"
+        key = hashlib.sha256(identity.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + CACHE_EXTENSION)
+
+    def _entry_paths(self) -> List[str]:
+        """Paths of all cache entries"""
+        return [
+            os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+            if name.endswith(CACHE_EXTENSION)
+        ]
+
+    def _enforce_size_limit(self) -> None:
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for entry_path in self._entry_paths():
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    @staticmethod
+    def _content_hash(filepath: str) -> str:
+        """Hash the contents of a file"""
+        digest = hashlib.blake2b()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
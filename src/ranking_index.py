@@ -0,0 +1,156 @@
+"""
+Sorted index of ranking keys that supports fast inserts, removals and rank lookups
+
+Keys are kept in a list of sorted buckets of bounded size. Finding a key's
+bucket is a binary search over the bucket maxima, and the number of keys
+before a bucket comes from a Fenwick tree over the bucket sizes, so adding
+or removing a key and looking up its rank take O(log n) plus a move of at
+most one bucket's items.
+"""
+
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+# Bucket size after a split; buckets are split when they reach twice this
+BUCKET_LOAD = 256
+
+
+class RankingIndex:
+    """Sorted multiset of keys with O(log n) add, remove and rank"""
+    
+    def __init__(self, keys: Iterable[Any] = ()):
+        """
+        Initialize the index
+        
+        Args:
+            keys: Initial keys, sorted once in bulk
+        """
+        keys = sorted(keys)
+        self._buckets: List[List[Any]] = [keys[i:i + BUCKET_LOAD] for i in range(0, len(keys), BUCKET_LOAD)]
+        self._maxes: List[Any] = [bucket[-1] for bucket in self._buckets]
+        self._tree: Optional[List[int]] = None
+        self._len = len(keys)
+    
+    def __len__(self) -> int:
+        return self._len
+    
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._buckets)
+    
+    def add(self, key: Any) -> None:
+        """
+        Insert a key
+        
+        Args:
+            key: Key to insert; must be comparable with the other keys
+        """
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._tree = None
+            self._len = 1
+            return
+        
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+        
+        if len(bucket) >= 2 * BUCKET_LOAD:
+            # Split the bucket; the size tree is rebuilt on the next rank lookup
+            self._buckets.insert(i + 1, bucket[BUCKET_LOAD:])
+            del bucket[BUCKET_LOAD:]
+            self._maxes.insert(i, bucket[-1])
+            self._tree = None
+        else:
+            self._update_tree(i, 1)
+    
+    def remove(self, key: Any) -> None:
+        """
+        Remove one occurrence of a key
+        
+        Args:
+            key: Key to remove
+        
+        Raises:
+            KeyError: If the key is not in the index
+        """
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise KeyError(key)
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if bucket[j] != key:
+            raise KeyError(key)
+        
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._update_tree(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._tree = None
+    
+    def rank(self, key: Any) -> int:
+        """
+        Number of keys smaller than a key, i.e. its 0-based position
+        
+        Args:
+            key: Key to look up; it does not have to be in the index
+        
+        Returns:
+            Position the key has, or would have, in sorted order
+        """
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._count_before(i) + bisect_left(self._buckets[i], key)
+    
+    def first(self, count: Optional[int] = None) -> List[Any]:
+        """
+        Smallest keys in sorted order
+        
+        Args:
+            count: Number of keys to return; all if None
+        
+        Returns:
+            List of keys
+        """
+        return list(islice(self, count))
+    
+    def _count_before(self, bucket_index: int) -> int:
+        """Total size of the buckets before bucket_index"""
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        total = 0
+        while bucket_index > 0:
+            total += tree[bucket_index]
+            bucket_index -= bucket_index & -bucket_index
+        return total
+    
+    def _update_tree(self, bucket_index: int, delta: int) -> None:
+        """Add delta to a bucket's size in the Fenwick tree, if it is built"""
+        tree = self._tree
+        if tree is None:
+            return
+        bucket_index += 1
+        while bucket_index < len(tree):
+            tree[bucket_index] += delta
+            bucket_index += bucket_index & -bucket_index
+    
+    def _build_tree(self) -> None:
+        """Build the Fenwick tree of bucket sizes in O(number of buckets)"""
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
@@ -0,0 +1,146 @@
+"""
+Monte Carlo simulation of the uncertain parts of job offers
+
+An offer's stated numbers hide several uncertainties: a non-guaranteed
+bonus may pay out more or less than its target (JobOffer counts it as
+zero), equity is worth whatever it turns out to be worth, the signing bonus
+and relocation package are amortized over a tenure nobody knows in advance,
+and hybrid schedules drift. An UncertaintyModel describes each of these as
+a distribution, and sample_overrides draws them for every offer of an
+OfferBatch at once, as arrays of shape (offers, draws) that
+OfferBatch.broadcast feeds through the usual tax, benefits and commute math.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from offer_batch import OfferBatch
+
+
+# Distribution kinds and the parameters each takes
+DISTRIBUTION_PARAMETERS = {
+    "fixed": ("value",),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "normal": ("mean", "std"),
+    "lognormal": ("mean", "sigma"),  # of the underlying normal distribution
+    "choice": ("values", "probabilities"),
+}
+
+# Percentiles reported by ComparisonEngine.simulate_offers by default
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Values (offers x draws) simulated at once, bounding the size of temporary arrays
+SIMULATION_CHUNK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """A probability distribution to draw an uncertain quantity from"""
+    kind: str
+    params: Tuple = ()
+    
+    def __post_init__(self):
+        if self.kind not in DISTRIBUTION_PARAMETERS:
+            raise ValueError(f"Unknown distribution: {self.kind}. "
+                             f"Use one of {', '.join(DISTRIBUTION_PARAMETERS)}")
+        expected = DISTRIBUTION_PARAMETERS[self.kind]
+        if len(self.params) != len(expected):
+            raise ValueError(f"A {self.kind} distribution takes ({', '.join(expected)}), got {self.params!r}")
+    
+    def sample(self, rng: np.random.Generator, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Draw values
+        
+        Args:
+            rng: Random number generator
+            shape: Shape of the array of draws
+        
+        Returns:
+            Array of draws
+        """
+        if self.kind == "fixed":
+            return np.full(shape, float(self.params[0]))
+        if self.kind == "uniform":
+            return rng.uniform(*self.params, size=shape)
+        if self.kind == "triangular":
+            return rng.triangular(*self.params, size=shape)
+        if self.kind == "normal":
+            return rng.normal(*self.params, size=shape)
+        if self.kind == "lognormal":
+            # Faster than rng.lognormal, same distribution
+            return np.exp(rng.normal(*self.params, size=shape))
+        
+        # Inverse of the cumulative distribution, faster than rng.choice
+        values, probabilities = self.params
+        cumulative = np.cumsum(probabilities, dtype=np.float64)
+        positions = np.searchsorted(cumulative[:-1] / cumulative[-1], rng.random(shape), side='right')
+        return np.asarray(values, dtype=np.float64)[positions]
+
+
+@dataclass
+class UncertaintyModel:
+    """
+    Distributions of the uncertain parts of every offer
+    
+    Each distribution can be None to keep that part at its stated value.
+    
+    Attributes:
+        bonus_payout: Share of the target bonus paid out, for bonuses that
+                      are not guaranteed; guaranteed bonuses are paid in full
+        equity_multiplier: Realized equity value as a multiple of the stated value
+        tenure_multiplier: Actual tenure as a multiple of the expected tenure
+        commute_days_change: Days per week added to the commute schedule,
+                             which stays between 0 and 7
+    """
+    bonus_payout: Optional[Distribution] = Distribution("triangular", (0.0, 1.0, 1.25))
+    # Mean 1: exp(mean + sigma ** 2 / 2)
+    equity_multiplier: Optional[Distribution] = Distribution("lognormal", (-0.125, 0.5))
+    tenure_multiplier: Optional[Distribution] = Distribution("triangular", (0.5, 1.0, 1.5))
+    commute_days_change: Optional[Distribution] = Distribution("choice", ((-1, 0, 1), (0.15, 0.7, 0.15)))
+
+
+def sample_overrides(batch: OfferBatch, model: UncertaintyModel, draws: int,
+                     rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Draw the uncertain columns of every offer
+    
+    Values are only drawn for the offers a distribution affects (e.g. not
+    for guaranteed bonuses or offers without equity); the others keep their
+    stated value in every draw.
+    
+    Args:
+        batch: Offers to simulate
+        model: Distributions to draw from
+        draws: Number of draws per offer
+        rng: Random number generator
+    
+    Returns:
+        Column overrides for OfferBatch.broadcast with shape (draws,),
+        each of shape (offers, draws)
+    """
+    overrides = {}
+    
+    def draw(column, distribution, affected, combine):
+        # Stated values in every draw, then drawn values for the affected offers
+        if distribution is None or not affected.any():
+            return
+        stated = getattr(batch, column)
+        values = np.repeat(stated[:, None], draws, axis=1)
+        values[affected] = combine(stated[affected, None], distribution.sample(rng, (affected.sum(), draws)))
+        overrides[column] = values
+    
+    non_guaranteed = ~batch.bonus_guaranteed & (batch.bonus_amount != 0)
+    draw("bonus_amount", model.bonus_payout, non_guaranteed, np.multiply)
+    if "bonus_amount" in overrides:
+        # The drawn payout is what gets paid, so it always counts as income
+        overrides["bonus_guaranteed"] = np.ones((len(batch), 1), dtype=bool)
+    
+    draw("equity_value", model.equity_multiplier, batch.equity_value != 0, np.multiply)
+    draw("expected_tenure_years", model.tenure_multiplier,
+         (batch.signing_bonus + batch.relocation_package != 0) & (batch.expected_tenure_years > 0), np.multiply)
+    draw("commute_days_per_week", model.commute_days_change, ~batch.is_remote,
+         lambda days, change: np.clip(days + change, 0, 7))
+    return overrides
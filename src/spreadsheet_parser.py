@@ -1,58 +1,1249 @@
 """
 Spreadsheet Parser module for importing job offers from spreadsheet files
 
-This module supports loading job offers from CSV and Excel files.
+This module supports loading job offers from CSV, Excel, Parquet and
+Feather (Arrow IPC) files.
 Dependencies:
-- pandas (for data processing)
+- pandas (for data processing; CSV files can be read without it)
+- numpy (for the memory-mapped CSV reader)
 - openpyxl (for Excel file support)
+- pyarrow (for Parquet and Feather file support)
 """
 
+import csv
+import glob
+import hashlib
+import importlib
+import inspect
+import io
+import itertools
+import math
+import mmap
 import os
-from typing import List, Dict, Optional, Any
-from job_offer import JobOffer, EmploymentType, Benefits, WorkLocationType, CompensationType
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Any, Iterator, Tuple, TYPE_CHECKING
+from job_offer import (JobOffer, EmploymentType, Benefits, WorkLocationType, CompensationType,
+                       CommuteCalculationType)
+from commute_calculator import DriveType
+from parse_cache import ParseCache, DEFAULT_MAX_BYTES
 
-# Try importing pandas, provide helpful error message if missing
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+if TYPE_CHECKING:
+    from comparison_engine import ComparisonEngine
+
+# Pandas and numpy are imported on first use (see _import_pandas), so the
+# stdlib CSV reader works without them and without their import cost
+np = None
+pd = None
+
+
+REQUIRED_COLUMNS = ['title', 'company', 'location', 'work_location_type',
+                    'employment_type', 'compensation_type', 'base_compensation']
+
+# Optional JobOffer columns as (column name, value kind, default)
+JOB_OFFER_COLUMNS = [
+    ('hours_per_week', 'float', 40.0),
+    ('weeks_per_year', 'float', 50.0),
+    ('bonus_amount', 'float', 0.0),
+    ('bonus_guaranteed', 'bool', False),
+    ('signing_bonus', 'float', 0.0),
+    ('relocation_package', 'float', 0.0),
+    ('state_tax_rate', 'float', 0.0),
+    ('local_tax_rate', 'float', 0.0),
+    ('self_employment_expenses', 'float', 0.0),
+    ('business_expenses', 'float', 0.0),
+    ('cost_of_living_index', 'float', 100.0),
+    ('commute_time_minutes', 'int', 0),
+    ('commute_cost_monthly', 'float', 0.0),
+    ('commute_days_per_week', 'int', 5),
+    ('commute_distance_miles', 'float', 0.0),
+    ('commute_fuel_cost', 'float', 3.50),
+    ('commute_city_mpg', 'float', 25.0),
+    ('commute_highway_mpg', 'float', 32.0),
+    ('commute_combined_mpg', 'float', 28.0),
+    ('commute_include_maintenance', 'bool', True),
+    ('expected_tenure_years', 'float', 3.0),
+]
+
+# Benefits columns as (column name, value kind, default)
+BENEFITS_COLUMNS = [
+    ('retirement_match_percent', 'float', 0.0),
+    ('retirement_match_limit', 'float', 0.0),
+    ('health_insurance_monthly_premium', 'float', 0.0),
+    ('health_insurance_coverage_percent', 'float', 0.0),
+    ('dental_insurance_monthly_premium', 'float', 0.0),
+    ('dental_insurance_coverage_percent', 'float', 0.0),
+    ('vision_insurance_monthly_premium', 'float', 0.0),
+    ('vision_insurance_coverage_percent', 'float', 0.0),
+    ('life_insurance_coverage', 'float', 0.0),
+    ('life_insurance_monthly_premium', 'float', 0.0),
+    ('paid_time_off_days', 'int', 0),
+    ('paid_holidays', 'int', 0),
+    ('paid_sick_days', 'int', 0),
+    ('paid_parental_leave_weeks', 'int', 0),
+    ('equity_value', 'float', 0.0),
+    ('other_benefits_value', 'float', 0.0),
+    ('other_benefits_description', 'str', ''),
+]
+
+# Normalized (stripped, upper-cased) spreadsheet values mapped to enums
+WORK_LOCATION_TYPES = {
+    'ONSITE': WorkLocationType.ONSITE,
+    'ON-SITE': WorkLocationType.ONSITE,
+    'ON SITE': WorkLocationType.ONSITE,
+    'REMOTE': WorkLocationType.REMOTE,
+    'HYBRID': WorkLocationType.HYBRID,
+}
+
+EMPLOYMENT_TYPES = {
+    'W2': EmploymentType.W2,
+    '1099': EmploymentType.CONTRACTOR_1099,
+    'S-CORP': EmploymentType.S_CORP,
+}
+
+COMPENSATION_TYPES = {
+    'SALARY': CompensationType.SALARY,
+    'ANNUAL': CompensationType.SALARY,
+    'HOURLY': CompensationType.HOURLY,
+    'HOUR': CompensationType.HOURLY,
+}
+
+DRIVE_TYPES = {
+    'CITY': DriveType.CITY,
+    'HIGHWAY': DriveType.HIGHWAY,
+    'MIXED': DriveType.MIXED,
+    'COMBINED': DriveType.MIXED,
+}
+
+COMMUTE_CALC_TYPES = {
+    'DISTANCE': CommuteCalculationType.DISTANCE_BASED,
+    'DISTANCE_BASED': CommuteCalculationType.DISTANCE_BASED,
+    'DISTANCE-BASED': CommuteCalculationType.DISTANCE_BASED,
+    'DIRECT': CommuteCalculationType.DIRECT,
+    'MANUAL': CommuteCalculationType.DIRECT,
+}
+
+# Every column read by _dataframe_to_job_offers; other columns are not decoded
+USED_COLUMNS = set(
+    REQUIRED_COLUMNS
+    + [name for name, _, _ in JOB_OFFER_COLUMNS]
+    + [name for name, _, _ in BENEFITS_COLUMNS]
+    + ['commute_drive_type', 'commute_calc_type']
+)
+
+TRUE_STRINGS = ['true', 'yes', 'y', '1', 't']
+
+# Strings pandas.read_csv treats as missing values by default
+CSV_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+# Fields pandas.read_csv parses as integers and as floats; other fields,
+# apart from True and False in any case, make a column text
+CSV_INT_PATTERN = re.compile(r'[ \t\n\v\f\r]*[+-]?[0-9]+[ \t\n\v\f\r]*\Z')
+CSV_FLOAT_PATTERN = re.compile(
+    r'[ \t\n\v\f\r]*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?[ \t\n\v\f\r]*\Z'
+    r'|[+-]?inf(?:inity)?\Z', re.IGNORECASE)
+
+# CSV engines: 'python' uses the stdlib csv module, 'pandas' uses pandas.read_csv
+# and 'auto' picks the stdlib reader for small files or when pandas is missing.
+# Pandas converts rows faster, but importing it costs as much as reading a few
+# MB with the csv module, so the size limit is lower once pandas is loaded.
+# Every engine infers column types per chunk of rows as pandas.read_csv does,
+# so they produce the same offers for the same chunk size.
+CSV_ENGINES = ['auto', 'python', 'pandas', 'mmap']
+CSV_PYTHON_ENGINE_MAX_BYTES = 4 * 1024 * 1024
+CSV_PYTHON_ENGINE_MAX_BYTES_PANDAS_LOADED = 256 * 1024
+
+# Marker for "no explicit value for missing cells"
+_UNSET = object()
+
+# Smallest block of a memory-mapped CSV scanned at once by the 'mmap' engine
+MMAP_MIN_BLOCK_BYTES = 64 * 1024
+# Bytes that may appear in a numeric field parsed without creating strings
+MMAP_NUMERIC_BYTES = b'0123456789+-.eE'
+# Widest text field compared as a fixed-width byte string by the 'mmap' engine
+MMAP_MAX_TEXT_WIDTH = 256
+QUOTE_BYTE, COMMA_BYTE, NEWLINE_BYTE, CARRIAGE_RETURN_BYTE = b'",\n\r'
+
+# Version of the conversion rules; bump when parsed offers would change so
+# cached results are not reused
+PARSER_SCHEMA_VERSION = 2
+
+# Default number of rows per batch for chunked reading
+DEFAULT_CHUNKSIZE = 10000
+
+# Bytes before the last parsed offset that are hashed to detect a rewritten CSV
+TAIL_FINGERPRINT_BYTES = 4096
+
+CSV_EXTENSIONS = ['.csv']
+EXCEL_EXTENSIONS = ['.xlsx', '.xls']
+# Excel formats openpyxl can stream in read-only mode
+STREAMING_EXCEL_EXTENSIONS = ['.xlsx']
+PARQUET_EXTENSIONS = ['.parquet', '.pq']
+FEATHER_EXTENSIONS = ['.feather', '.arrow', '.ipc']
+SPREADSHEET_EXTENSIONS = CSV_EXTENSIONS + EXCEL_EXTENSIONS + PARQUET_EXTENSIONS + FEATHER_EXTENSIONS
+
+UNSUPPORTED_FORMAT_MESSAGE = "Unsupported file format: {ext}. Use .csv, .xlsx, .xls, .parquet, or .feather"
+
+
+def _import_pandas() -> bool:
+    """
+    Import pandas and numpy into this module on first use
+    
+    Returns:
+        True if pandas is available, False otherwise
+    """
+    global np, pd
+    if pd is None:
+        try:
+            import numpy
+            import pandas
+        except ImportError:
+            return False
+        np, pd = numpy, pandas
+    return True
+
+
+def _import_numpy() -> bool:
+    """
+    Import numpy into this module on first use
+    
+    Returns:
+        True if numpy is available, False otherwise
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def _import_optional(module_name: str, package: str, purpose: str) -> Any:
+    """Import an optional dependency, with a helpful error message if it is missing"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        raise ImportError(
+            f"{package} package is required for {purpose}.\n"
+            f"Please install with: pip install {package.lower()}"
+        )
+
+
+def _import_pyarrow(module_name: str) -> Any:
+    """Import a pyarrow module used for columnar file support"""
+    return _import_optional(module_name, 'PyArrow', 'Parquet and Feather support')
+
+
+def _parse_file_in_worker(filepath: str, cache_dir: Optional[str], cache_max_bytes: int,
+                          csv_engine: str) -> List[JobOffer]:
+    """Parse a single file in a worker process, with the settings of the calling parser"""
+    return SpreadsheetParser(cache_dir=cache_dir, cache_max_bytes=cache_max_bytes,
+                             csv_engine=csv_engine).parse_file(filepath)
+
+
+def _csv_typed_values(texts: List[str]) -> Tuple[str, List[Any]]:
+    """
+    Infer the type of a column of CSV fields and parse them, as pandas.read_csv does
+    
+    A column is 'int' if every field is an integer, 'float' if every field
+    is a number or missing (integers with missing fields become floats),
+    'bool' if every field is True or False in any case or missing, and
+    'str' otherwise, so one text field makes every field of the column text.
+    
+    Args:
+        texts: CSV fields of one column
+        
+    Returns:
+        Tuple of (column type, parsed values with None for missing fields)
+    """
+    kinds = set()
+    for text in texts:
+        if text in CSV_NA_VALUES:
+            kinds.add(None)
+        elif CSV_INT_PATTERN.match(text):
+            kinds.add('int')
+        elif CSV_FLOAT_PATTERN.match(text):
+            kinds.add('float')
+        elif text.lower() in ('true', 'false'):
+            kinds.add('bool')
+        else:
+            kinds.add('str')
+            break
+    
+    numeric = kinds & {'int', 'float'}
+    if 'str' in kinds or ('bool' in kinds and numeric):
+        column_type, parse = 'str', str
+    elif 'bool' in kinds:
+        column_type, parse = 'bool', lambda text: text.lower() == 'true'
+    elif kinds == {'int'}:
+        column_type, parse = 'int', int
+    else:
+        column_type, parse = 'float', float
+    return column_type, [None if text in CSV_NA_VALUES else parse(text) for text in texts]
+
+
+def _text_to_number(text: str, convert, default: Any) -> Any:
+    """Convert a text field with float or int, using the default if it is not a number"""
+    try:
+        return convert(text)
+    except ValueError:
+        return default
+
+
+def _csv_float(texts: List[str], default: float) -> List[float]:
+    """Convert a column of CSV fields to floats, using the default for missing or invalid values"""
+    column_type, values = _csv_typed_values(texts)
+    if column_type == 'str':
+        return [default if value is None else _text_to_number(value, float, default) for value in values]
+    return [default if value is None else float(value) for value in values]
+
+
+def _csv_int(texts: List[str], default: int) -> List[int]:
+    """Convert a column of CSV fields to integers, truncating the decimals of a float column"""
+    column_type, values = _csv_typed_values(texts)
+    if column_type == 'str':
+        return [default if value is None else _text_to_number(value, int, default) for value in values]
+    if column_type == 'float' and not all(value is None or math.isfinite(value) for value in values):
+        raise ValueError("Cannot convert non-finite values (NA or inf) to integer")
+    return [default if value is None else int(value) for value in values]
+
+
+def _csv_bool(texts: List[str], default: bool) -> List[bool]:
+    """Convert a column of CSV fields to booleans; numbers are true unless zero"""
+    column_type, values = _csv_typed_values(texts)
+    if column_type == 'str':
+        return [default if value is None else value.lower() in TRUE_STRINGS for value in values]
+    return [default if value is None else bool(value) for value in values]
+
+
+def _csv_str(texts: List[str], default: str) -> List[str]:
+    """Convert a column of CSV fields to strings; numbers are formatted as in a numeric column"""
+    return [default if value is None else str(value) for value in _csv_typed_values(texts)[1]]
+
+
+def _csv_required_str(texts: List[str], default: Any = None) -> List[str]:
+    """Convert a required column of CSV fields to strings; missing values become 'nan' as in pandas"""
+    return ['nan' if value is None else str(value) for value in _csv_typed_values(texts)[1]]
+
+
+def _csv_required_float(texts: List[str], default: Any = None) -> List[float]:
+    """Convert a required column of CSV fields to floats, raising on invalid values"""
+    return [math.nan if value is None else float(value) for value in _csv_typed_values(texts)[1]]
+
+
+def _csv_enum_converter(mapping: Dict[str, Any], default: Any, missing: Any):
+    """Build a converter mapping a column of CSV fields to enum values"""
+    def convert(texts: List[str], _: Any) -> List[Any]:
+        return [missing if value is None else mapping.get(str(value).strip().upper(), default)
+                for value in _csv_typed_values(texts)[1]]
+    return convert
+
+
+def _convert_csv_texts(texts: List[str], convert, default: Any) -> List[Any]:
+    """Convert a column of CSV fields, converting each distinct value once"""
+    distinct = list(set(texts))
+    values = dict(zip(distinct, convert(distinct, default)))
+    return list(map(values.__getitem__, texts))
+
+
+def _csv_field_text(raw: bytes) -> str:
+    """Decode a raw CSV field, removing its quotes"""
+    if raw[:1] == b'"':
+        raw = raw[1:-1].replace(b'""', b'"') if raw[-1:] == b'"' and len(raw) > 1 else raw[1:]
+    return raw.decode('utf-8')
 
 
 class SpreadsheetParser:
     """Parser for importing job offers from spreadsheets"""
     
-    def __init__(self):
-        if pd is None:
+    def __init__(self, cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 csv_engine: str = 'auto'):
+        """
+        Initialize the spreadsheet parser
+        
+        Pandas is only required for non-CSV formats, templates and the
+        'pandas' CSV engine.
+        
+        Args:
+            cache_dir: Directory for the parsed-offer cache; None disables caching
+            cache_max_bytes: Maximum total size of the parsed-offer cache
+            csv_engine: CSV reader to use ('auto', 'python', 'pandas' or 'mmap')
+        """
+        if csv_engine not in CSV_ENGINES:
+            raise ValueError(f"Unknown CSV engine: {csv_engine}. Use one of {', '.join(CSV_ENGINES)}")
+        if csv_engine == 'pandas':
+            self._require_pandas()
+        if csv_engine == 'mmap' and not _import_numpy():
             raise ImportError(
-                "Pandas package is required for spreadsheet support.\n"
-                "Please install with: pip install pandas openpyxl"
+                "NumPy package is required for the mmap CSV engine.\n"
+                "Please install with: pip install numpy"
             )
+        self.csv_engine = csv_engine
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.cache = (ParseCache(cache_dir, PARSER_SCHEMA_VERSION, cache_max_bytes, variant=csv_engine)
+                      if cache_dir else None)
+        # Per-file position of the last parse_appended call, and offers handed
+        # to an engine by ingest_appended
+        self._tail_states: Dict[str, Dict[str, Any]] = {}
+        self._ingested_offers: Dict[str, List[JobOffer]] = {}
     
     def parse_file(self, filepath: str) -> List[JobOffer]:
         """
         Parse a spreadsheet file and return a list of JobOffer objects
         
+        If a cache directory is configured, offers from an unchanged file are
+        loaded from the cache instead of being re-parsed.
+        
         Args:
-            filepath: Path to the spreadsheet file (CSV or Excel)
+            filepath: Path to the spreadsheet file (CSV, Excel, Parquet or Feather)
             
         Returns:
             List of JobOffer objects
         """
-        _, ext = os.path.splitext(filepath)
+        if self.cache is None:
+            return self._parse_file_uncached(filepath)
+        
+        cached_offers = self.cache.get(filepath)
+        if cached_offers is not None:
+            return cached_offers
         
-        if ext.lower() in ['.csv']:
-            df = pd.read_csv(filepath)
-        elif ext.lower() in ['.xlsx', '.xls']:
-            df = pd.read_excel(filepath)
+        stat = os.stat(filepath)
+        job_offers = self._parse_file_uncached(filepath)
+        self.cache.put(filepath, job_offers, stat)
+        return job_offers
+    
+    def invalidate_cache(self, filepath: Optional[str] = None) -> None:
+        """
+        Drop cached offers for a file, or the whole cache if no file is given
+        
+        Args:
+            filepath: Path to the spreadsheet file whose entry should be removed
+        """
+        if self.cache is None:
+            return
+        if filepath is None:
+            self.cache.clear()
         else:
-            raise ValueError(f"Unsupported file format: {ext}. Use .csv, .xlsx, or .xls")
+            self.cache.invalidate(filepath)
+    
+    def _parse_file_uncached(self, filepath: str) -> List[JobOffer]:
+        """Parse a spreadsheet file without consulting the cache"""
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext in CSV_EXTENSIONS or ext in STREAMING_EXCEL_EXTENSIONS:
+            # Every CSV engine infers column types per chunk, so all of them
+            # read the file in chunks of the same size
+            return [offer for batch in self.iter_file(filepath) for offer in batch]
         
-        return self._dataframe_to_job_offers(df)
+        return self._dataframe_to_job_offers(self._read_dataframe(filepath))
+    
+    def iter_excel(self, filepath: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                   sheets: Optional[List[str]] = None) -> Iterator[List[JobOffer]]:
+        """
+        Stream job offers from an Excel workbook without loading it into memory
+        
+        The workbook is opened in read-only mode and rows are converted in
+        batches, so memory is bounded by chunksize rather than workbook size.
+        Each worksheet's header row is mapped to columns once.
+        
+        Args:
+            filepath: Path to the .xlsx workbook
+            chunksize: Maximum number of offers per batch
+            sheets: Names of the worksheets to read, in order; None reads the
+                first worksheet, as pd.read_excel does
+            
+        Yields:
+            Lists of at most chunksize JobOffer objects, in sheet and row order
+        """
+        for df in self._iter_excel_frames(filepath, chunksize, sheets):
+            yield self._dataframe_to_job_offers(df)
+    
+    def _iter_excel_frames(self, filepath: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                           sheets: Optional[List[str]] = None) -> Iterator['pd.DataFrame']:
+        """
+        Stream the used columns of an Excel workbook as DataFrames of at most chunksize rows
+        
+        Args:
+            filepath: Path to the .xlsx workbook
+            chunksize: Maximum number of rows per DataFrame
+            sheets: Names of the worksheets to read; None reads the first worksheet
+            
+        Yields:
+            DataFrames with the used columns of each worksheet
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+        
+        self._require_pandas()
+        openpyxl = _import_optional('openpyxl', 'Openpyxl', 'Excel file support')
+        workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            if sheets is None:
+                worksheets = workbook.worksheets[:1]
+            else:
+                worksheets = [workbook[name] for name in sheets]
+            
+            for worksheet in worksheets:
+                rows = worksheet.iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    continue
+                
+                # Map header columns to positions once per sheet
+                positions = [(i, str(name).strip()) for i, name in enumerate(header)
+                             if name is not None and str(name).strip() in USED_COLUMNS]
+                columns = [name for _, name in positions]
+                try:
+                    self._validate_columns(columns)
+                except ValueError as e:
+                    raise ValueError(f"Worksheet '{worksheet.title}': {e}")
+                
+                records = []
+                for row in rows:
+                    record = [row[i] if i < len(row) else None for i, _ in positions]
+                    # Skip blank rows, as pd.read_excel does
+                    if all(value is None for value in record):
+                        continue
+                    records.append(record)
+                    if len(records) == chunksize:
+                        yield pd.DataFrame.from_records(records, columns=columns)
+                        records = []
+                
+                if records:
+                    yield pd.DataFrame.from_records(records, columns=columns)
+        finally:
+            workbook.close()
+    
+    def _read_dataframe(self, filepath: str) -> 'pd.DataFrame':
+        """
+        Read a spreadsheet file into a DataFrame, decoding only USED_COLUMNS
+        
+        Args:
+            filepath: Path to the spreadsheet file
+            
+        Returns:
+            DataFrame with the used columns present in the file
+        """
+        self._require_pandas()
+        ext = os.path.splitext(filepath)[1].lower()
+        
+        if ext in CSV_EXTENSIONS:
+            return pd.read_csv(filepath, usecols=self._is_used_column)
+        elif ext in STREAMING_EXCEL_EXTENSIONS:
+            frames = list(self._iter_excel_frames(filepath))
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        elif ext in EXCEL_EXTENSIONS:
+            return pd.read_excel(filepath, usecols=self._is_used_column)
+        elif ext in PARQUET_EXTENSIONS:
+            parquet = _import_pyarrow('pyarrow.parquet')
+            columns = self._used_columns(parquet.read_schema(filepath).names)
+            return pd.read_parquet(filepath, columns=columns)
+        elif ext in FEATHER_EXTENSIONS:
+            ipc = _import_pyarrow('pyarrow.ipc')
+            with ipc.open_file(filepath) as reader:
+                columns = self._used_columns(reader.schema.names)
+            return pd.read_feather(filepath, columns=columns)
+        else:
+            raise ValueError(UNSUPPORTED_FORMAT_MESSAGE.format(ext=ext))
+    
+    def _write_dataframe(self, df: 'pd.DataFrame', filepath: str) -> None:
+        """Write a DataFrame in the format given by the file extension"""
+        ext = os.path.splitext(filepath)[1].lower()
+        
+        if ext in CSV_EXTENSIONS:
+            df.to_csv(filepath, index=False)
+        elif ext in EXCEL_EXTENSIONS:
+            df.to_excel(filepath, index=False)
+        elif ext in PARQUET_EXTENSIONS:
+            _import_pyarrow('pyarrow.parquet')
+            df.to_parquet(filepath, index=False)
+        elif ext in FEATHER_EXTENSIONS:
+            _import_pyarrow('pyarrow.feather')
+            df.reset_index(drop=True).to_feather(filepath)
+        else:
+            raise ValueError(UNSUPPORTED_FORMAT_MESSAGE.format(ext=ext))
+    
+    def convert_file(self, source_path: str, destination_path: str) -> None:
+        """
+        Convert a spreadsheet file to another format, keeping only the used columns
+        
+        Converting a large CSV export to Parquet or Feather once avoids
+        re-parsing text on every run.
+        
+        Args:
+            source_path: Path of the file to read
+            destination_path: Path of the file to write; the format follows the extension
+        """
+        df = self._read_dataframe(source_path)
+        self._validate_columns(df.columns)
+        self._write_dataframe(df, destination_path)
+    
+    @staticmethod
+    def _is_used_column(column: str) -> bool:
+        """Return True if the column is read by _dataframe_to_job_offers"""
+        return column in USED_COLUMNS
+    
+    @staticmethod
+    def _used_columns(columns: List[str]) -> List[str]:
+        """Filter column names down to USED_COLUMNS, keeping file order"""
+        return [column for column in columns if column in USED_COLUMNS]
+    
+    def expand_paths(self, patterns: List[str]) -> List[str]:
+        """
+        Expand files, directories and glob patterns into spreadsheet file paths
+        
+        Directories contribute every spreadsheet file directly inside them.
+        Paths from each pattern are sorted so the result is deterministic;
+        duplicates are dropped.
+        
+        Args:
+            patterns: File paths, directory paths or glob patterns
+            
+        Returns:
+            List of spreadsheet file paths
+        """
+        paths = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                matches = [
+                    os.path.join(pattern, name) for name in os.listdir(pattern)
+                    if os.path.splitext(name)[1].lower() in SPREADSHEET_EXTENSIONS
+                ]
+            elif any(char in pattern for char in '*?['):
+                matches = [path for path in glob.glob(pattern) if os.path.isfile(path)]
+            else:
+                matches = [pattern]
+            
+            for path in sorted(matches):
+                if path not in paths:
+                    paths.append(path)
+        
+        return paths
+    
+    def parse_files(self, filepaths: List[str],
+                    max_workers: Optional[int] = None) -> Tuple[List[JobOffer], Dict[str, str]]:
+        """
+        Parse several spreadsheet files, in parallel worker processes
+        
+        Offers are merged in the order of filepaths. A file that fails to
+        parse is reported and skipped without aborting the rest.
+        
+        Args:
+            filepaths: Paths to spreadsheet files (CSV or Excel)
+            max_workers: Number of worker processes (default: one per CPU);
+                1 parses the files serially in this process
+            
+        Returns:
+            Tuple of (list of JobOffer objects, dictionary of failed file path to error message)
+        """
+        job_offers = []
+        failures = {}
+        
+        if max_workers == 1 or len(filepaths) <= 1:
+            for filepath in filepaths:
+                try:
+                    job_offers.extend(self.parse_file(filepath))
+                except Exception as e:
+                    failures[filepath] = str(e)
+            return job_offers, failures
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_parse_file_in_worker, filepath, self.cache_dir, self.cache_max_bytes,
+                                self.csv_engine)
+                for filepath in filepaths
+            ]
+            for filepath, future in zip(filepaths, futures):
+                try:
+                    job_offers.extend(future.result())
+                except Exception as e:
+                    failures[filepath] = str(e)
+        
+        return job_offers, failures
+    
+    def iter_file(self, filepath: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[JobOffer]]:
+        """
+        Parse a spreadsheet file in bounded chunks
+        
+        CSV, Parquet and .xlsx files are read chunksize rows at a time, so
+        memory stays flat regardless of file size. Other Excel and Feather
+        files are loaded once and yielded in slices of the same size. The
+        types of CSV columns are inferred per chunk, as pandas.read_csv does,
+        so a column with text in one chunk may be numeric in another.
+        
+        Args:
+            filepath: Path to the spreadsheet file (CSV, Excel, Parquet or Feather)
+            chunksize: Maximum number of offers per batch
+            
+        Yields:
+            Lists of at most chunksize JobOffer objects, in file order
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+        
+        ext = os.path.splitext(filepath)[1].lower()
+        
+        if ext in CSV_EXTENSIONS and self.csv_engine == 'mmap':
+            yield from self._iter_csv_mmap(filepath, chunksize)
+            return
+        if ext in CSV_EXTENSIONS and self._use_python_csv_engine(filepath):
+            yield from self._iter_csv_python(filepath, chunksize)
+            return
+        
+        self._require_pandas()
+        if ext in CSV_EXTENSIONS:
+            with pd.read_csv(filepath, usecols=self._is_used_column, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield self._dataframe_to_job_offers(chunk)
+        elif ext in PARQUET_EXTENSIONS:
+            parquet = _import_pyarrow('pyarrow.parquet')
+            parquet_file = parquet.ParquetFile(filepath)
+            columns = self._used_columns(parquet_file.schema_arrow.names)
+            self._validate_columns(columns)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                yield self._dataframe_to_job_offers(batch.to_pandas())
+        elif ext in STREAMING_EXCEL_EXTENSIONS:
+            yield from self.iter_excel(filepath, chunksize)
+        else:
+            df = self._read_dataframe(filepath)
+            self._validate_columns(df.columns)
+            for start in range(0, len(df), chunksize):
+                yield self._dataframe_to_job_offers(df.iloc[start:start + chunksize])
+    
+    def parse_appended(self, filepath: str) -> Tuple[List[JobOffer], bool]:
+        """
+        Parse only the rows appended to a CSV file since the previous call
+        
+        The parser remembers the header and the byte offset just past the last
+        complete record it parsed, plus a hash of the bytes before that offset.
+        If the file shrank, its header changed or those bytes differ, the file
+        was truncated or rewritten and is parsed again from the start. A
+        trailing record without a newline, or with a quoted field that is not
+        closed yet, is still being written and is left for the next call.
+        
+        Args:
+            filepath: Path to an append-only CSV file
+            
+        Returns:
+            Tuple of (new JobOffer objects, whether the whole file was re-parsed).
+            After a full re-parse the offers replace all offers previously
+            returned for the file.
+        """
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext not in CSV_EXTENSIONS:
+            raise ValueError(f"Incremental parsing is only supported for CSV files, not {ext}")
+        
+        key = os.path.abspath(filepath)
+        state = self._tail_states.get(key)
+        
+        with open(filepath, 'rb') as f:
+            header_line = f.readline()
+            if not header_line.endswith(b'\n'):
+                # Empty file, or the header itself is still being written
+                self._tail_states.pop(key, None)
+                return [], state is not None
+            
+            full_parse = state is None or not self._tail_matches(f, state, header_line)
+            start = len(header_line) if full_parse else state['offset']
+            f.seek(start)
+            data = f.read()
+            # Only consume complete records
+            data = data[:self._complete_records_length(data)]
+            offset = start + len(data)
+            
+            header = next(csv.reader([header_line.decode('utf-8-sig')]))
+            self._validate_columns(header)
+            reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+            job_offers = [offer for batch in self._convert_csv_rows(reader, header) for offer in batch]
+            
+            fingerprint = self._tail_fingerprint(f, len(header_line), offset)
+        
+        self._tail_states[key] = {'header': header_line, 'offset': offset, 'fingerprint': fingerprint}
+        return job_offers, full_parse
+    
+    def ingest_appended(self, filepath: str, engine: 'ComparisonEngine') -> int:
+        """
+        Add offers appended to a CSV file since the previous call to a comparison engine
+        
+        New rows are passed to engine.add_offer. If the file was truncated or
+        rewritten, the offers previously ingested from it are removed from the
+        engine before the re-parsed offers are added.
+        
+        Args:
+            filepath: Path to an append-only CSV file
+            engine: ComparisonEngine receiving the offers
+            
+        Returns:
+            Number of offers added to the engine
+        """
+        job_offers, full_parse = self.parse_appended(filepath)
+        key = os.path.abspath(filepath)
+        if full_parse:
+            engine.remove_offers(self._ingested_offers.pop(key, []))
+        
+        for offer in job_offers:
+            engine.add_offer(offer)
+        self._ingested_offers.setdefault(key, []).extend(job_offers)
+        return len(job_offers)
+    
+    def _tail_matches(self, f, state: Dict[str, Any], header_line: bytes) -> bool:
+        """Check that an open CSV file still starts with the data parsed by parse_appended"""
+        if header_line != state['header'] or os.fstat(f.fileno()).st_size < state['offset']:
+            return False
+        return self._tail_fingerprint(f, len(header_line), state['offset']) == state['fingerprint']
+    
+    @staticmethod
+    def _complete_records_length(data: bytes) -> int:
+        """
+        Length of the complete CSV records at the start of data
+        
+        A record ends at a newline outside quoted fields, i.e. one preceded
+        by an even number of quote characters, since escaped quotes are
+        doubled. data must start at a record boundary.
+        """
+        end = data.rfind(b'\n') + 1
+        quotes = data.count(b'"', 0, end)
+        while quotes % 2:
+            # The newline is inside a quoted field; try the one before it
+            previous = data.rfind(b'\n', 0, end - 1) + 1
+            quotes -= data.count(b'"', previous, end)
+            end = previous
+        return end
+    
+    @staticmethod
+    def _tail_fingerprint(f, data_start: int, offset: int) -> str:
+        """Hash the bytes just before offset in an open file"""
+        start = max(data_start, offset - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.blake2b(f.read(offset - start)).hexdigest()
+    
+    def _use_python_csv_engine(self, filepath: str) -> bool:
+        """Decide whether a CSV file is read with the stdlib csv module"""
+        if self.csv_engine == 'auto':
+            if pd is None:
+                max_bytes = CSV_PYTHON_ENGINE_MAX_BYTES
+            else:
+                max_bytes = CSV_PYTHON_ENGINE_MAX_BYTES_PANDAS_LOADED
+            return os.path.getsize(filepath) <= max_bytes or not _import_pandas()
+        return self.csv_engine == 'python'
+    
+    @staticmethod
+    def _require_pandas() -> None:
+        """Import pandas, raising an ImportError if it is not installed"""
+        if not _import_pandas():
+            raise ImportError(
+                "Pandas package is required for spreadsheet support.\n"
+                "Please install with: pip install pandas openpyxl"
+            )
+    
+    def _iter_csv_python(self, filepath: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[JobOffer]]:
+        """
+        Read a CSV file with the stdlib csv module, converting rows directly to JobOffer objects
+        
+        The header is mapped to per-column converters once. Each chunk of rows
+        is transposed and every distinct value in a column is converted only
+        once. Column types are inferred from the chunk's values as
+        pandas.read_csv infers them for a chunk of the same size, so offers
+        match the pandas path.
+        
+        Args:
+            filepath: Path to the CSV file
+            chunksize: Maximum number of offers per batch
+            
+        Yields:
+            Lists of at most chunksize JobOffer objects, in file order
+        """
+        with open(filepath, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError("No columns to parse from file")
+            
+            yield from self._convert_csv_rows(reader, header, chunksize)
+    
+    def _convert_csv_rows(self, reader: Iterator[List[str]], header: List[str],
+                          chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[JobOffer]]:
+        """Convert rows from a csv.reader positioned after the header, chunksize rows at a time"""
+        convert_rows = self._csv_rows_converter(header)
+        width = len(header)
+        
+        # Skip blank and whitespace-only lines, as pandas.read_csv does, and pad short rows
+        rows = (row if len(row) >= width else row + [''] * (width - len(row))
+                for row in reader if len(row) > 1 or (row and row[0].strip(' \t')))
+        while True:
+            chunk = list(itertools.islice(rows, chunksize))
+            if not chunk:
+                break
+            yield convert_rows(chunk)
+    
+    def _iter_csv_mmap(self, filepath: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[JobOffer]]:
+        """
+        Read a CSV file through a memory map, parsing numeric fields without creating strings
+        
+        Row and field boundaries are located with vectorized scans of the
+        mapped bytes. Numeric columns are gathered into fixed-width byte
+        arrays and parsed straight into float64 arrays; Python strings are
+        only created for the distinct values of text, boolean and enum
+        columns. Offers match the stdlib reader. If a block has rows with the
+        wrong number of fields or quoting the scan cannot follow, the rest of
+        the file is read with the stdlib reader.
+        
+        Args:
+            filepath: Path to the CSV file
+            chunksize: Maximum number of offers per batch
+            
+        Yields:
+            Lists of at most chunksize JobOffer objects, in file order
+        """
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("No columns to parse from file")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        fallback_offset = None
+        try:
+            start = 3 if mm[:3] == b'\xef\xbb\xbf' else 0
+            header_end = mm.find(b'\n', start)
+            header_end = len(mm) if header_end < 0 else header_end + 1
+            header_line = mm[start:header_end]
+            if header_line.count(b'"') % 2:
+                # Quoted newline in the header
+                fallback_offset = 0
+            else:
+                header = next(csv.reader([header_line.decode('utf-8')]), [])
+                positions = self._csv_positions(header)
+                start = header_end
+                block_bytes = MMAP_MIN_BLOCK_BYTES
+                while start < len(mm):
+                    chunk = self._read_mmap_chunk(mm, start, chunksize, block_bytes, positions, len(header))
+                    if chunk is None:
+                        fallback_offset = start
+                        break
+                    job_offers, start, block_bytes = chunk
+                    if job_offers:
+                        yield job_offers
+        finally:
+            try:
+                mm.close()
+            except BufferError:
+                # Arrays referencing the map are still alive (e.g. in a traceback);
+                # it is closed when they are released
+                pass
+        
+        if fallback_offset == 0:
+            yield from self._iter_csv_python(filepath, chunksize)
+        elif fallback_offset is not None:
+            with open(filepath, 'rb') as f:
+                f.seek(fallback_offset)
+                reader = csv.reader(io.TextIOWrapper(f, encoding='utf-8', newline=''))
+                yield from self._convert_csv_rows(reader, header, chunksize)
+    
+    def _read_mmap_chunk(self, mm: mmap.mmap, start: int, chunksize: int, block_bytes: int,
+                         positions: Dict[str, int], width: int) -> Optional[Tuple[List[JobOffer], int, int]]:
+        """
+        Convert up to chunksize rows of a memory-mapped CSV file starting at a row boundary
+        
+        Args:
+            mm: Memory map of the CSV file
+            start: Offset of the first row
+            chunksize: Maximum number of rows to read
+            block_bytes: Initial number of bytes to scan for row boundaries
+            positions: Column positions from the header
+            width: Number of columns in the header
+            
+        Returns:
+            Tuple of (JobOffer objects, offset of the next row, suggested block
+            size for the next chunk), or None if the rows must be read with the
+            stdlib reader
+        """
+        size = len(mm)
+        
+        # Find the row boundaries of the next chunksize rows, growing the block as needed
+        while True:
+            end = min(size, start + block_bytes)
+            buf = np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start)
+            quotes = np.flatnonzero(buf == QUOTE_BYTE)
+            newlines = self._unquoted(np.flatnonzero(buf == NEWLINE_BYTE), quotes)
+            # Blank lines are skipped, so they do not count towards the chunk
+            row_ends = newlines[~self._blank_lines(buf, newlines)]
+            if len(row_ends) >= chunksize:
+                cut = int(row_ends[chunksize - 1]) + 1
+                break
+            if end == size:
+                cut = len(buf)
+                break
+            block_bytes *= 2
+        
+        buf = buf[:cut]
+        quotes = quotes[:np.searchsorted(quotes, cut)]
+        if len(quotes) % 2 or not self._strictly_quoted(buf, quotes):
+            return None
+        
+        # Field end offsets; a last row without a newline ends at the end of the file
+        ends = self._unquoted(np.flatnonzero((buf == COMMA_BYTE) | (buf == NEWLINE_BYTE)), quotes)
+        if buf[-1] != NEWLINE_BYTE:
+            ends = np.append(ends, cut)
+        ends_row = buf[np.minimum(ends, cut - 1)] == NEWLINE_BYTE
+        ends_row[-1] = True
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        
+        # Drop the carriage return of CRLF line endings
+        crlf = ends_row & (ends > starts)
+        crlf[crlf] = buf[ends[crlf] - 1] == CARRIAGE_RETURN_BYTE
+        ends -= crlf
+        
+        # Skip blank lines and require every other row to have one field per column
+        row_ids = np.zeros(len(ends), dtype=np.int64)
+        row_ids[1:] = np.cumsum(ends_row[:-1])
+        fields_per_row = np.bincount(row_ids)
+        blank_rows = (fields_per_row == 1) & (ends[ends_row] == starts[ends_row])
+        if (fields_per_row[~blank_rows] != width).any():
+            return None
+        keep = ~blank_rows[row_ids]
+        starts = starts[keep].reshape(-1, width)
+        ends = ends[keep].reshape(-1, width)
+        count = len(starts)
+        # NUL bytes would be lost as fixed-width padding
+        padding_safe = not (buf == 0).any()
+        
+        def column(name, convert, default):
+            if name not in positions:
+                return [default] * count
+            j = positions[name]
+            column_starts, column_ends = starts[:, j], ends[:, j]
+            field_width = max(int((column_ends - column_starts).max()), 1)
+            if not padding_safe or field_width > MMAP_MAX_TEXT_WIDTH:
+                texts = [_csv_field_text(mm[a:b]) for a, b in zip((column_starts + start).tolist(),
+                                                                   (column_ends + start).tolist())]
+                return _convert_csv_texts(texts, convert, default)
+            
+            # Convert each distinct value once, found without creating strings
+            fields = self._gather_fields(buf, column_starts, column_ends, field_width)
+            distinct, inverse = np.unique(fields, return_inverse=True)
+            values = None
+            if convert in (_csv_float, _csv_int, _csv_required_float):
+                values = self._parse_mmap_numbers(distinct, convert, default)
+            if values is None:
+                values = np.empty(len(distinct), dtype=object)
+                values[:] = convert([_csv_field_text(raw) for raw in distinct.tolist()], default)
+            return values[inverse.ravel()].tolist()
+        
+        job_offers = self._csv_columns_to_job_offers(column) if count else []
+        next_block_bytes = max(MMAP_MIN_BLOCK_BYTES, cut * chunksize // len(fields_per_row) * 5 // 4)
+        return job_offers, start + cut, next_block_bytes
+    
+    @staticmethod
+    def _blank_lines(buf: 'np.ndarray', newlines: 'np.ndarray') -> 'np.ndarray':
+        """Flag the lines ending at the given newlines that are empty, apart from a carriage return"""
+        line_starts = np.empty_like(newlines)
+        line_starts[:1] = 0
+        line_starts[1:] = newlines[:-1] + 1
+        lengths = newlines - line_starts
+        return (lengths == 0) | ((lengths == 1) & (buf[line_starts] == CARRIAGE_RETURN_BYTE))
+    
+    @staticmethod
+    def _unquoted(offsets: 'np.ndarray', quotes: 'np.ndarray') -> 'np.ndarray':
+        """Keep the offsets that are outside quoted fields, given the offsets of all quote bytes"""
+        if len(quotes) == 0:
+            return offsets
+        return offsets[np.searchsorted(quotes, offsets) % 2 == 0]
+    
+    @staticmethod
+    def _strictly_quoted(buf: 'np.ndarray', quotes: 'np.ndarray') -> bool:
+        """
+        Check that every quote opens or closes a whole field or is a doubled inner quote
+        
+        Only then do quoted fields split exactly as the csv module splits
+        them. Quotes alternate between opening (even index) and closing (odd
+        index); a closing quote directly followed by another quote is a
+        doubled inner quote.
+        """
+        if len(quotes) == 0:
+            return True
+        opening, closing = quotes[0::2], quotes[1::2]
+        doubled = np.zeros(len(closing), dtype=bool)
+        doubled[:-1] = opening[1:] == closing[:-1] + 1
+        
+        # Opening quotes start a field, unless they are the second half of a doubled quote
+        before = buf[np.maximum(opening - 1, 0)]
+        field_start = (opening == 0) | (before == COMMA_BYTE) | (before == NEWLINE_BYTE)
+        field_start[1:] |= doubled[:-1]
+        
+        # Closing quotes end a field, unless they are the first half of a doubled quote
+        padded = np.append(buf, [NEWLINE_BYTE, NEWLINE_BYTE])
+        after = padded[closing + 1]
+        field_end = ((after == COMMA_BYTE) | (after == NEWLINE_BYTE)
+                     | ((after == CARRIAGE_RETURN_BYTE) & (padded[closing + 2] == NEWLINE_BYTE)))
+        return bool(field_start.all() and (field_end | doubled).all())
+    
+    @staticmethod
+    def _gather_fields(buf: 'np.ndarray', starts: 'np.ndarray', ends: 'np.ndarray',
+                       field_width: int) -> 'np.ndarray':
+        """Copy fields into a fixed-width, NUL-padded byte string array"""
+        offsets = np.arange(field_width)
+        inside = offsets < (ends - starts)[:, None]
+        indices = np.minimum(starts[:, None] + offsets, len(buf) - 1)
+        fields = np.where(inside, buf[indices], np.uint8(0))
+        return fields.view(f'S{field_width}').ravel()
+    
+    @staticmethod
+    def _parse_mmap_numbers(fields: 'np.ndarray', convert, default: Any) -> Optional['np.ndarray']:
+        """
+        Parse fixed-width numeric CSV fields into a float64 or int64 array
+        
+        Plain decimals ([+-]digits[.digits]) with at most 15 digits are
+        assembled from their digits with integer arithmetic; dividing the
+        exact integer by an exact power of ten rounds the same way float()
+        does. Other numbers are parsed by numpy. Returns None when a field
+        holds anything but a number or nothing, so the caller can fall back
+        to converting strings.
+        """
+        field_width = fields.dtype.itemsize
+        chars = fields.view(np.uint8).reshape(-1, field_width)
+        allowed = np.zeros(256, dtype=bool)
+        allowed[list(MMAP_NUMERIC_BYTES)] = True
+        allowed[0] = True
+        if not allowed[chars].all():
+            return None
+        
+        padding = chars == 0
+        missing = padding[:, 0]
+        digits = (chars >= ord('0')) & (chars <= ord('9'))
+        points = chars == ord('.')
+        body = digits | points | padding
+        digit_counts = digits.sum(axis=1)
+        simple = body.all(axis=1) | (((chars[:, 0] == ord('+')) | (chars[:, 0] == ord('-')))
+                                     & body[:, 1:].all(axis=1))
+        simple &= (points.sum(axis=1) <= 1) & (digit_counts > 0) & (digit_counts <= 15)
+        
+        # Value of each digit position: 10 ** (number of digits to its right);
+        # other fields are clipped to stay in range and parsed below
+        powers_of_ten = 10 ** np.arange(16, dtype=np.int64)
+        places = np.minimum(np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - digits, 15)
+        mantissas = ((chars.astype(np.int64) - ord('0')) * digits * powers_of_ten[places]).sum(axis=1)
+        decimals = np.minimum((digits & (np.cumsum(points, axis=1) > 0)).sum(axis=1), 15)
+        values = mantissas / powers_of_ten[decimals]
+        values[chars[:, 0] == ord('-')] *= -1
+        
+        other = ~simple & ~missing
+        if other.any():
+            try:
+                values[other] = fields[other].astype(np.float64)
+            except ValueError:
+                return None
+        values[missing] = np.nan
+        
+        if convert is _csv_required_float:
+            return values
+        if convert is _csv_int:
+            # Integers beyond float precision and infinities need exact string handling
+            if not (np.abs(values[~missing]) < 2 ** 53).all():
+                return None
+            values = np.trunc(np.where(missing, 0, values)).astype(np.int64)
+        return np.where(missing, default, values) if missing.any() else values
+    
+    def _csv_rows_converter(self, header: List[str]):
+        """
+        Build a function converting a list of CSV rows (lists of strings) to JobOffer objects
+        
+        Args:
+            header: CSV header row
+            
+        Returns:
+            Function taking a list of rows and returning a list of JobOffer objects
+        """
+        positions = self._csv_positions(header)
+        
+        def convert_rows(rows: List[List[str]]) -> List[JobOffer]:
+            columns = list(zip(*rows))
+            count = len(rows)
+            
+            def column(name, convert, default):
+                if name not in positions:
+                    return [default] * count
+                return _convert_csv_texts(columns[positions[name]], convert, default)
+            
+            return self._csv_columns_to_job_offers(column)
+        
+        return convert_rows
+    
+    def _csv_positions(self, header: List[str]) -> Dict[str, int]:
+        """Map each CSV column name to the position of its first occurrence in the header"""
+        positions = {}
+        for i, name in enumerate(header):
+            positions.setdefault(name, i)
+        self._validate_columns(positions)
+        return positions
+    
+    def _csv_columns_to_job_offers(self, column) -> List[JobOffer]:
+        """
+        Build JobOffer objects from CSV columns
+        
+        Args:
+            column: Function taking (column name, CSV field converter, default)
+                and returning the converted values of that column
+            
+        Returns:
+            List of JobOffer objects
+        """
+        converters = {'float': _csv_float, 'int': _csv_int, 'bool': _csv_bool, 'str': _csv_str}
+        
+        def enum_column(name, mapping, default, missing=_UNSET):
+            if missing is _UNSET:
+                missing = default
+            return column(name, _csv_enum_converter(mapping, default, missing), None)
+        
+        benefits_values = {
+            name: column(name, converters[kind], default)
+            for name, kind, default in BENEFITS_COLUMNS
+        }
+        offer_values = {
+            name: column(name, converters[kind], default)
+            for name, kind, default in JOB_OFFER_COLUMNS
+        }
+        
+        # Missing calc types are inferred from the distance
+        calc_types = enum_column('commute_calc_type', COMMUTE_CALC_TYPES,
+                                 CommuteCalculationType.DIRECT, missing=None)
+        calc_types = [
+            calc_type if calc_type is not None
+            else CommuteCalculationType.DISTANCE_BASED if distance > 0
+            else CommuteCalculationType.DIRECT
+            for calc_type, distance in zip(calc_types, offer_values['commute_distance_miles'])
+        ]
+        
+        offer_values.update({
+            'benefits': self._build_objects(Benefits, benefits_values),
+            'title': column('title', _csv_required_str, None),
+            'company': column('company', _csv_required_str, None),
+            'location': column('location', _csv_required_str, None),
+            'work_location_type': enum_column('work_location_type', WORK_LOCATION_TYPES,
+                                              WorkLocationType.ONSITE),
+            'employment_type': enum_column('employment_type', EMPLOYMENT_TYPES, EmploymentType.W2),
+            'compensation_type': enum_column('compensation_type', COMPENSATION_TYPES,
+                                             CompensationType.SALARY),
+            'base_compensation': column('base_compensation', _csv_required_float, None),
+            'commute_drive_type': enum_column('commute_drive_type', DRIVE_TYPES, DriveType.MIXED,
+                                              missing=None),
+            'commute_calc_type': calc_types,
+            'expected_hours_per_week': offer_values['hours_per_week'],
+        })
+        return self._build_objects(JobOffer, offer_values)
     
     def _dataframe_to_job_offers(self, df: 'pd.DataFrame') -> List[JobOffer]:
         """
         Convert a pandas DataFrame to a list of JobOffer objects
         
+        Each column is normalized, coerced and defaulted once for the whole
+        frame; JobOffer and Benefits objects are only built at the end.
+        
         Required columns:
         - title: Job title
         - company: Company name
@@ -62,134 +1253,74 @@ class SpreadsheetParser:
         - compensation_type: Type of compensation ("salary" or "hourly")
         - base_compensation: Base annual salary or hourly rate
         
-        Optional columns: See the detailed mapping in the implementation
+        Optional columns: See BENEFITS_COLUMNS and JOB_OFFER_COLUMNS
         """
-        job_offers = []
+        self._require_pandas()
+        self._validate_columns(df.columns)
         
-        # Validate required columns
-        required_columns = ['title', 'company', 'location', 'work_location_type', 
-                            'employment_type', 'compensation_type', 'base_compensation']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+        if len(df) == 0:
+            return []
         
-        # Process each row
-        for _, row in df.iterrows():
-            # Create Benefits object first
-            benefits = self._create_benefits_from_row(row)
-            
-            # Map work location type string to enum
-            work_location_type_str = str(row['work_location_type']).strip().upper()
-            if work_location_type_str in ['ONSITE', 'ON-SITE', 'ON SITE']:
-                work_location_type = WorkLocationType.ONSITE
-            elif work_location_type_str == 'REMOTE':
-                work_location_type = WorkLocationType.REMOTE
-            elif work_location_type_str == 'HYBRID':
-                work_location_type = WorkLocationType.HYBRID
-            else:
-                # Default to onsite if unrecognized
-                work_location_type = WorkLocationType.ONSITE
-            
-            # Map employment type string to enum
-            employment_type_str = str(row['employment_type']).strip().upper()
-            if employment_type_str == 'W2':
-                employment_type = EmploymentType.W2
-            elif employment_type_str == '1099':
-                employment_type = EmploymentType.CONTRACTOR_1099
-            elif employment_type_str == 'S-CORP':
-                employment_type = EmploymentType.S_CORP
-            else:
-                # Default to W2 if unrecognized
-                employment_type = EmploymentType.W2
-            
-            # Map compensation type string to enum
-            compensation_type_str = str(row['compensation_type']).strip().upper()
-            if compensation_type_str in ['SALARY', 'ANNUAL']:
-                compensation_type = CompensationType.SALARY
-            elif compensation_type_str in ['HOURLY', 'HOUR']:
-                compensation_type = CompensationType.HOURLY
-            else:
-                # Default to salary if unrecognized
-                compensation_type = CompensationType.SALARY
-            
-            # Handle boolean fields
-            bonus_guaranteed = self._get_bool_value(row, 'bonus_guaranteed', False)
-            
-            # Handle hours and weeks
-            hours_per_week = self._get_float_value(row, 'hours_per_week', 40.0)
-            weeks_per_year = self._get_float_value(row, 'weeks_per_year', 50.0)
-            
-            # Create the JobOffer object
-            job_offer = JobOffer(
-                title=str(row['title']),
-                company=str(row['company']),
-                location=str(row['location']),
-                work_location_type=work_location_type,
-                employment_type=employment_type,
-                compensation_type=compensation_type,
-                base_compensation=float(row['base_compensation']),
-                hours_per_week=hours_per_week,
-                weeks_per_year=weeks_per_year,
-                bonus_amount=self._get_float_value(row, 'bonus_amount', 0.0),
-                bonus_guaranteed=bonus_guaranteed,
-                signing_bonus=self._get_float_value(row, 'signing_bonus', 0.0),
-                relocation_package=self._get_float_value(row, 'relocation_package', 0.0),
-                benefits=benefits,
-                state_tax_rate=self._get_float_value(row, 'state_tax_rate', 0.0),
-                local_tax_rate=self._get_float_value(row, 'local_tax_rate', 0.0),
-                self_employment_expenses=self._get_float_value(row, 'self_employment_expenses', 0.0),
-                business_expenses=self._get_float_value(row, 'business_expenses', 0.0),
-                cost_of_living_index=self._get_float_value(row, 'cost_of_living_index', 100.0),
-                commute_time_minutes=self._get_int_value(row, 'commute_time_minutes', 0),
-                commute_cost_monthly=self._get_float_value(row, 'commute_cost_monthly', 0.0),
-                commute_days_per_week=self._get_int_value(row, 'commute_days_per_week', 5),
-                # Add commute calculator parameters
-                commute_distance_miles=self._get_float_value(row, 'commute_distance_miles', 0.0),
-                # Import DriveType and CommuteCalculationType if they exist in the row
-                commute_drive_type=self._get_drive_type(row),
-                commute_calc_type=self._get_commute_calc_type(row),
-                commute_fuel_cost=self._get_float_value(row, 'commute_fuel_cost', 3.50),
-                commute_city_mpg=self._get_float_value(row, 'commute_city_mpg', 25.0),
-                commute_highway_mpg=self._get_float_value(row, 'commute_highway_mpg', 32.0),
-                commute_combined_mpg=self._get_float_value(row, 'commute_combined_mpg', 28.0),
-                commute_include_maintenance=self._get_bool_value(row, 'commute_include_maintenance', True),
-                expected_hours_per_week=hours_per_week,
-                expected_tenure_years=self._get_float_value(row, 'expected_tenure_years', 3.0)
-            )
-            
-            job_offers.append(job_offer)
+        # Convert benefits columns
+        benefits_values = {
+            name: self._convert_column(df, name, kind, default)
+            for name, kind, default in BENEFITS_COLUMNS
+        }
         
-        return job_offers
+        # Convert job offer columns
+        offer_values = {
+            'benefits': self._build_objects(Benefits, benefits_values),
+            'title': self._required_str_column(df, 'title'),
+            'company': self._required_str_column(df, 'company'),
+            'location': self._required_str_column(df, 'location'),
+            'work_location_type': self._enum_column(
+                df, 'work_location_type', WORK_LOCATION_TYPES, WorkLocationType.ONSITE),
+            'employment_type': self._enum_column(
+                df, 'employment_type', EMPLOYMENT_TYPES, EmploymentType.W2),
+            'compensation_type': self._enum_column(
+                df, 'compensation_type', COMPENSATION_TYPES, CompensationType.SALARY),
+            'base_compensation': self._required_float_column(df, 'base_compensation'),
+        }
+        for name, kind, default in JOB_OFFER_COLUMNS:
+            offer_values[name] = self._convert_column(df, name, kind, default)
+        
+        offer_values['commute_drive_type'] = self._enum_column(
+            df, 'commute_drive_type', DRIVE_TYPES, DriveType.MIXED, missing=None)
+        offer_values['commute_calc_type'] = self._commute_calc_type_column(
+            df, offer_values['commute_distance_miles'])
+        offer_values['expected_hours_per_week'] = offer_values['hours_per_week']
+        
+        return self._build_objects(JobOffer, offer_values)
     
-    def _create_benefits_from_row(self, row: Dict[str, Any]) -> Benefits:
-        """Create a Benefits object from a row of spreadsheet data"""
-        return Benefits(
-            retirement_match_percent=self._get_float_value(row, 'retirement_match_percent', 0.0),
-            retirement_match_limit=self._get_float_value(row, 'retirement_match_limit', 0.0),
-            health_insurance_monthly_premium=self._get_float_value(row, 'health_insurance_monthly_premium', 0.0),
-            health_insurance_coverage_percent=self._get_float_value(row, 'health_insurance_coverage_percent', 0.0),
-            dental_insurance_monthly_premium=self._get_float_value(row, 'dental_insurance_monthly_premium', 0.0),
-            dental_insurance_coverage_percent=self._get_float_value(row, 'dental_insurance_coverage_percent', 0.0),
-            vision_insurance_monthly_premium=self._get_float_value(row, 'vision_insurance_monthly_premium', 0.0),
-            vision_insurance_coverage_percent=self._get_float_value(row, 'vision_insurance_coverage_percent', 0.0),
-            life_insurance_coverage=self._get_float_value(row, 'life_insurance_coverage', 0.0),
-            life_insurance_monthly_premium=self._get_float_value(row, 'life_insurance_monthly_premium', 0.0),
-            paid_time_off_days=self._get_int_value(row, 'paid_time_off_days', 0),
-            paid_holidays=self._get_int_value(row, 'paid_holidays', 0),
-            paid_sick_days=self._get_int_value(row, 'paid_sick_days', 0),
-            paid_parental_leave_weeks=self._get_int_value(row, 'paid_parental_leave_weeks', 0),
-            equity_value=self._get_float_value(row, 'equity_value', 0.0),
-            other_benefits_value=self._get_float_value(row, 'other_benefits_value', 0.0),
-            other_benefits_description=self._get_str_value(row, 'other_benefits_description', '')
-        )
+    def _build_objects(self, cls: type, columns: Dict[str, List[Any]]) -> List[Any]:
+        """
+        Build one instance of cls per row from converted column values
+        
+        Arguments are passed positionally in constructor order, with the
+        constructor default for any parameter that has no column.
+        """
+        parameters = inspect.signature(cls).parameters.values()
+        ordered = [
+            columns[parameter.name] if parameter.name in columns else itertools.repeat(parameter.default)
+            for parameter in parameters
+        ]
+        return [cls(*values) for values in zip(*ordered)]
+    
+    def _validate_columns(self, columns) -> None:
+        """Raise a ValueError if any required column is missing"""
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
     
     def create_template_file(self, filepath: str) -> None:
         """
         Create a template spreadsheet file with all expected columns
         
         Args:
-            filepath: Path where the template should be saved (.csv or .xlsx)
+            filepath: Path where the template should be saved (.csv, .xlsx, .parquet or .feather)
         """
+        self._require_pandas()
+        
         # Define all columns with sample values
         data = {
             # Required fields
@@ -275,101 +1406,134 @@ class SpreadsheetParser:
         df = pd.concat([df, hourly_df], ignore_index=True)
         
         # Save the template
-        _, ext = os.path.splitext(filepath)
-        if ext.lower() == '.csv':
-            df.to_csv(filepath, index=False)
-        elif ext.lower() in ['.xlsx', '.xls']:
-            df.to_excel(filepath, index=False)
-        else:
-            raise ValueError(f"Unsupported file format: {ext}. Use .csv, .xlsx, or .xls")
+        self._write_dataframe(df, filepath)
     
-    def _get_float_value(self, row: Dict[str, Any], column: str, default: float = 0.0) -> float:
-        """Safely extract a float value from a row"""
-        if column in row and pd.notna(row[column]):
+    def _convert_column(self, df: 'pd.DataFrame', column: str, kind: str, default: Any) -> List[Any]:
+        """Convert a whole column to a list of Python values of the given kind"""
+        if kind == 'float':
+            return self._float_column(df, column, default)
+        elif kind == 'int':
+            return self._int_column(df, column, default)
+        elif kind == 'bool':
+            return self._bool_column(df, column, default)
+        return self._str_column(df, column, default)
+    
+    def _float_column(self, df: 'pd.DataFrame', column: str, default: float = 0.0) -> List[float]:
+        """Safely convert a column to floats, using the default for missing values"""
+        if column not in df.columns:
+            return [default] * len(df)
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float).fillna(default).tolist()
+        return [self._to_float(value, default) for value in series.tolist()]
+    
+    def _int_column(self, df: 'pd.DataFrame', column: str, default: int = 0) -> List[int]:
+        """Safely convert a column to integers, using the default for missing values"""
+        if column not in df.columns:
+            return [default] * len(df)
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series):
+            return series.fillna(default).astype('int64').tolist()
+        return [self._to_int(value, default) for value in series.tolist()]
+    
+    def _bool_column(self, df: 'pd.DataFrame', column: str, default: bool = False) -> List[bool]:
+        """Safely convert a column to booleans, using the default for missing values"""
+        if column not in df.columns:
+            return [default] * len(df)
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            return series.fillna(default).astype(bool).tolist()
+        if pd.api.types.is_numeric_dtype(series):
+            return (series != 0).where(series.notna(), default).astype(bool).tolist()
+        return [self._to_bool(value, default) for value in series.tolist()]
+    
+    def _str_column(self, df: 'pd.DataFrame', column: str, default: str = '') -> List[str]:
+        """Safely convert a column to strings, using the default for missing values"""
+        if column not in df.columns:
+            return [default] * len(df)
+        series = df[column]
+        return [default if missing else str(value)
+                for value, missing in zip(series.tolist(), series.isna().tolist())]
+    
+    def _required_str_column(self, df: 'pd.DataFrame', column: str) -> List[str]:
+        """Convert a required column to strings"""
+        return [str(value) for value in df[column].tolist()]
+    
+    def _required_float_column(self, df: 'pd.DataFrame', column: str) -> List[float]:
+        """Convert a required column to floats, raising on invalid values"""
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float).tolist()
+        return [float(value) for value in series.tolist()]
+    
+    def _enum_column(self, df: 'pd.DataFrame', column: str, mapping: Dict[str, Any],
+                     default: Any, missing: Any = _UNSET) -> List[Any]:
+        """
+        Map a column of strings to enum values
+        
+        Each distinct value is normalized and looked up only once.
+        
+        Args:
+            df: DataFrame containing the column
+            column: Column name
+            mapping: Normalized string to enum mapping
+            default: Value for unrecognized strings
+            missing: Value for missing cells (and for a missing column); unrecognized
+                values get the default when not given
+            
+        Returns:
+            List of enum values, one per row
+        """
+        if column not in df.columns:
+            return [default if missing is _UNSET else missing] * len(df)
+        codes, uniques = pd.factorize(df[column])
+        mapped = [mapping.get(str(value).strip().upper(), default) for value in uniques]
+        # Code -1 marks missing cells and selects the trailing entry
+        mapped.append(default if missing is _UNSET else missing)
+        return np.array(mapped, dtype=object)[codes].tolist()
+    
+    def _commute_calc_type_column(self, df: 'pd.DataFrame',
+                                  distances: List[float]) -> List[CommuteCalculationType]:
+        """Map the commute_calc_type column, inferring missing values from the distance"""
+        inferred = [
+            CommuteCalculationType.DISTANCE_BASED if distance > 0 else CommuteCalculationType.DIRECT
+            for distance in distances
+        ]
+        if 'commute_calc_type' not in df.columns:
+            return inferred
+        calc_types = self._enum_column(df, 'commute_calc_type', COMMUTE_CALC_TYPES,
+                                       CommuteCalculationType.DIRECT, missing=None)
+        return [inferred[i] if calc_type is None else calc_type
+                for i, calc_type in enumerate(calc_types)]
+    
+    @staticmethod
+    def _to_float(value: Any, default: float = 0.0) -> float:
+        """Safely convert a single cell value to a float"""
+        if pd.notna(value):
             try:
-                return float(row[column])
+                return float(value)
             except (ValueError, TypeError):
                 return default
         return default
     
-    def _get_int_value(self, row: Dict[str, Any], column: str, default: int = 0) -> int:
-        """Safely extract an integer value from a row"""
-        if column in row and pd.notna(row[column]):
+    @staticmethod
+    def _to_int(value: Any, default: int = 0) -> int:
+        """Safely convert a single cell value to an integer"""
+        if pd.notna(value):
             try:
-                return int(row[column])
+                return int(value)
             except (ValueError, TypeError):
                 return default
         return default
     
-    def _get_bool_value(self, row: Dict[str, Any], column: str, default: bool = False) -> bool:
-        """Safely extract a boolean value from a row"""
-        if column in row and pd.notna(row[column]):
-            if isinstance(row[column], bool):
-                return row[column]
-            elif isinstance(row[column], (int, float)):
-                return bool(row[column])
-            elif isinstance(row[column], str):
-                return row[column].lower() in ['true', 'yes', 'y', '1', 't']
+    @staticmethod
+    def _to_bool(value: Any, default: bool = False) -> bool:
+        """Safely convert a single cell value to a boolean"""
+        if pd.notna(value):
+            if isinstance(value, bool):
+                return value
+            elif isinstance(value, (int, float)):
+                return bool(value)
+            elif isinstance(value, str):
+                return value.lower() in TRUE_STRINGS
         return default
-    
-    def _get_str_value(self, row: Dict[str, Any], column: str, default: str = '') -> str:
-        """Safely extract a string value from a row"""
-        if column in row and pd.notna(row[column]):
-            return str(row[column])
-        return default
-
-    def _get_drive_type(self, row: Dict[str, Any]) -> Optional['DriveType']:
-        """
-        Get drive type enum from row data
-        
-        Args:
-            row: Dictionary of row data
-            
-        Returns:
-            DriveType enum or None if not specified
-        """
-        from commute_calculator import DriveType
-        
-        if 'commute_drive_type' not in row or pd.isna(row['commute_drive_type']):
-            return None
-        
-        drive_type_str = str(row['commute_drive_type']).strip().upper()
-        
-        if drive_type_str == 'CITY':
-            return DriveType.CITY
-        elif drive_type_str == 'HIGHWAY':
-            return DriveType.HIGHWAY
-        elif drive_type_str in ['MIXED', 'COMBINED']:
-            return DriveType.MIXED
-        else:
-            # Default to mixed if unrecognized
-            return DriveType.MIXED
-    
-    def _get_commute_calc_type(self, row: Dict[str, Any]) -> 'CommuteCalculationType':
-        """
-        Get commute calculation type enum from row data
-        
-        Args:
-            row: Dictionary of row data
-            
-        Returns:
-            CommuteCalculationType enum
-        """
-        from job_offer import CommuteCalculationType
-        
-        if 'commute_calc_type' not in row or pd.isna(row['commute_calc_type']):
-            # Default based on available data
-            if 'commute_distance_miles' in row and pd.notna(row['commute_distance_miles']) and float(row['commute_distance_miles']) > 0:
-                return CommuteCalculationType.DISTANCE_BASED
-            else:
-                return CommuteCalculationType.DIRECT
-        
-        calc_type_str = str(row['commute_calc_type']).strip().upper()
-        
-        if calc_type_str in ['DISTANCE', 'DISTANCE_BASED', 'DISTANCE-BASED']:
-            return CommuteCalculationType.DISTANCE_BASED
-        elif calc_type_str in ['DIRECT', 'MANUAL']:
-            return CommuteCalculationType.DIRECT
-        else:
-            # Default to direct if unrecognized
-            return CommuteCalculationType.DIRECT
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Labelled results of what-if parameter sweeps
+
+ComparisonEngine.sweep_offers evaluates offers for every combination of a
+grid of parameter values (e.g. tenure of 2, 3 or 5 years times 1 to 5
+commute days) as one broadcast computation. The result is a cube per
+metric, with the offers along the first axis and one axis per parameter
+in grid order; SweepResult keeps the axis names and values next to the
+cubes, so cells can be selected by label.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+# Values (offers x grid cells) computed at once, bounding the size of temporary arrays
+SWEEP_CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class SweepResult:
+    """
+    Metrics of every offer for every combination of parameter values
+    
+    Attributes:
+        dims: Axis names: "offer", then the swept parameters in grid order
+        coords: Labels along each axis: the JobOffers, then each parameter's values
+        values: Cube of shape (offers, *grid sizes) per metric
+    """
+    dims: List[str]
+    coords: Dict[str, List[Any]]
+    values: Dict[str, np.ndarray]
+    
+    @property
+    def shape(self) -> tuple:
+        """Sizes of the axes"""
+        return tuple(len(self.coords[dim]) for dim in self.dims)
+    
+    def sel(self, metric: str, **labels) -> np.ndarray:
+        """
+        Select cells of a metric's cube by label
+        
+        Args:
+            metric: Metric to select from
+            **labels: Value per parameter axis, and offer=position in the
+                      offers; axes without a label are kept whole
+        
+        Returns:
+            Array over the axes without a label, or a scalar if every axis has one
+        
+        Raises:
+            KeyError: If a metric, axis or label is not in the result
+        """
+        unknown = set(labels) - set(self.dims)
+        if unknown:
+            raise KeyError(f"Unknown axes: {', '.join(sorted(unknown))}; axes are {', '.join(self.dims)}")
+        
+        index = []
+        for dim in self.dims:
+            if dim not in labels:
+                index.append(slice(None))
+            elif dim == "offer":
+                index.append(labels[dim])
+            else:
+                try:
+                    index.append(self.coords[dim].index(labels[dim]))
+                except ValueError:
+                    raise KeyError(f"{labels[dim]!r} is not a value of {dim}: {self.coords[dim]}") from None
+        return self.values[metric][tuple(index)]
@@ -3,18 +3,37 @@
 Test script to generate sample job offer spreadsheets and test the commute calculator functionality.
 """
 
+import copy
 import os
+import shutil
 import sys
+import tempfile
+import importlib.util
+import json
+import subprocess
+import numpy as np
 import pandas as pd
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from job_offer import JobOffer, EmploymentType, WorkLocationType, CompensationType
+from job_offer import (JobOffer, Benefits, CommuteDetails, EmploymentType, WorkLocationType, CompensationType,
+                       CommuteCalculationType)
 from commute_calculator import CommuteCalculator, DriveType
+import comparison_engine
+import spreadsheet_parser
 from spreadsheet_parser import SpreadsheetParser
+from parse_cache import CACHE_EXTENSION
 from comparison_engine import ComparisonEngine
+from comparison_result import BenefitsBreakdown, CompensationResult
+from scoring import ScoringProfile
+from simulation import Distribution, UncertaintyModel
+from delta_matrix import DeltaMatrix
+from offer_index import OfferIndex, find_duplicates, offer_fingerprint
+from offer_batch import OfferBatch
 from benefits_calculator import BenefitsCalculator
 from tax_calculator import TaxCalculator
 
@@ -227,6 +246,391 @@ class TestJobComparisonTool(unittest.TestCase):
         # Instead of returning job_offers, store them as an instance variable
         self.parsed_job_offers = job_offers
 
+    def test_column_wise_conversion(self):
+        """Column-wise DataFrame conversion should map messy cells to the expected offers"""
+        df = pd.DataFrame({
+            'title': ['Engineer', 'Analyst', 'Designer', 'Manager'],
+            'company': ['A', 'B', 'C', 'D'],
+            'location': ['Austin, TX', 'Remote', 'New York City, NY', 'Denver, CO'],
+            'work_location_type': ['On-Site', ' remote ', 'HYBRID', 'unknown'],
+            'employment_type': ['W2', '1099', 's-corp', None],
+            'compensation_type': ['Salary', 'hour', 'Annual', 'Hourly'],
+            'base_compensation': [120000, 60, '95000', 45.5],
+            'hours_per_week': [40, '35', None, 'n/a'],
+            'bonus_guaranteed': [True, 'yes', None, 0],
+            'commute_time_minutes': [30, None, 12.7, '15'],
+            'commute_drive_type': ['City', None, 'combined', 'offroad'],
+            'commute_calc_type': [None, None, 'Distance-Based', 'manual'],
+            'commute_distance_miles': [12, None, 8.5, 0],
+            'paid_holidays': [10, None, 'x', 8],
+            'other_benefits_description': ['Gym', None, 'Learning budget', 3],
+        })
+
+        def expected_offer(**fields):
+            # Missing fuel cost and mileage columns get the template's values
+            commute_defaults = {'commute_fuel_cost': 3.5, 'commute_city_mpg': 25.0,
+                                'commute_highway_mpg': 32.0, 'commute_combined_mpg': 28.0}
+            return JobOffer(**{**commute_defaults, **fields})
+
+        expected = [
+            expected_offer(title='Engineer', company='A', location='Austin, TX',
+                           work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                           compensation_type=CompensationType.SALARY, base_compensation=120000.0,
+                           bonus_guaranteed=True, commute_time_minutes=30, commute_distance_miles=12.0,
+                           commute_drive_type=DriveType.CITY,
+                           commute_calc_type=CommuteCalculationType.DISTANCE_BASED,
+                           benefits=Benefits(paid_holidays=10, other_benefits_description='Gym')),
+            expected_offer(title='Analyst', company='B', location='Remote',
+                           work_location_type=WorkLocationType.REMOTE,
+                           employment_type=EmploymentType.CONTRACTOR_1099,
+                           compensation_type=CompensationType.HOURLY, base_compensation=60.0,
+                           hours_per_week=35.0, expected_hours_per_week=35.0, bonus_guaranteed=True),
+            expected_offer(title='Designer', company='C', location='New York City, NY',
+                           work_location_type=WorkLocationType.HYBRID, employment_type=EmploymentType.S_CORP,
+                           compensation_type=CompensationType.SALARY, base_compensation=95000.0,
+                           commute_time_minutes=12, commute_distance_miles=8.5, commute_drive_type=DriveType.MIXED,
+                           commute_calc_type=CommuteCalculationType.DISTANCE_BASED,
+                           benefits=Benefits(other_benefits_description='Learning budget')),
+            expected_offer(title='Manager', company='D', location='Denver, CO',
+                           work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                           compensation_type=CompensationType.HOURLY, base_compensation=45.5,
+                           commute_time_minutes=15, commute_drive_type=DriveType.MIXED,
+                           commute_calc_type=CommuteCalculationType.DIRECT,
+                           benefits=Benefits(paid_holidays=8, other_benefits_description='3')),
+        ]
+
+        column_wise = self.parser._dataframe_to_job_offers(df)
+        self.assertEqual([vars(offer) for offer in column_wise], [vars(offer) for offer in expected])
+
+        self.assertEqual(column_wise[1].work_location_type, WorkLocationType.REMOTE)
+        self.assertEqual(column_wise[3].employment_type, EmploymentType.W2)
+        self.assertEqual(column_wise[0].commute_drive_type, DriveType.CITY)
+        self.assertIsNone(column_wise[1].commute_drive_type)
+        self.assertEqual(column_wise[0].commute_calc_type, CommuteCalculationType.DISTANCE_BASED)
+        self.assertEqual(column_wise[1].commute_calc_type, CommuteCalculationType.DIRECT)
+        self.assertEqual(column_wise[2].hours_per_week, 40.0)
+        self.assertTrue(column_wise[1].bonus_guaranteed)
+        self.assertEqual(column_wise[2].commute_time_minutes, 12)
+        self.assertEqual(column_wise[2].benefits.paid_holidays, 0)
+
+    def test_iter_file_streams_batches(self):
+        """Chunked parsing should yield the same offers as parsing the whole file"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            template_path = os.path.join(tmp_dir, 'template.csv')
+            self.parser.create_template_file(template_path)
+            template = pd.read_csv(template_path)
+            csv_path = os.path.join(tmp_dir, 'offers.csv')
+            pd.concat([template] * 5, ignore_index=True).to_csv(csv_path, index=False)
+
+            batches = list(self.parser.iter_file(csv_path, chunksize=3))
+            whole = self.parser.parse_file(csv_path)
+
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+        streamed = [offer for batch in batches for offer in batch]
+        for streamed_offer, offer in zip(streamed, whole):
+            self.assertEqual(vars(streamed_offer), vars(offer))
+
+        # Scoring batches should match scoring the same offers held in the engine
+        self.comparison_engine.add_offers(whole)
+        expected = self.comparison_engine.compare_offers()
+        scored = [result for batch in self.comparison_engine.compare_offer_batches(batches)
+                  for result in batch]
+        self.assertEqual([r["compensation"] for r in scored], [r["compensation"] for r in expected])
+
+        with self.assertRaises(ValueError):
+            next(self.parser.iter_file(csv_path, chunksize=0))
+
+    def test_parse_files_in_parallel(self):
+        """Parsing a directory should merge offers in file order and report failures"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            template_path = os.path.join(tmp_dir, 'template.csv')
+            self.parser.create_template_file(template_path)
+            template = pd.read_csv(template_path)
+            os.remove(template_path)
+
+            for name, company in [('b_offers.csv', 'Beta'), ('a_offers.csv', 'Alpha')]:
+                template.assign(company=company).to_csv(os.path.join(tmp_dir, name), index=False)
+            template.drop(columns=['title']).to_csv(os.path.join(tmp_dir, 'c_broken.csv'), index=False)
+            with open(os.path.join(tmp_dir, 'notes.txt'), 'w') as f:
+                f.write('not a spreadsheet')
+
+            paths = self.parser.expand_paths([tmp_dir])
+            self.assertEqual([os.path.basename(path) for path in paths],
+                             ['a_offers.csv', 'b_offers.csv', 'c_broken.csv'])
+
+            offers, failures = self.parser.parse_files(paths, max_workers=2)
+
+        self.assertEqual([offer.company for offer in offers], ['Alpha', 'Alpha', 'Beta', 'Beta'])
+        self.assertEqual(list(failures), [paths[2]])
+        self.assertIn('Missing required columns', failures[paths[2]])
+
+        # Workers parse with the same CSV engine as the calling parser
+        engines = []
+        with mock.patch.object(spreadsheet_parser, 'ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch.object(SpreadsheetParser, 'parse_file', autospec=True,
+                                  side_effect=lambda parser, path: engines.append(parser.csv_engine) or []):
+            SpreadsheetParser(csv_engine='python').parse_files(['a.csv', 'b.csv'], max_workers=2)
+        self.assertEqual(engines, ['python', 'python'])
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_parquet_and_feather_round_trip(self):
+        """Columnar files should parse like CSV and only decode the used columns"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'offers.csv')
+            self.parser.create_template_file(csv_path)
+            pd.read_csv(csv_path).assign(notes='ignored').to_csv(csv_path, index=False)
+            expected = [vars(offer) for offer in self.parser.parse_file(csv_path)]
+
+            for name in ['offers.parquet', 'offers.feather']:
+                path = os.path.join(tmp_dir, name)
+                self.parser.convert_file(csv_path, path)
+
+                self.assertNotIn('notes', self.parser._read_dataframe(path).columns)
+                self.assertEqual([vars(offer) for offer in self.parser.parse_file(path)], expected)
+                streamed = [offer for batch in self.parser.iter_file(path, chunksize=1) for offer in batch]
+                self.assertEqual([vars(offer) for offer in streamed], expected)
+
+                template_path = os.path.join(tmp_dir, 'template_' + name)
+                self.parser.create_template_file(template_path)
+                self.assertEqual(len(self.parser.parse_file(template_path)), 2)
+
+    def test_iter_excel_streams_multiple_sheets(self):
+        """Read-only Excel streaming should map each sheet's header and batch rows"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'template.csv')
+            self.parser.create_template_file(csv_path)
+            template = pd.read_csv(csv_path)
+
+            xlsx_path = os.path.join(tmp_dir, 'offers.xlsx')
+            with pd.ExcelWriter(xlsx_path) as writer:
+                template.to_excel(writer, sheet_name='Offers', index=False)
+                # Second sheet has its columns in a different order and a blank row
+                reordered = template[list(reversed(template.columns))].assign(company='Second Sheet')
+                blank = pd.DataFrame([[None] * len(reordered.columns)], columns=reordered.columns)
+                pd.concat([reordered.iloc[:1], blank, reordered.iloc[1:]]).to_excel(
+                    writer, sheet_name='More Offers', index=False)
+
+            expected = [vars(offer) for offer in self.parser._dataframe_to_job_offers(template)]
+            self.assertEqual([vars(offer) for offer in self.parser.parse_file(xlsx_path)], expected)
+
+            batches = list(self.parser.iter_excel(xlsx_path, chunksize=1, sheets=['Offers', 'More Offers']))
+            self.assertEqual([len(batch) for batch in batches], [1, 1, 1, 1])
+            self.assertEqual([batch[0].company for batch in batches],
+                             ['Example Corp', 'Contractor LLC', 'Second Sheet', 'Second Sheet'])
+            self.assertEqual(vars(batches[3][0].benefits), vars(batches[1][0].benefits))
+
+            with self.assertRaises(KeyError):
+                list(self.parser.iter_excel(xlsx_path, sheets=['Missing']))
+
+    def test_parse_appended(self):
+        """Only appended CSV rows should be parsed, with a full re-parse after a rewrite"""
+        header = 'title,company,location,work_location_type,employment_type,compensation_type,base_compensation\n'
+
+        def row(i):
+            return f'Engineer {i},Company {i},Austin,Remote,W2,Salary,{100000 + i}\n'
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'feed.csv')
+            engine = ComparisonEngine(data_file=os.path.join(tmp_dir, 'offers.pkl'))
+            with open(csv_path, 'w', newline='') as f:
+                f.write(header + row(0) + row(1))
+
+            self.assertEqual(self.parser.ingest_appended(csv_path, engine), 2)
+            self.assertEqual(self.parser.ingest_appended(csv_path, engine), 0)
+
+            # A partially written row waits until its newline arrives
+            with open(csv_path, 'a', newline='') as f:
+                f.write(row(2) + row(3)[:10])
+            offers, full_parse = self.parser.parse_appended(csv_path)
+            self.assertFalse(full_parse)
+            self.assertEqual([o.title for o in offers], ['Engineer 2'])
+            engine.add_offers(offers)
+            with open(csv_path, 'a', newline='') as f:
+                f.write(row(3)[10:])
+            self.assertEqual(self.parser.ingest_appended(csv_path, engine), 1)
+            self.assertEqual([o.base_compensation for o in engine.job_offers],
+                             [100000, 100001, 100002, 100003])
+
+            # A quoted field with a newline does not split its record
+            quoted_row = 'Engineer 4,"Company\n""4""",Austin,Remote,W2,Salary,100004\n'
+            with open(csv_path, 'a', newline='') as f:
+                f.write(quoted_row[:20])
+            self.assertEqual(self.parser.parse_appended(csv_path), ([], False))
+            with open(csv_path, 'a', newline='') as f:
+                f.write(quoted_row[20:])
+            offers, full_parse = self.parser.parse_appended(csv_path)
+            self.assertFalse(full_parse)
+            self.assertEqual([(o.company, o.base_compensation) for o in offers], [('Company\n"4"', 100004)])
+
+            # Rewritten (same length) and truncated files are parsed from the start
+            with open(csv_path, 'w', newline='') as f:
+                f.write(header + row(5) + row(6) + row(7) + row(8))
+            offers, full_parse = self.parser.parse_appended(csv_path)
+            self.assertTrue(full_parse)
+            self.assertEqual(len(offers), 4)
+
+            with open(csv_path, 'w', newline='') as f:
+                f.write(header + row(9))
+            manual_offer = JobOffer(title='Manual', company='Other', location='Denver, CO',
+                                    work_location_type=WorkLocationType.HYBRID,
+                                    employment_type=EmploymentType.W2,
+                                    compensation_type=CompensationType.SALARY,
+                                    base_compensation=90000)
+            engine = ComparisonEngine(data_file=os.path.join(tmp_dir, 'offers.pkl'))
+            engine.add_offer(manual_offer)
+            parser = SpreadsheetParser()
+            parser.ingest_appended(csv_path, engine)
+            with open(csv_path, 'w', newline='') as f:
+                f.write(header)
+            self.assertEqual(parser.ingest_appended(csv_path, engine), 0)
+            self.assertEqual(engine.job_offers, [manual_offer])
+
+    def test_parse_cache(self):
+        """Cached offers should be reused until the file content changes"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'offers.csv')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            self.parser.create_template_file(csv_path)
+            parser = SpreadsheetParser(cache_dir=cache_dir)
+            parsed = parser.parse_file(csv_path)
+
+            def fail(filepath):
+                raise AssertionError("file should have been loaded from the cache")
+
+            cached_parser = SpreadsheetParser(cache_dir=cache_dir)
+            cached_parser._parse_file_uncached = fail
+            self.assertEqual([vars(o) for o in cached_parser.parse_file(csv_path)],
+                             [vars(o) for o in parsed])
+
+            # Touching the file without changing it keeps the entry valid
+            stat = os.stat(csv_path)
+            os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertEqual(len(cached_parser.parse_file(csv_path)), 2)
+
+            # Changing the content invalidates it
+            pd.read_csv(csv_path).assign(company='Changed').to_csv(csv_path, index=False)
+            self.assertEqual({o.company for o in parser.parse_file(csv_path)}, {'Changed'})
+
+            # Explicit invalidation forces a re-parse
+            parser.invalidate_cache(csv_path)
+            self.assertIsNone(parser.cache.get(csv_path))
+
+            # A tiny cap evicts entries
+            small_parser = SpreadsheetParser(cache_dir=cache_dir, cache_max_bytes=1)
+            small_parser.parse_file(csv_path)
+            self.assertEqual(os.listdir(cache_dir), [])
+
+            # A file edited to the same size while it was parsed is not cached
+            stat = os.stat(csv_path)
+            parsed = parser._parse_file_uncached(csv_path)
+            with open(csv_path, 'r+b') as f:
+                f.write(b'X')
+            os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            parser.cache.put(csv_path, parsed, stat)
+            self.assertEqual(os.listdir(cache_dir), [])
+            self.assertIsNone(parser.cache.get(csv_path))
+
+    def test_stdlib_csv_engine(self):
+        """The stdlib CSV reader should match the pandas reader and work without pandas"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'offers.csv')
+            pd.DataFrame({
+                'title': ['Engineer', 'Analyst', 'Designer'],
+                'company': ['A', 'B', 'C'],
+                'location': ['Austin, TX', 'Remote', 'Denver, CO'],
+                'work_location_type': ['On-Site', ' remote ', None],
+                'employment_type': ['W2', 's-corp', 'other'],
+                'compensation_type': ['Salary', 'hour', 'Annual'],
+                'base_compensation': [120000, 60.5, 95000],
+                'hours_per_week': [40, None, 37.5],
+                'bonus_guaranteed': ['yes', 'no', None],
+                'commute_include_maintenance': [True, False, None],
+                'commute_time_minutes': [30, None, 12.7],
+                'commute_drive_type': ['City', None, 'combined'],
+                'commute_calc_type': [None, None, 'manual'],
+                'commute_distance_miles': [12, None, 8.5],
+                'paid_holidays': [10, None, 8],
+                'other_benefits_description': ['Gym', None, 'Learning budget'],
+            }).to_csv(csv_path, index=False)
+
+            python_offers = SpreadsheetParser(csv_engine='python').parse_file(csv_path)
+            pandas_offers = SpreadsheetParser(csv_engine='pandas').parse_file(csv_path)
+            self.assertEqual([vars(o) for o in python_offers], [vars(o) for o in pandas_offers])
+            streamed = list(SpreadsheetParser(csv_engine='python').iter_file(csv_path, chunksize=2))
+            self.assertEqual([len(batch) for batch in streamed], [2, 1])
+
+            # Without pandas, CSV still works but other formats explain what is missing
+            with mock.patch.object(spreadsheet_parser, 'pd', None), \
+                    mock.patch.object(spreadsheet_parser, '_import_pandas', return_value=False):
+                parser = SpreadsheetParser()
+                self.assertEqual([vars(o) for o in parser.parse_file(csv_path)],
+                                 [vars(o) for o in pandas_offers])
+                with self.assertRaises(ImportError):
+                    parser.parse_file(os.path.join(tmp_dir, 'offers.xlsx'))
+                with self.assertRaises(ImportError):
+                    SpreadsheetParser(csv_engine='pandas')
+
+            # Mixed-type columns follow pandas' per-column inference on every engine
+            mixed_path = os.path.join(tmp_dir, 'mixed.csv')
+            with open(mixed_path, 'w', newline='') as f:
+                f.write('title,company,location,work_location_type,employment_type,compensation_type,'
+                        'base_compensation,commute_time_minutes,bonus_guaranteed,paid_holidays\n'
+                        '123,A,Remote,Remote,W2,Salary,90000,3.5,2,7\n'
+                        ',B,Remote,Remote,W2,Salary,80000,abc,yes,\n')
+            mixed = {engine: [vars(o) for o in SpreadsheetParser(csv_engine=engine).parse_file(mixed_path)]
+                     for engine in ['python', 'mmap', 'pandas']}
+            with mock.patch.object(spreadsheet_parser, 'pd', None), \
+                    mock.patch.object(spreadsheet_parser, '_import_pandas', return_value=False):
+                mixed['auto'] = [vars(o) for o in SpreadsheetParser().parse_file(mixed_path)]
+            for engine, offers in mixed.items():
+                self.assertEqual(offers, mixed['pandas'], engine)
+            offers = SpreadsheetParser(csv_engine='python').parse_file(mixed_path)
+            self.assertEqual(offers[0].title, '123.0')
+            self.assertEqual([o.commute_time_minutes for o in offers], [0, 0])
+            self.assertEqual([o.bonus_guaranteed for o in offers], [False, True])
+            self.assertEqual([o.benefits.paid_holidays for o in offers], [7, 0])
+
+            # Each engine keeps its own cache entry
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            for engine in ['python', 'pandas']:
+                SpreadsheetParser(cache_dir=cache_dir, csv_engine=engine).parse_file(mixed_path)
+            self.assertEqual(len([name for name in os.listdir(cache_dir) if name.endswith(CACHE_EXTENSION)]), 2)
+
+    def test_mmap_csv_engine(self):
+        """The memory-mapped CSV reader should match the stdlib and pandas readers"""
+        header = ('title,company,location,work_location_type,employment_type,compensation_type,'
+                  'base_compensation,hours_per_week,commute_time_minutes,bonus_guaranteed,paid_holidays')
+        rows = [
+            'Engineer,A,"Austin, TX",Remote,W2,Salary,120000,40,30,True,10',
+            'Analyst,"B ""Quoted"" Inc",Remote,hybrid,1099,Hourly,60.5,,12.7,no,NA',
+            '',
+            'Designer,C,Denver,Onsite,W2,Salary,-1.5e3,abc,9007199254740993,1,',
+            'Writer,D,"Line\nBreak",Remote,W2,Salary,0.1,37.50,007,False,3',
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'offers.csv')
+            for line_ending in ['\n', '\r\n']:
+                for extra_rows in [[], ['Stray,E,Rem"ote,Remote,W2,Salary,1,2,3,4,5']]:
+                    with open(csv_path, 'w', newline='') as f:
+                        f.write(line_ending.join([header] + rows + extra_rows))
+                    offers = {engine: SpreadsheetParser(csv_engine=engine).parse_file(csv_path)
+                              for engine in ['python', 'mmap', 'pandas']}
+                    for chunksize in [1, 2, 100]:
+                        offers.update({
+                            (engine, chunksize): [offer for batch in SpreadsheetParser(csv_engine=engine).iter_file(
+                                csv_path, chunksize=chunksize) for offer in batch]
+                            for engine in ['python', 'mmap', 'pandas']
+                        })
+                    # Column types are inferred per chunk, so only the same chunks give the same offers
+                    for key, engine_offers in offers.items():
+                        expected = offers['python'] if isinstance(key, str) else offers['python', key[1]]
+                        self.assertEqual([vars(o) for o in engine_offers], [vars(o) for o in expected], key)
+            python_offers = offers['python']
+            self.assertEqual(python_offers[1].company, 'B "Quoted" Inc')
+            # A float column is truncated, while the integer alone in its chunk is exact
+            self.assertEqual(python_offers[2].commute_time_minutes, 9007199254740992)
+            self.assertEqual(offers['python', 1][2].commute_time_minutes, 9007199254740993)
+
     def test_commute_calculator(self):
         """Test the commute calculator functionality"""
         # Test various commute calculations
@@ -347,6 +751,802 @@ class TestJobComparisonTool(unittest.TestCase):
         for key, company in recommendations.items():
             print(f"  {key.replace('_', ' ').title()}: {company}")
 
+    def test_vectorized_compare_matches_per_offer(self):
+        """compare_batch should give exactly the same numbers as compare_offers"""
+        offers = []
+        for i, (location, work_location_type, employment_type, compensation_type, base) in enumerate([
+                ('New York City, NY', WorkLocationType.ONSITE, EmploymentType.W2, CompensationType.SALARY, 250000),
+                ('Austin, TX', WorkLocationType.REMOTE, EmploymentType.CONTRACTOR_1099,
+                 CompensationType.HOURLY, 85.5),
+                ('San Francisco, California', WorkLocationType.HYBRID, EmploymentType.S_CORP,
+                 CompensationType.SALARY, 640000),
+                ('Remote', WorkLocationType.ONSITE, EmploymentType.W2, CompensationType.HOURLY, 0),
+                ('Philadelphia, PA', WorkLocationType.HYBRID, EmploymentType.W2, CompensationType.SALARY, 95375)]):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location=location,
+                work_location_type=work_location_type, employment_type=employment_type,
+                compensation_type=compensation_type, base_compensation=base,
+                bonus_amount=5000 * i, bonus_guaranteed=i % 2 == 0, signing_bonus=1000 * i,
+                benefits=Benefits(retirement_match_percent=0.04, retirement_match_limit=6000 * (i % 2),
+                                  health_insurance_monthly_premium=100 * i,
+                                  health_insurance_coverage_percent=0.8, life_insurance_coverage=50000,
+                                  paid_time_off_days=15, paid_parental_leave_weeks=i),
+                cost_of_living_index=90 + 10 * i, commute_time_minutes=20 * i, commute_days_per_week=i % 6,
+                commute_calc_type=CommuteCalculationType.DISTANCE_BASED if i % 2 else CommuteCalculationType.DIRECT,
+                commute_cost_monthly=120.5,
+                commute_details=CommuteDetails(distance_miles=12.5 * i, drive_type=list(DriveType)[i % 3],
+                                               city_mpg=0, include_maintenance=i != 3),
+                expected_hours_per_week=0 if i == 3 else 45, expected_tenure_years=i - 1))
+        
+        self.comparison_engine.add_offers(offers)
+        expected = self.comparison_engine.compare_offers()
+        batch = OfferBatch(offers)
+        self.assertEqual(batch.to_results(self.comparison_engine.compare_batch(batch)), expected)
+        self.assertEqual(len(self.comparison_engine.compare_batch()["effective_tax_rate"]), len(offers))
+        
+        # Division by zero is reported like the per-offer path
+        offers[0].cost_of_living_index = 0
+        self.comparison_engine.update_offer(0, offers[0])
+        with self.assertRaises(ZeroDivisionError):
+            self.comparison_engine.compare_offers()
+        with self.assertRaises(ZeroDivisionError):
+            self.comparison_engine.compare_batch()
+    
+    def test_top_k_rankings(self):
+        """Top-k rankings should be the prefix of the full rankings, ties included"""
+        offers = []
+        for i in range(40):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 10000 * (i % 7),
+                benefits=Benefits(paid_time_off_days=10 + i % 3),
+                cost_of_living_index=90 + 10 * (i % 4)))
+        self.comparison_engine.add_offers(offers)
+        results = self.comparison_engine.compare_offers()
+        full = self.comparison_engine.get_rankings(results)
+        batch = OfferBatch(offers)
+        columns = self.comparison_engine.compare_batch(batch)
+        
+        self.assertEqual(self.comparison_engine.get_batch_rankings(batch, columns), full)
+        for top_k in (0, 1, 5, 13, 40, 100):
+            expected = {
+                criterion: dict(ranking_data, ranking=ranking_data["ranking"][:top_k])
+                for criterion, ranking_data in full.items()
+            }
+            self.assertEqual(self.comparison_engine.get_rankings(results, top_k=top_k), expected)
+            self.assertEqual(self.comparison_engine.get_batch_rankings(batch, columns, top_k=top_k), expected)
+    
+    def test_compare_offers_memoized(self):
+        """compare_offers should only recompute offers that changed"""
+        def make_offer(i):
+            return JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 10000 * i)
+        
+        def compare_counting_calls():
+            with mock.patch.object(self.comparison_engine, 'compare_offer',
+                                   wraps=self.comparison_engine.compare_offer) as compare_offer:
+                results = self.comparison_engine.compare_offers()
+            fresh = ComparisonEngine()
+            fresh.tax_calculator = self.comparison_engine.tax_calculator
+            fresh.add_offers(self.comparison_engine.get_offers())
+            self.assertEqual(results, fresh.compare_offers())
+            return compare_offer.call_count
+        
+        self.comparison_engine.add_offers(make_offer(i) for i in range(5))
+        self.assertEqual(compare_counting_calls(), 5)
+        self.assertEqual(compare_counting_calls(), 0)
+        
+        self.comparison_engine.update_offer(2, make_offer(20))
+        self.assertEqual(compare_counting_calls(), 1)
+        
+        # An offer modified in place is refreshed by passing it to update_offer
+        self.comparison_engine.get_offer(3).base_compensation = 500000
+        self.comparison_engine.update_offer(3, self.comparison_engine.get_offer(3))
+        self.assertEqual(compare_counting_calls(), 1)
+        
+        self.comparison_engine.remove_offer(0)
+        self.assertEqual(compare_counting_calls(), 0)
+        self.comparison_engine.add_offer(make_offer(30))
+        self.assertEqual(compare_counting_calls(), 1)
+        
+        # Changing the calculator configuration invalidates every result
+        self.comparison_engine.tax_calculator.social_security_rate = 0.07
+        self.assertEqual(compare_counting_calls(), 5)
+        
+        # Rankings and recommendations leave the shared results unmodified
+        results = self.comparison_engine.compare_offers()
+        snapshot = [dict(result) for result in results]
+        self.comparison_engine.get_rankings(results)
+        self.comparison_engine.get_rankings(iter(results), top_k=2)
+        self.comparison_engine.get_recommendations(results)
+        self.assertEqual([dict(result) for result in results], snapshot)
+
+    def test_indexed_rankings(self):
+        """Indexed rankings should match get_rankings after every kind of change"""
+        def make_offer(i):
+            return JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 10000 * (i % 5),
+                cost_of_living_index=90 + 10 * (i % 3))
+        
+        def check_rankings():
+            expected = self.comparison_engine.get_rankings(self.comparison_engine.compare_offers())
+            self.assertEqual(self.comparison_engine.get_indexed_rankings(), expected)
+            self.assertEqual(self.comparison_engine.get_indexed_rankings(top_k=3),
+                             self.comparison_engine.get_rankings(self.comparison_engine.compare_offers(), top_k=3))
+            for criterion, ranking_data in expected.items():
+                for index, offer in enumerate(self.comparison_engine.get_offers()):
+                    entry = ranking_data["ranking"][self.comparison_engine.get_offer_rank(index, criterion) - 1]
+                    self.assertEqual(entry["company"], offer.company)
+        
+        self.assertEqual(self.comparison_engine.get_indexed_rankings(), {})
+        self.comparison_engine.add_offers(make_offer(i) for i in range(12))
+        check_rankings()
+        
+        # Changes are applied to the indexes without comparing every offer again
+        with mock.patch.object(self.comparison_engine, 'compare_offer',
+                               wraps=self.comparison_engine.compare_offer) as compare_offer:
+            self.comparison_engine.update_offer(4, make_offer(20))
+            self.comparison_engine.add_offer(make_offer(21))
+            self.comparison_engine.remove_offer(0)
+            self.comparison_engine.get_indexed_rankings(top_k=5)
+            self.assertEqual(compare_offer.call_count, 2)
+        check_rankings()
+        
+        self.comparison_engine.remove_offers(self.comparison_engine.get_offers()[2:5])
+        check_rankings()
+        self.comparison_engine.tax_calculator.social_security_rate = 0.07
+        check_rankings()
+        
+        self.assertIsNone(self.comparison_engine.get_offer_rank(100, "take_home_pay"))
+        with self.assertRaises(ValueError):
+            self.comparison_engine.get_offer_rank(0, "salary")
+
+    def test_compare_offers_in_worker_processes(self):
+        """compare_offers(workers=...) should return the serial results in input order"""
+        offers = [
+            JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location=['Austin, TX', 'New York City, NY'][i % 2],
+                work_location_type=list(WorkLocationType)[i % 3], employment_type=list(EmploymentType)[i % 3],
+                compensation_type=list(CompensationType)[i % 2], base_compensation=[90000 + 1000 * i, 60 + i][i % 2],
+                benefits=Benefits(paid_time_off_days=i % 20, retirement_match_percent=0.04,
+                                  retirement_match_limit=5000),
+                commute_calc_type=list(CommuteCalculationType)[i % 2],
+                commute_details=CommuteDetails(distance_miles=i % 30))
+            for i in range(30)
+        ]
+        serial_engine = ComparisonEngine()
+        serial_engine.add_offers(offers)
+        expected = serial_engine.compare_offers()
+        
+        self.comparison_engine.add_offers(offers)
+        with mock.patch.object(comparison_engine, 'MIN_OFFERS_PER_CHUNK', 4):
+            results = self.comparison_engine.compare_offers(workers=2)
+            self.assertEqual(results, expected)
+            self.assertTrue(all(result["offer"] is offer for result, offer in zip(results, offers)))
+            
+            # Results are memoized like serial ones
+            self.assertEqual([id(result) for result in self.comparison_engine.compare_offers()],
+                             [id(result) for result in results])
+            
+            # Errors in a worker are raised in the caller
+            offers[5].cost_of_living_index = 0
+            self.comparison_engine.clear_results_cache()
+            with self.assertRaises(ZeroDivisionError):
+                self.comparison_engine.compare_offers(workers=2)
+
+    def test_compare_offers_iter(self):
+        """compare_offers_iter should stream the compare_offers results lazily"""
+        offers = [
+            JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 10000 * (i % 4),
+                cost_of_living_index=90 + 10 * (i % 3))
+            for i in range(15)
+        ]
+        self.comparison_engine.add_offers(offers)
+        expected = ComparisonEngine()
+        expected.add_offers(offers)
+        expected = expected.compare_offers()
+        
+        self.assertEqual(list(self.comparison_engine.compare_offers_iter()), expected)
+        
+        # Offers from any iterable are compared one at a time, as they are consumed
+        with mock.patch.object(self.comparison_engine, 'compare_offer',
+                               wraps=self.comparison_engine.compare_offer) as compare_offer:
+            stream = self.comparison_engine.compare_offers_iter(offer for offer in offers)
+            self.assertEqual(next(stream), expected[0])
+            self.assertEqual(compare_offer.call_count, 1)
+            self.assertEqual(list(stream), expected[1:])
+        
+        # Streamed top-k rankings match the rankings of the full list
+        for top_k in (0, 1, 4, 20):
+            self.assertEqual(
+                self.comparison_engine.get_rankings(self.comparison_engine.compare_offers_iter(), top_k=top_k),
+                self.comparison_engine.get_rankings(expected, top_k=top_k))
+        self.assertEqual(self.comparison_engine.get_rankings(iter([]), top_k=3), {})
+
+    def test_result_records(self):
+        """Comparison results should be compact records that read like the original dictionaries"""
+        offer = JobOffer(
+            title='Engineer', company='Acme', location='Austin, TX',
+            work_location_type=WorkLocationType.HYBRID, employment_type=EmploymentType.W2,
+            compensation_type=CompensationType.SALARY, base_compensation=120000,
+            benefits=Benefits(retirement_match_percent=0.05, retirement_match_limit=8000, paid_time_off_days=20))
+        result = self.comparison_engine.compare_offer(offer)
+        benefits_value = result["benefits_value"]
+        compensation = result["compensation"]
+        self.assertIsInstance(benefits_value, BenefitsBreakdown)
+        self.assertIsInstance(compensation, CompensationResult)
+        self.assertFalse(hasattr(compensation, '__dict__'))
+        
+        # The dictionary views hold exactly what the calculators return
+        expected_benefits = self.comparison_engine.calculate_total_benefits_value(offer)
+        expected_compensation = offer.calculate_total_compensation(
+            result["effective_tax_rate"], self.comparison_engine.commute_calculator)
+        expected_compensation["total_annual_value"] = (expected_compensation["annual_gross_income"]
+                                                       + expected_benefits["total"])
+        self.assertEqual(benefits_value.to_dict(), expected_benefits)
+        self.assertEqual(list(compensation.to_dict().items()), list(expected_compensation.items()))
+        self.assertEqual(compensation, expected_compensation)
+        
+        self.assertEqual(compensation["take_home_pay"], compensation.take_home_pay)
+        self.assertEqual(compensation.get("self_employment_tax", 0), 0)
+        self.assertNotIn("self_employment_tax", compensation)
+        self.assertNotIn("to_dict", compensation)
+        with self.assertRaises(KeyError):
+            compensation["as_tuple"]
+    
+    def test_pareto_frontier(self):
+        """The Pareto frontier should hold exactly the offers no other offer dominates"""
+        def frontier_by_brute_force(points):
+            return [i for i, point in enumerate(points)
+                    if not any(all(o >= p for o, p in zip(other, point)) and other != point for other in points)]
+        
+        offers = []
+        for i in range(60):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.ONSITE, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 10000 * (i % 7),
+                benefits=Benefits(paid_time_off_days=10 + i % 3, retirement_match_percent=0.01 * (i % 5)),
+                cost_of_living_index=90 + 10 * (i % 4),
+                commute_details=CommuteDetails(distance_miles=5 + 4 * (i % 6), combined_mpg=20 + 3 * (i % 5))))
+        self.comparison_engine.add_offers(offers)
+        results = self.comparison_engine.compare_offers()
+        batch = OfferBatch(offers)
+        columns = self.comparison_engine.compare_batch(batch)
+        
+        for metrics in (['take_home_pay'], ['take_home_pay', 'weekly_commute_hours'],
+                        ['benefits_value', 'annual_commute_cost', 'cost_of_living_adjusted'],
+                        list(comparison_engine.OFFER_METRICS)):
+            points = [[getter(result) if maximize else -getter(result)
+                       for _, maximize, getter, _ in map(comparison_engine.OFFER_METRICS.get, metrics)]
+                      for result in results]
+            expected = frontier_by_brute_force(points)
+            self.assertEqual(self.comparison_engine.get_pareto_frontier(metrics),
+                             [results[i] for i in expected])
+            self.assertEqual(self.comparison_engine.get_batch_pareto_frontier(batch, columns, metrics).tolist(),
+                             expected)
+        
+        with self.assertRaises(ValueError):
+            self.comparison_engine.get_pareto_frontier(['salary'])
+        with self.assertRaises(ValueError):
+            self.comparison_engine.get_pareto_frontier([])
+        self.assertEqual(self.comparison_engine.get_pareto_frontier(['take_home_pay'], results=[]), [])
+        
+        # Random points with many duplicates, small blocks to cover the block-based algorithm
+        import pareto
+        rng = np.random.default_rng(0)
+        with mock.patch.object(pareto, 'PARETO_BLOCK_SIZE', 7), mock.patch.object(pareto, 'PARETO_FRONTIER_CHUNK', 5):
+            for dimensions in range(1, 7):
+                for _ in range(20):
+                    points = rng.integers(0, 6, size=(int(rng.integers(0, 80)), dimensions)).astype(float)
+                    self.assertEqual(pareto.pareto_frontier(points).tolist(),
+                                     frontier_by_brute_force(points.tolist()))
+    
+    def test_weighted_scores(self):
+        """Weighted scores should be the weighted sums of the normalized metrics"""
+        offers = []
+        for i in range(40):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=[WorkLocationType.ONSITE, WorkLocationType.HYBRID, WorkLocationType.REMOTE][i % 3],
+                employment_type=EmploymentType.W2, compensation_type=CompensationType.SALARY,
+                base_compensation=80000 + 10000 * (i % 7), commute_time_minutes=10 * (i % 5),
+                benefits=Benefits(paid_time_off_days=10 + i % 4, paid_holidays=8 + i % 3)))
+        self.comparison_engine.add_offers(offers)
+        results = self.comparison_engine.compare_offers()
+        batch = OfferBatch(offers)
+        columns = self.comparison_engine.compare_batch(batch)
+        weights = {"take_home_pay": 3, "weekly_commute_hours": 1.5, "paid_days_off": 0.5}
+        
+        def normalized(metric):
+            _, higher_is_better, getter, _ = comparison_engine.OFFER_METRICS[metric]
+            values = [getter(result) if higher_is_better else -getter(result) for result in results]
+            return [(value - min(values)) / (max(values) - min(values)) for value in values]
+        
+        expected = [sum(terms) for terms in zip(*(
+            [weight * value for value in normalized(metric)] for metric, weight in weights.items()))]
+        scorer = self.comparison_engine.get_scorer(list(weights))
+        scores = scorer.score(weights)
+        for score, expected_score in zip(scores.tolist(), expected):
+            self.assertAlmostEqual(score, expected_score)
+        batch_scorer = self.comparison_engine.get_batch_scorer(batch, columns, list(weights))
+        self.assertEqual(batch_scorer.score(weights).tolist(), scores.tolist())
+        
+        # Contributions add up to the scores; unweighted metrics are left out
+        contributions = scorer.contributions({"take_home_pay": 2, "paid_days_off": 1})
+        self.assertEqual(list(contributions), ["take_home_pay", "paid_days_off"])
+        for i, score in enumerate(scorer.score({"take_home_pay": 2, "paid_days_off": 1}).tolist()):
+            self.assertAlmostEqual(contributions["take_home_pay"][i] + contributions["paid_days_off"][i], score)
+        
+        # score_offers ranks by score with ties in offer order
+        order = sorted(range(len(results)), key=lambda i: -scores[i])
+        ranked = self.comparison_engine.score_offers({"weights": weights}, results, top_k=5)
+        self.assertEqual([entry["company"] for entry in ranked["ranking"]], [offers[i].company for i in order[:5]])
+        for entry in ranked["ranking"]:
+            self.assertAlmostEqual(sum(entry["contributions"].values()), entry["value"])
+        
+        zscores = self.comparison_engine.get_scorer(["take_home_pay"], "zscore").score({"take_home_pay": 1})
+        self.assertAlmostEqual(zscores.mean(), 0)
+        self.assertAlmostEqual(zscores.std(), 1)
+        
+        # The work-life recommendation is the WORK_LIFE_SCORING profile
+        def work_life(result):
+            benefits = result["offer"].benefits
+            days_off = benefits.paid_time_off_days + benefits.paid_holidays + benefits.paid_sick_days
+            return days_off * 8 - result["compensation"]["total_weekly_hours"] * 52
+        best = max(results, key=work_life)
+        self.assertEqual(self.comparison_engine.get_recommendations(results)["best_work_life_balance"],
+                         best["offer"].company)
+        
+        # Profiles from JSON files, and invalid profiles
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"normalization": "zscore", "weights": weights}, f)
+        try:
+            profile = ScoringProfile.load(f.name)
+        finally:
+            os.remove(f.name)
+        self.assertEqual(profile, ScoringProfile(weights=weights, normalization="zscore"))
+        for invalid in ({"weights": {}}, {"weights": {"take_home_pay": "high"}}, {"weight": {"take_home_pay": 1}},
+                        {"weights": {"take_home_pay": 1}, "normalization": "log"}):
+            with self.assertRaises(ValueError):
+                ScoringProfile.from_dict(invalid)
+        with self.assertRaises(ValueError):
+            self.comparison_engine.score_offers({"weights": {"salary": 1}}, results)
+        with self.assertRaises(ValueError):
+            scorer.score({"benefits_value": 1})
+    
+    def test_broadcast_batch(self):
+        """A broadcast batch should compute every metric as if each value were its own offer"""
+        offers = []
+        for i in range(12):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location=['Austin, TX', 'New York City, NY'][i % 2],
+                work_location_type=[WorkLocationType.ONSITE, WorkLocationType.HYBRID, WorkLocationType.REMOTE][i % 3],
+                employment_type=EmploymentType.W2, compensation_type=CompensationType.SALARY,
+                base_compensation=90000 + 15000 * i, bonus_amount=5000 * (i % 3), signing_bonus=10000,
+                commute_time_minutes=30, commute_calc_type=CommuteCalculationType.DISTANCE_BASED,
+                commute_details=CommuteDetails(distance_miles=12),
+                benefits=Benefits(equity_value=20000 * (i % 2))))
+        batch = OfferBatch(offers)
+        days = [1, 3, 5]
+        multipliers = [0.5, 1.0, 2.0]
+        broadcast = batch.broadcast({
+            'commute_days_per_week': [days],
+            'equity_value': batch.equity_value[:, None] * multipliers,
+        }, (3,))
+        columns = self.comparison_engine.compare_batch(broadcast)
+        
+        stated_equity = batch.equity_value.tolist()
+        for j in range(3):
+            for offer, equity in zip(offers, stated_equity):
+                offer.commute_days_per_week = days[j]
+                offer.benefits.equity_value = equity * multipliers[j]
+            expected = self.comparison_engine.compare_batch(OfferBatch(offers))
+            for group in ('benefits_value', 'compensation'):
+                for key, values in expected[group].items():
+                    self.assertEqual(np.broadcast_to(columns[group][key], (12, 3))[:, j].tolist(), values.tolist())
+        
+        self.assertEqual(batch[3:5].offers, offers[3:5])
+        self.assertEqual(batch[3:5].base_compensation.tolist(), batch.base_compensation[3:5].tolist())
+        with self.assertRaises(ValueError):
+            batch.broadcast({'company': [[1, 2, 3]]}, (3,))
+        with self.assertRaises(ValueError):
+            batch.broadcast({'equity_value': [[1, 2]]}, (3,))
+    
+    def test_monte_carlo_simulation(self):
+        """Simulated values should follow the uncertainty model"""
+        offers = []
+        for i in range(30):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=[WorkLocationType.ONSITE, WorkLocationType.HYBRID, WorkLocationType.REMOTE][i % 3],
+                employment_type=EmploymentType.W2, compensation_type=CompensationType.SALARY,
+                base_compensation=90000 + 5000 * i, bonus_amount=8000 * (i % 4), bonus_guaranteed=i % 2 == 0,
+                signing_bonus=15000 * (i % 2), commute_time_minutes=40, commute_cost_monthly=150,
+                benefits=Benefits(equity_value=30000 * (i % 3))))
+        self.comparison_engine.add_offers(offers)
+        columns = self.comparison_engine.compare_batch()
+        
+        # With every distribution fixed at the stated value, only non-guaranteed bonuses change, paid in full
+        fixed = UncertaintyModel(bonus_payout=Distribution("fixed", (1.0,)),
+                                 equity_multiplier=Distribution("fixed", (1.0,)),
+                                 tenure_multiplier=Distribution("fixed", (1.0,)),
+                                 commute_days_change=Distribution("fixed", (0,)))
+        summary = self.comparison_engine.simulate_batch(OfferBatch(offers), draws=50, model=fixed,
+                                                        metrics=["total_annual_value", "annual_commute_cost"])
+        expected = [value + (0 if offer.bonus_guaranteed else offer.bonus_amount)
+                    for value, offer in zip(columns["compensation"]["total_annual_value"].tolist(), offers)]
+        self.assertEqual(summary["total_annual_value"]["mean"].tolist(), expected)
+        self.assertEqual(summary["total_annual_value"]["std"].tolist(), [0.0] * len(offers))
+        self.assertEqual(summary["annual_commute_cost"]["percentiles"][:, 2].tolist(),
+                         columns["compensation"]["annual_commute_cost"].tolist())
+        
+        # The default model spreads the uncertain offers only; results are reproducible with a seed
+        results = self.comparison_engine.simulate_offers(draws=2000, seed=7, metrics=["total_annual_value"])
+        self.assertEqual(results, self.comparison_engine.simulate_offers(draws=2000, seed=7,
+                                                                         metrics=["total_annual_value"]))
+        for offer, result in zip(offers, results):
+            value = result["total_annual_value"]
+            self.assertIs(result["offer"], offer)
+            self.assertEqual(list(value["percentiles"]), [5, 25, 50, 75, 95])
+            self.assertEqual(list(value["percentiles"].values()), sorted(value["percentiles"].values()))
+            uncertain = (not offer.bonus_guaranteed and offer.bonus_amount) or offer.benefits.equity_value \
+                or offer.signing_bonus
+            self.assertEqual(value["std"] > 0, bool(uncertain))
+        
+        change = Distribution("choice", ((-1, 0, 1), (0.25, 0.5, 0.25))).sample(np.random.default_rng(0), (100000,))
+        self.assertEqual(sorted(set(change.tolist())), [-1, 0, 1])
+        self.assertAlmostEqual((change == 0).mean(), 0.5, places=2)
+        with self.assertRaises(ValueError):
+            Distribution("beta", (1, 2))
+        with self.assertRaises(ValueError):
+            Distribution("uniform", (1,))
+        with self.assertRaises(ValueError):
+            self.comparison_engine.simulate_offers(draws=0)
+    
+    def test_parameter_sweep(self):
+        """A sweep should match comparing a modified copy of each offer for every grid cell"""
+        offers = []
+        for i in range(6):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=[WorkLocationType.ONSITE, WorkLocationType.HYBRID, WorkLocationType.REMOTE][i % 3],
+                employment_type=EmploymentType.W2, compensation_type=CompensationType.SALARY,
+                base_compensation=100000 + 20000 * i, signing_bonus=12000, relocation_package=3000 * i,
+                commute_time_minutes=25, commute_calc_type=CommuteCalculationType.DISTANCE_BASED,
+                commute_details=CommuteDetails(distance_miles=8 + i)))
+        self.comparison_engine.add_offers(offers)
+        grid = {
+            "expected_tenure_years": [2, 3, 5],
+            "commute_days_per_week": [1, 3, 5],
+            "commute_details_fuel_cost_per_gallon": [3.0, 4.5],
+        }
+        metrics = ["total_annual_value", "annual_commute_cost", "total_weekly_hours"]
+        result = self.comparison_engine.sweep_offers(grid, metrics)
+        self.assertEqual(result.dims, ["offer"] + list(grid))
+        self.assertEqual(result.shape, (6, 3, 3, 2))
+        self.assertEqual(result.coords["offer"], offers)
+        
+        for tenure in grid["expected_tenure_years"]:
+            for days in grid["commute_days_per_week"]:
+                for fuel_cost in grid["commute_details_fuel_cost_per_gallon"]:
+                    for i, offer in enumerate(offers):
+                        changed = copy.deepcopy(offer)
+                        changed.expected_tenure_years = tenure
+                        changed.commute_days_per_week = days
+                        changed.commute_details.fuel_cost_per_gallon = fuel_cost
+                        expected = self.comparison_engine.compare_offer(changed)
+                        for metric in metrics:
+                            value = result.sel(metric, offer=i, expected_tenure_years=tenure,
+                                               commute_days_per_week=days,
+                                               commute_details_fuel_cost_per_gallon=fuel_cost)
+                            self.assertEqual(value, comparison_engine.OFFER_METRICS[metric][2](expected))
+        
+        self.assertEqual(result.sel("total_annual_value", commute_days_per_week=3).shape, (6, 3, 2))
+        with self.assertRaises(KeyError):
+            result.sel("total_annual_value", expected_tenure_years=4)
+        with self.assertRaises(ValueError):
+            self.comparison_engine.sweep_offers({"company": ["Acme"]})
+        with self.assertRaises(ValueError):
+            self.comparison_engine.sweep_offers({"expected_tenure_years": []})
+    
+    def test_break_even(self):
+        """Break-even values should make the changed offer's metric equal the reference's"""
+        locations = ['New York City, NY', 'Austin, TX', 'Philadelphia, PA', 'San Francisco, CA']
+        offers = []
+        for i in range(8):
+            hourly = i % 4 == 3
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location=locations[i % 4],
+                work_location_type=WorkLocationType.HYBRID,
+                employment_type=EmploymentType.CONTRACTOR_1099 if i == 5 else EmploymentType.W2,
+                compensation_type=CompensationType.HOURLY if hourly else CompensationType.SALARY,
+                base_compensation=60 + 10 * i if hourly else 45000 + 45000 * i,
+                bonus_amount=5000 * i, bonus_guaranteed=i % 2 == 0, signing_bonus=10000,
+                expected_tenure_years=2, commute_time_minutes=20, commute_cost_monthly=100,
+                cost_of_living_index=90 + 10 * i,
+                benefits=Benefits(retirement_match_percent=0.04, retirement_match_limit=8000,
+                                  paid_time_off_days=15, health_insurance_monthly_premium=150,
+                                  health_insurance_coverage_percent=0.8)))
+        
+        def changed_value(offer, field, value, metric):
+            changed = copy.deepcopy(offer)
+            if hasattr(changed.benefits, field):
+                setattr(changed.benefits, field, value)
+            else:
+                setattr(changed, field, value)
+            return comparison_engine.OFFER_METRICS[metric][2](self.comparison_engine.compare_offer(changed))
+        
+        cases = [("base_compensation", "total_annual_value"), ("base_compensation", "take_home_pay"),
+                 ("base_compensation", "cost_of_living_adjusted"), ("expected_tenure_years", "hourly_rate"),
+                 ("health_insurance_monthly_premium", "benefits_value")]
+        for field, metric in cases:
+            matrix = self.comparison_engine.break_even_matrix(field, metric, offers=offers)
+            self.assertEqual(matrix.shape, (8, 8))
+            solved = 0
+            for i, reference in enumerate(offers):
+                target = comparison_engine.OFFER_METRICS[metric][2](self.comparison_engine.compare_offer(reference))
+                for j, offer in enumerate(offers):
+                    if not np.isnan(matrix[i, j]):
+                        solved += 1
+                        self.assertAlmostEqual(changed_value(offer, field, float(matrix[i, j]), metric) / target,
+                                               1, places=8, msg=f"{field} {metric} {i} {j}")
+            self.assertGreater(solved, 8, msg=f"{field} {metric}")
+        
+        # The salary at which offer 1 is worth as much as offer 4, found in closed form
+        salary = self.comparison_engine.find_break_even(offers[1], offers[4], "base_compensation")
+        target = self.comparison_engine.compare_offer(offers[4])["compensation"]["total_annual_value"]
+        self.assertAlmostEqual(changed_value(offers[1], "base_compensation", salary, "total_annual_value"),
+                               target, places=4)
+        
+        # An insurance premium that cuts the benefit to zero is a kink the fallback handles
+        cheaper = copy.deepcopy(offers[0])
+        cheaper.benefits.health_insurance_monthly_premium = 0
+        self.assertAlmostEqual(self.comparison_engine.find_break_even(
+            cheaper, offers[0], "health_insurance_monthly_premium"), 150, places=6)
+        
+        self.assertIsNone(self.comparison_engine.find_break_even(offers[0], offers[7], "base_compensation",
+                                                                 bounds=(0, 50000)))
+        self.assertIsNone(self.comparison_engine.find_break_even(offers[0], offers[7], "commute_time_minutes"))
+        with self.assertRaises(ValueError):
+            self.comparison_engine.find_break_even(offers[0], offers[1], "bonus_guaranteed")
+        with self.assertRaises(ValueError):
+            self.comparison_engine.find_break_even(offers[0], offers[1], "base_compensation", "salary")
+        with self.assertRaises(ValueError):
+            self.comparison_engine.find_break_even(offers[0], offers[1], "base_compensation", bounds=(10, 10))
+    
+    def test_delta_matrix(self):
+        """Pairwise deltas should be the differences of the offers' metrics, in memory or memory-mapped"""
+        for i in range(7):
+            self.comparison_engine.add_offer(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.HYBRID, employment_type=EmploymentType.W2,
+                compensation_type=CompensationType.SALARY, base_compensation=80000 + 9000 * i,
+                commute_time_minutes=10 * (i % 4), commute_days_per_week=3))
+        results = self.comparison_engine.compare_offers()
+        take_home = [result["compensation"]["take_home_pay"] for result in results]
+        commute = [result["compensation"]["weekly_commute_hours"] for result in results]
+        
+        matrix = self.comparison_engine.get_delta_matrix(results=results)
+        self.assertEqual(matrix.metrics, list(comparison_engine.DELTA_METRICS))
+        self.assertEqual(len(matrix), 7)
+        for i in range(7):
+            for j in range(7):
+                self.assertEqual(matrix.delta("take_home_pay", i, j), take_home[j] - take_home[i])
+        
+        # Which offers beat offer 2 by more than $10k, and which it beats by more than an hour of commuting
+        self.assertEqual(matrix.beating("take_home_pay", 2, 10000).tolist(),
+                         [j for j in range(7) if take_home[j] - take_home[2] > 10000])
+        self.assertEqual(matrix.beating("weekly_commute_hours", 2, 1).tolist(),
+                         [j for j in range(7) if commute[2] - commute[j] > 1])
+        self.assertEqual(matrix.beaten_by("weekly_commute_hours", 0).tolist(),
+                         [j for j in range(7) if commute[j] > commute[0]])
+        self.assertEqual(matrix.count_beating("take_home_pay", 5000).tolist(),
+                         [sum(other - value > 5000 for other in take_home) for value in take_home])
+        with self.assertRaises(KeyError):
+            matrix.beating("hourly_rate", 0)
+        with self.assertRaises(ValueError):
+            self.comparison_engine.get_delta_matrix(["salary"], results=results)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch("delta_matrix.DELTA_BLOCK_BYTES", 7 * 8 * 2):
+            path = os.path.join(tmp_dir, "deltas")
+            mapped = self.comparison_engine.get_delta_matrix(["take_home_pay", "total_weekly_hours"],
+                                                             results=results, path=path)
+            self.assertIsInstance(mapped.deltas["take_home_pay"], np.memmap)
+            loaded = DeltaMatrix.load(path)
+            self.assertEqual(loaded.higher_is_better, {"take_home_pay": True, "total_weekly_hours": False})
+            np.testing.assert_array_equal(loaded.deltas["take_home_pay"], matrix.deltas["take_home_pay"])
+            self.assertEqual(loaded.count_beating("total_weekly_hours").tolist(),
+                             mapped.count_beating("total_weekly_hours").tolist())
+            del mapped, loaded
+    
+    def test_single_pass_recommendations(self):
+        """Recommendations should be the top offers of the rankings, with ties listed"""
+        offers = []
+        for i in range(30):
+            offers.append(JobOffer(
+                title=f'Role {i}', company=f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.HYBRID if i % 2 else WorkLocationType.ONSITE,
+                employment_type=EmploymentType.W2, compensation_type=CompensationType.SALARY,
+                base_compensation=80000 + 10000 * (i % 7), benefits=Benefits(paid_time_off_days=10 + i % 3),
+                commute_time_minutes=10 + i % 4, cost_of_living_index=90 + 10 * (i % 4)))
+        self.comparison_engine.add_offers(offers)
+        results = self.comparison_engine.compare_offers()
+        
+        # The same winners as the sorted rankings, the shortest commute and the work-life score
+        full = self.comparison_engine.get_rankings(results)
+        expected = {key: full[criterion]["ranking"][0]["company"]
+                    for key, criterion in comparison_engine.RECOMMENDATION_CRITERIA}
+        expected["best_commute"] = min(results, key=lambda x: x["offer"].commute_time_minutes)["offer"].company
+        expected["best_work_life_balance"] = self.comparison_engine.score_offers(
+            comparison_engine.WORK_LIFE_SCORING, results, top_k=1)["ranking"][0]["company"]
+        with mock.patch.object(self.comparison_engine, 'get_rankings') as get_rankings:
+            recommendations = self.comparison_engine.get_recommendations(results)
+            get_rankings.assert_not_called()
+        self.assertEqual(recommendations, expected)
+        
+        # Every offer sharing the best value is listed, earliest first
+        ties = self.comparison_engine.get_recommendations(results, include_ties=True)["ties"]
+        self.assertEqual(ties["best_commute"], [f'Company {i}' for i in range(30) if i % 4 == 0])
+        top_value = full["take_home_pay"]["ranking"][0]["value"]
+        self.assertEqual(ties["best_take_home_pay"], [entry["company"] for entry in full["take_home_pay"]["ranking"]
+                                                      if entry["value"] == top_value])
+        self.assertGreater(len(ties["best_take_home_pay"]), 1)
+        
+        # Precomputed rankings give the same recommendations and ties
+        for rankings in (full, self.comparison_engine.get_indexed_rankings()):
+            self.assertEqual(self.comparison_engine.get_recommendations(results, rankings, include_ties=True),
+                             self.comparison_engine.get_recommendations(results, include_ties=True))
+        self.assertEqual(self.comparison_engine.get_recommendations(
+            results, self.comparison_engine.get_rankings(results, top_k=1)), recommendations)
+        self.assertEqual(self.comparison_engine.get_recommendations([], include_ties=True), {})
+    
+    def test_duplicate_offers(self):
+        """Duplicates should be found by normalized contents, or by compensation within a tolerance"""
+        def make_offer(i, base=100000, company=None, compensation_type=CompensationType.SALARY):
+            return JobOffer(
+                title='Software Engineer', company=company or f'Company {i}', location='Austin, TX',
+                work_location_type=WorkLocationType.REMOTE, employment_type=EmploymentType.W2,
+                compensation_type=compensation_type, base_compensation=base,
+                benefits=Benefits(paid_time_off_days=15, other_benefits_description='Gym'))
+        
+        original = make_offer(0)
+        restyled = copy.deepcopy(original)
+        restyled.company, restyled.title = '  company   0 ', 'SOFTWARE ENGINEER'
+        restyled.benefits.other_benefits_description = 'gym '
+        self.assertEqual(offer_fingerprint(restyled), offer_fingerprint(original))
+        raised = make_offer(0, base=101000)
+        self.assertNotEqual(offer_fingerprint(raised), offer_fingerprint(original))
+        
+        offers = [original, make_offer(1), restyled, raised, make_offer(0, base=97000),
+                  make_offer(0, base=101, compensation_type=CompensationType.HOURLY), make_offer(2, base=-100),
+                  make_offer(2, base=-101), make_offer(3, base=0), make_offer(3, base=0)]
+        self.assertEqual(find_duplicates(offers), [None, None, 0, None, None, None, None, None, None, 8])
+        # Within 2% of the larger compensation: 101000 matches 100000, 97000 does not
+        self.assertEqual(find_duplicates(offers, 0.02), [None, None, 0, 0, None, None, None, 6, None, 8])
+        self.assertEqual(find_duplicates(offers, 0.035), [None, None, 0, 0, 0, None, None, 6, None, 8])
+        with self.assertRaises(ValueError):
+            OfferIndex(1)
+        
+        # Removed offers are no longer found; the earliest remaining match is
+        index = OfferIndex(0.05)
+        for key, offer in enumerate(offers[:5]):
+            index.add(key, offer)
+        self.assertEqual(index.find(restyled), 0)
+        index.discard(0)
+        self.assertEqual(index.find(restyled), 2)
+        self.assertEqual(len(index), 4)
+        
+        # Deduplication when adding offers to the engine
+        engine = self.comparison_engine
+        engine.add_offers([original, make_offer(1), restyled])
+        engine.enable_deduplication()
+        self.assertFalse(engine.add_offer(copy.deepcopy(original)))
+        self.assertEqual(engine.add_offers([raised, make_offer(1), make_offer(2)]), 2)
+        self.assertEqual([offer.company for offer in engine.get_offers()],
+                         ['Company 0', 'Company 1', '  company   0 ', 'Company 0', 'Company 2'])
+        self.assertEqual(engine.find_duplicate_offers(), [None, None, 0, None, None])
+        self.assertEqual(engine.find_duplicate_offers(0.02), [None, None, 0, 0, None])
+        
+        # Removing or replacing offers updates the index
+        engine.remove_offer(1)
+        self.assertTrue(engine.add_offer(make_offer(1)))
+        engine.update_offer(3, make_offer(4))
+        self.assertFalse(engine.add_offer(make_offer(4)))
+        self.assertTrue(engine.add_offer(make_offer(2, base=101000)))
+        
+        engine.enable_deduplication(0.02)
+        self.assertFalse(engine.add_offer(make_offer(2, base=99500)))
+        engine.disable_deduplication()
+        self.assertTrue(engine.add_offer(make_offer(2, base=99500)))
+        
+        # Removing duplicates keeps the first of each, even for the same object added twice
+        engine.add_offer(original)
+        self.assertEqual(engine.remove_duplicate_offers(0.02), 4)
+        self.assertEqual([offer.company for offer in engine.get_offers()],
+                         ['Company 0', 'Company 4', 'Company 1', 'Company 2'])
+        self.assertEqual(engine.remove_duplicate_offers(), 0)
+
+
+class TestStartupTime(unittest.TestCase):
+    """Cold-start budget for the main.py CLI"""
+
+    # Maximum time to import main.py in a fresh interpreter
+    IMPORT_BUDGET_SECONDS = 0.25
+
+    # Modules that must only be imported by code paths that need them
+    DEFERRED_MODULES = ['pandas', 'numpy', 'openpyxl', 'pyarrow', 'spreadsheet_parser']
+
+    def _measure_import(self):
+        """Import main.py in a fresh interpreter and report time and loaded modules"""
+        code = (
+            "import json, sys, time\n"
+            "sys.path.insert(0, sys.argv[1])\n"
+            "start = time.perf_counter()\n"
+            "import main\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))\n"
+        )
+        src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+        output = subprocess.run([sys.executable, '-c', code, src_dir],
+                                capture_output=True, text=True, check=True).stdout
+        return json.loads(output)
+
+    def test_cli_import_time(self):
+        """Importing the CLI should not load heavy dependencies or exceed the budget"""
+        # Best of three runs to smooth out noise from a busy machine
+        runs = [self._measure_import() for _ in range(3)]
+
+        for module in self.DEFERRED_MODULES:
+            self.assertNotIn(module, runs[0]['modules'], f"{module} should be imported lazily")
+
+        elapsed = min(run['elapsed'] for run in runs)
+        self.assertLess(elapsed, self.IMPORT_BUDGET_SECONDS,
+                        f"Importing main.py took {elapsed:.3f}s, budget is {self.IMPORT_BUDGET_SECONDS}s")
+
+    def test_cli_without_numpy(self):
+        """CSV files should be compared and recommended from without NumPy (or pandas) installed"""
+        code = (
+            "import os, runpy, sys\n"
+            "sys.modules['numpy'] = None\n"
+            "sys.path.insert(0, sys.argv[1])\n"
+            "from comparison_engine import ComparisonEngine\n"
+            "from spreadsheet_parser import SpreadsheetParser\n"
+            "engine = ComparisonEngine()\n"
+            "engine.add_offers(SpreadsheetParser().parse_file(sys.argv[2]))\n"
+            "print('Recommended:', engine.get_recommendations(engine.compare_offers())['best_work_life_balance'])\n"
+            "sys.argv = ['main.py', '--spreadsheet', sys.argv[2]]\n"
+            "runpy.run_path(os.path.join(sys.path[0], 'main.py'), run_name='__main__')\n"
+        )
+        src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+        csv_path = os.path.join(os.path.dirname(__file__), 'data', 'test_job_offers.csv')
+        run = subprocess.run([sys.executable, '-c', code, src_dir, csv_path],
+                             capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn("Recommended:", run.stdout)
+        self.assertIn("Best Work-Life Balance:", run.stdout)
+
+    def test_cli_dedupe_tolerance(self):
+        """--dedupe-tolerance should drop duplicates without --dedupe"""
+        csv_path = os.path.join(os.path.dirname(__file__), 'data', 'test_job_offers.csv')
+        main_path = os.path.join(os.path.dirname(__file__), '..', 'src', 'main.py')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ('a.csv', 'b.csv'):
+                shutil.copy(csv_path, os.path.join(tmp_dir, name))
+            run = subprocess.run([sys.executable, main_path, '--spreadsheet', tmp_dir, '--dedupe-tolerance', '2'],
+                                 capture_output=True, text=True, stdin=subprocess.DEVNULL, cwd=tmp_dir)
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn(f"Removed {len(SpreadsheetParser().parse_file(csv_path))} duplicate offers.", run.stdout)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file